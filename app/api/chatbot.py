@@ -16,6 +16,7 @@ from core.limiter import limiter
 from core.logging import logger
 from schemas.chat import ChatRequest, ChatResponse, Message, StreamResponse, MessageResponse, ThreadResponse
 from services.database import database_service
+from services.thread_cache import thread_cache
 
 router = APIRouter()
 agent = LangGraphAgent()
@@ -40,29 +41,26 @@ async def chat(
     Raises:
         HTTPException: Si hay un error al procesar la solicitud
     """
-    thread = None
+    thread_id = None
     try:
-        # Obtener o crear usuario usando el método del servicio
-        user = await database_service.get_or_create_user(phone)
-        
-        # Obtener o crear thread usando el método del servicio
-        thread = await database_service.get_or_create_thread(user.id)
-            
+        # Obtener o crear usuario y thread en una sola consulta (o desde la caché)
+        user_id, thread_id = await database_service.resolve_user_thread(phone)
+
         logger.info(
             "chat_request_received",
-            thread_id=thread.id,
-            user_id=user.id,
+            thread_id=thread_id,
+            user_id=user_id,
             message_count=len(chat_request.messages),
         )
 
         # Procesar la solicitud a través de LangGraph
         result = await agent.get_response(
             messages=chat_request.messages,
-            session_id=thread.id,
+            session_id=thread_id,
             initial_state={"phone": phone}
         )
 
-        logger.info("chat_request_processed", thread_id=thread.id)
+        logger.info("chat_request_processed", thread_id=thread_id)
 
         # Extraer solo el contenido del último mensaje del asistente
         if result and len(result) > 0:
@@ -75,10 +73,70 @@ async def chat(
             return MessageResponse(content="No se pudo generar una respuesta")
 
     except Exception as e:
-        error_thread_id = thread.id if thread else "unknown"
+        error_thread_id = thread_id or "unknown"
         logger.error("chat_request_failed", thread_id=error_thread_id, error=str(e), exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/chat/stream")
+@limiter.limit(settings.RATE_LIMIT_ENDPOINTS["chat_stream"][0])
+async def chat_stream(
+    request: Request,
+    chat_request: ChatRequest,
+    phone: str,
+):
+    """Procesa una solicitud de chat usando LangGraph y envía la respuesta por Server-Sent Events.
+
+    Solo se transmiten los tokens del agente que responde al usuario; el enrutamiento del
+    orquestador y las llamadas a herramientas no se envían.
+
+    Args:
+        request: Objeto de solicitud FastAPI para limitación de tasa
+        chat_request: Solicitud de chat que contiene mensajes
+        phone: Número de celular del usuario
+
+    Returns:
+        StreamingResponse: Eventos SSE con objetos StreamResponse; el último tiene done=True
+
+    Raises:
+        HTTPException: Si hay un error al preparar la solicitud
+    """
+    try:
+        # Obtener o crear usuario y thread en una sola consulta (o desde la caché)
+        user_id, thread_id = await database_service.resolve_user_thread(phone)
+
+        logger.info(
+            "stream_chat_request_received",
+            thread_id=thread_id,
+            user_id=user_id,
+            message_count=len(chat_request.messages),
+        )
+    except Exception as e:
+        logger.error("stream_chat_request_failed", phone=phone, error=str(e), exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def event_generator():
+        """Genera los eventos SSE a partir de los tokens del agente."""
+        try:
+            async for chunk in agent.get_stream_response(
+                chat_request.messages,
+                thread_id,
+                user_id=str(user_id),
+                initial_state={"phone": phone},
+            ):
+                response = StreamResponse(content=chunk, done=False)
+                yield f"data: {json.dumps(response.model_dump())}\n\n"
+
+            final_response = StreamResponse(content="", done=True)
+            yield f"data: {json.dumps(final_response.model_dump())}\n\n"
+            logger.info("stream_chat_request_processed", thread_id=thread_id)
+
+        except Exception as e:
+            logger.error("stream_chat_request_failed", thread_id=thread_id, error=str(e), exc_info=True)
+            error_response = StreamResponse(content=str(e), done=True)
+            yield f"data: {json.dumps(error_response.model_dump())}\n\n"
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
 @router.post("/create-thread")
 async def create_thread(phone: str):
     """Crea un nuevo thread para el usuario especificado por su número de teléfono.
@@ -99,6 +157,8 @@ async def create_thread(phone: str):
         thread_id = str(uuid.uuid4())
         # Crear un nuevo thread para el usuario
         thread = await database_service.create_thread(thread_id, user.id)
+        # La caché apuntaría al thread anterior hasta expirar
+        thread_cache.invalidate(phone)
         return {"thread_id": thread.id}
     except Exception as e:
         logger.error("create_thread_failed", phone=phone, error=str(e), exc_info=True)
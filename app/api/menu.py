@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from pydantic import BaseModel
 
 from services.menu_service import MenuService
@@ -106,4 +106,37 @@ async def extract_menu_from_image(
         raise HTTPException(
             status_code=500,
             detail=f"Error al procesar el menú: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+
+@router.get("/images/{content_hash}")
+async def get_menu_image(
+    content_hash: str,
+    request: Request,
+    menu_service: MenuService = Depends(),
+):
+    """
+    Sirve una imagen del menú (JPEG) por su content_hash.
+    El contenido de un hash nunca cambia, así que el puente de WhatsApp puede guardarla en caché
+    indefinidamente; si envía If-None-Match con el mismo hash se responde 304 sin cuerpo.
+
+    Args:
+        content_hash (str): Hash SHA-256 del contenido de la imagen
+        request (Request): Solicitud HTTP, para leer el encabezado If-None-Match
+        menu_service (MenuService): Servicio para manejar operaciones del menú
+
+    Returns:
+        Response: La imagen, o 304 si el cliente ya la tiene
+    """
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": f'"{content_hash}"',
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    menu_image = await menu_service.get_menu_image(content_hash)
+    if menu_image is None:
+        raise HTTPException(status_code=404, detail="Imagen de menú no encontrada")
+
+    return Response(content=menu_image.image_data, media_type=menu_image.content_type, headers=headers)
@@ -1,32 +1,33 @@
 """Endpoints for order management."""
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from models.user import User
 from models.order import Order
-from sqlmodel import select, Session
 from uuid import UUID
 import logging
-import httpx
 import asyncio
+import base64
+import json
 
+from api.auth import auth_service
+from models.admin import Admin
+from services.baileys_client import baileys_client
+from services.order_events import order_event_broadcaster
 from services.order_service import order_service
 from services.database import database_service
 from core.config import settings
 from core.limiter import limiter
 from core.logging import logger
 from utils.utils import current_colombian_time
-from schemas.order import OrderStatusUpdate, OrderResponse
+from schemas.order import OrderBulkDelete, OrderStatusUpdate, OrderResponse
 
 router = APIRouter(tags=["orders"])
 
 logger = logging.getLogger(__name__)
 
-# URL del API de WhatsApp desde la configuración
-WHATSAPP_API_URL = f"{settings.BAILEYS_SERVER_URL}/api/send-message"
-
 async def send_whatsapp_notification(phone: str, message: str) -> bool:
     """Envía una notificación por WhatsApp al usuario.
     
@@ -40,91 +41,173 @@ async def send_whatsapp_notification(phone: str, message: str) -> bool:
     try:
         logger.info(f"Enviando notificación WhatsApp a {phone}: {message}")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                WHATSAPP_API_URL,
-                json={"number": phone, "message": message}
-            )
-            
-            if response.status_code == 200:
-                logger.info(f"Notificación WhatsApp enviada exitosamente a {phone}")
-                return True
-            else:
-                logger.error(f"Error al enviar notificación WhatsApp: {response.text}")
-                return False
+        response = await baileys_client.send_message(phone, message)
+        
+        if response.status_code == 200:
+            logger.info(f"Notificación WhatsApp enviada exitosamente a {phone}")
+            return True
+        else:
+            logger.error(f"Error al enviar notificación WhatsApp: {response.text}")
+            return False
     except Exception as e:
         logger.error(f"Excepción al enviar notificación WhatsApp: {str(e)}")
         return False
 
+def _local_midnight(value: Optional[datetime] = None) -> datetime:
+    """Devuelve la medianoche del día indicado o, por defecto, del día actual en Colombia."""
+    if value is None:
+        # Usar la función current_colombian_time para obtener la fecha actual de Colombia
+        value = datetime.strptime(current_colombian_time(), '%Y-%m-%d %H:%M:%S')
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _parse_date_range(start_date: Optional[str], end_date: Optional[str]) -> Tuple[datetime, datetime]:
+    """Convierte las fechas de la consulta en un rango de días locales; por defecto, los últimos 30 días.
+
+    Args:
+        start_date: Fecha inicial en formato ISO (YYYY-MM-DD) o None
+        end_date: Fecha final en formato ISO (YYYY-MM-DD) o None
+
+    Returns:
+        Tuple[datetime, datetime]: Medianoche del día inicial y medianoche siguiente al día final
+            (el fin se excluye)
+    """
+    today = _local_midnight()
+    start = _local_midnight(datetime.fromisoformat(start_date)) if start_date else today - timedelta(days=30)
+    end = _local_midnight(datetime.fromisoformat(end_date)) if end_date else today
+    return start, end + timedelta(days=1)
+
+
+def _today_range() -> Tuple[datetime, datetime]:
+    """Devuelve el rango del día actual en Colombia (de medianoche a medianoche)."""
+    start = _local_midnight()
+    return start, start + timedelta(days=1)
+
+
+def _page_size(limit: Optional[int], cursor: Optional[str]) -> Optional[int]:
+    """Devuelve el tamaño de página pedido, acotado a ORDERS_MAX_PAGE_SIZE.
+
+    La paginación es opcional: sin `limit` ni `cursor` se devuelve None (todo el rango, como
+    lo consume el tablero); con solo `cursor` se usa ORDERS_PAGE_SIZE.
+    """
+    if limit is None and not cursor:
+        return None
+    return min(limit or settings.ORDERS_PAGE_SIZE, settings.ORDERS_MAX_PAGE_SIZE)
+
+
+def _encode_cursor(order: Dict[str, Any]) -> str:
+    """Codifica (created_at, id) del último pedido de una página como cursor opaco."""
+    raw = f"{order['created_at']}|{order['order_id']}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, UUID]]:
+    """Decodifica un cursor de _encode_cursor.
+
+    Raises:
+        HTTPException: Si el cursor no es válido
+    """
+    if not cursor:
+        return None
+    try:
+        created_at, order_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), UUID(order_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+async def _get_orders_page(
+    start: datetime, end: datetime, limit: Optional[int], cursor: Optional[str]
+) -> Tuple[List[Dict[str, Any]], Optional[str], Optional[Dict[str, Any]]]:
+    """Obtiene una página de pedidos del rango y, en la primera página, las estadísticas del rango.
+
+    Sin `limit` ni `cursor` la "página" es el rango completo y next_cursor es None. Las páginas
+    siguientes (con cursor) no recalculan las estadísticas: devuelven None y el cliente conserva
+    las de la primera página o las pide a /stats.
+
+    Returns:
+        Tuple: (pedidos de la página, cursor de la página siguiente o None, estadísticas o None)
+    """
+    page_size = _page_size(limit, cursor)
+    # Se pide un pedido de más para saber si hay otra página
+    orders_query = order_service.get_orders_by_date_range(
+        start, end, limit=page_size + 1 if page_size else None, after=_decode_cursor(cursor)
+    )
+    if cursor:
+        orders_data, stats = await orders_query, None
+    else:
+        # Listado (con nombres de clientes) y estadísticas son consultas independientes
+        orders_data, stats = await asyncio.gather(orders_query, order_service.get_order_stats(start, end))
+    next_cursor = None
+    if page_size and len(orders_data) > page_size:
+        orders_data = orders_data[:page_size]
+        next_cursor = _encode_cursor(orders_data[-1])
+    return orders_data, next_cursor, stats
+
+
+@router.get("/stats", response_model=Dict[str, Any])
+async def get_orders_stats(
+    response: Response,
+    start_date: str = None,
+    end_date: str = None
+):
+    """Obtiene solo las estadísticas de las órdenes de un rango de fechas.
+
+    Se calculan en la base de datos y se pueden cachear por separado del listado
+    (Cache-Control: max-age=ORDER_STATS_MAX_AGE_SECONDS).
+
+    Args:
+        response: Respuesta de FastAPI, para agregar el encabezado de caché
+        start_date: Fecha inicial en formato ISO (YYYY-MM-DD). Por defecto, hoy menos 30 días.
+        end_date: Fecha final en formato ISO (YYYY-MM-DD). Por defecto, hoy.
+
+    Returns:
+        Dict[str, Any]: Estadísticas de las órdenes del rango
+    """
+    try:
+        start, end = _parse_date_range(start_date, end_date)
+        stats = await order_service.get_order_stats(start, end)
+        response.headers["Cache-Control"] = f"private, max-age={settings.ORDER_STATS_MAX_AGE_SECONDS}"
+        return stats
+    except Exception as e:
+        logger.error(f"Error al obtener estadísticas de órdenes: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/by-date", response_model=Dict[str, Any])
 async def get_orders_by_date(
     start_date: str = None,
-    end_date: str = None
+    end_date: str = None,
+    limit: Optional[int] = Query(default=None, ge=1),
+    cursor: Optional[str] = None
 ):
     """Obtiene las órdenes en un rango de fechas específico.
+
+    Se paginan por cursor solo si se indica limit o cursor.
     
     Args:
         start_date: Fecha inicial en formato ISO (YYYY-MM-DD). Si no se especifica, 
                    se usará la fecha actual menos 30 días.
         end_date: Fecha final en formato ISO (YYYY-MM-DD). Si no se especifica,
                  se usará la fecha actual.
+        limit: Órdenes por página (máximo ORDERS_MAX_PAGE_SIZE); sin limit ni cursor, todas las del rango
+        cursor: Valor de next_cursor de la página anterior
     
     Returns:
-        Dict[str, Any]: Diccionario con estadísticas y lista de órdenes
+        Dict[str, Any]: Diccionario con estadísticas del rango (None en las páginas con cursor),
+            la página de órdenes y next_cursor
     """
     try:
-        # Convertir fechas o usar valores predeterminados (últimos 30 días)
-        if start_date:
-            start = datetime.fromisoformat(start_date)
-        else:
-            # Usar la función current_colombian_time para obtener la fecha actual de Colombia
-            current_time = current_colombian_time()
-            # Convertir a objeto datetime para poder restar días
-            current_datetime = datetime.strptime(current_time, '%Y-%m-%d %H:%M:%S')
-            start = current_datetime - timedelta(days=30)
-            
-        if end_date:
-            end = datetime.fromisoformat(end_date) + timedelta(days=1)  # Añadir 1 día para incluir toda la fecha final
-        else:
-            # Usar la función current_colombian_time para obtener la fecha actual de Colombia
-            current_time = current_colombian_time()
-            # Convertir a objeto datetime para poder sumar días
-            current_datetime = datetime.strptime(current_time, '%Y-%m-%d %H:%M:%S')
-            end = current_datetime + timedelta(days=1)  # Incluir órdenes de hoy
-        
-        # Obtener órdenes en el rango de fechas
-        orders_data = await order_service.get_orders_by_date_range(start, end)
-        
-        # Obtener los nombres de los usuarios relacionados
-        customer_phones = [order["customer_id"] for order in orders_data]
-        with order_service.db.engine.connect() as conn:
-            users = conn.execute(select(User).where(User.phone.in_(customer_phones))).fetchall()
-            user_map = {user.phone: user.name for user in users}
-        
-        # Calcular estadísticas
-        total_orders = len(orders_data)
-        pending_orders = len([o for o in orders_data if o["status"] == "pendiente"])
-        complete_orders = len([o for o in orders_data if o["status"] == "completado"])
-        
-        # Calcular ventas totales sumando los subtotales de los pedidos completados
-        total_sales = 0
-        for order in orders_data:
-            if order["status"] == "completado":
-                for product in order["products"]:
-                    total_sales += float(product["subtotal"])
+        start, end = _parse_date_range(start_date, end_date)
+        orders_data, next_cursor, stats = await _get_orders_page(start, end, limit, cursor)
         
         return {
-            "stats": {
-                "total_orders": total_orders,
-                "pending_orders": pending_orders,
-                "complete_orders": complete_orders,
-                "total_sales": total_sales
-            },
+            "stats": stats,
+            "next_cursor": next_cursor,
             "orders": [
                 {
                     "id": order["order_id"],
                     "address": order["address"],
-                    "customer_name": user_map.get(order["customer_id"], order["customer_id"]),
+                    "customer_name": order["customer_name"],
                     "products": [
                         {
                             "name": product["name"],
@@ -142,69 +225,91 @@ async def get_orders_by_date(
                 for order in orders_data
             ]
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error al obtener órdenes por fecha: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/today", response_model=Dict[str, Any])
-async def get_today_orders():
-    """Obtiene las órdenes del día actual.
+async def get_today_orders(
+    limit: Optional[int] = Query(default=None, ge=1),
+    cursor: Optional[str] = None
+):
+    """Obtiene las órdenes del día actual, paginadas por cursor si se indica limit o cursor.
+    
+    Args:
+        limit: Órdenes por página (máximo ORDERS_MAX_PAGE_SIZE); sin limit ni cursor, todas las del rango
+        cursor: Valor de next_cursor de la página anterior
     
     Returns:
-        Dict[str, Any]: Diccionario con estadísticas y lista de órdenes
+        Dict[str, Any]: Diccionario con estadísticas del día (None en las páginas con cursor),
+            la página de órdenes y next_cursor
     """
     try:
-        # Obtener todas las órdenes del día
-        orders = await order_service.get_orders_today()
-        
-        # Obtener los nombres de los usuarios relacionados
-        customer_phones = [order.customer_id for order in orders]
-        with order_service.db.engine.connect() as conn:
-            users = conn.execute(select(User).where(User.phone.in_(customer_phones))).fetchall()
-            user_map = {user.phone: user.name for user in users}
-        
-        # Calcular estadísticas
-        total_orders = len(orders)
-        pending_orders = len([o for o in orders if o.status == "pendiente"])
-        complete_orders = len([o for o in orders if o.status == "completado"])
-        
-        # Calcular ventas totales sumando los subtotales de los pedidos completados
-        total_sales = 0
-        for order in orders:
-            if order.status == "completado":
-                for item in order.items:
-                    total_sales += item.unit_price * item.quantity
+        start, end = _today_range()
+        orders_data, next_cursor, stats = await _get_orders_page(start, end, limit, cursor)
         
         return {
-            "stats": {
-                "total_orders": total_orders,
-                "pending_orders": pending_orders,
-                "complete_orders": complete_orders,
-                "total_sales": total_sales
-            },
+            "stats": stats,
+            "next_cursor": next_cursor,
             "orders": [
                 {
-                    "id": str(order.id),
-                    "address": order.address,
-                    "customer_name": user_map.get(order.customer_id, order.customer_id),
+                    "id": order["order_id"],
+                    "address": order["address"],
+                    "customer_name": order["customer_name"],
                     "products": [
                         {
-                            "name": item.product_name,
-                            "quantity": item.quantity,
-                            "price": item.unit_price
+                            "name": product["name"],
+                            "quantity": product["quantity"],
+                            "price": product["unit_price"]
                         }
-                        for item in order.items
+                        for product in order["products"]
                     ],
-                    "created_at": order.created_at.isoformat(),
-                    "updated_at": order.updated_at.isoformat(),
-                    "state": order.status
+                    "created_at": order["created_at"],
+                    "updated_at": order["updated_at"],
+                    "state": order["status"]
                 }
-                for order in orders
+                for order in orders_data
             ]
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/events")
+async def order_events(request: Request):
+    """Envía por Server-Sent Events los cambios de pedidos a medida que ocurren.
+
+    Cada evento es un delta (order_created, order_items_added, order_item_updated,
+    order_status_changed) que el tablero aplica sobre el listado que ya tiene, en lugar de
+    volver a consultar /orders/today. Ante un evento "resync" el tablero debe recargar el listado.
+
+    Args:
+        request: Objeto de solicitud FastAPI, para detectar la desconexión del cliente
+
+    Returns:
+        StreamingResponse: Eventos SSE con un objeto JSON por evento
+    """
+
+    async def event_generator():
+        """Genera los eventos SSE de la suscripción, con comentarios periódicos de keep-alive."""
+        async with order_event_broadcaster.subscribe() as queue:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.ORDER_EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.put("/update_state")
 async def update_order_state(status_update: OrderStatusUpdate):
     """Actualiza el estado de una orden.
@@ -250,8 +355,8 @@ async def update_order_state(status_update: OrderStatusUpdate):
             )
 
         # Obtener primero los datos de la orden para tener el número de teléfono
-        with Session(order_service.db.engine) as session:
-            order_before_update = session.get(Order, order_uuid)
+        async with order_service.db.async_session() as session:
+            order_before_update = await session.get(Order, order_uuid)
             if not order_before_update:
                 raise HTTPException(status_code=404, detail="Orden no encontrada")
             
@@ -325,6 +430,40 @@ async def update_order_state(status_update: OrderStatusUpdate):
             detail=f"Error inesperado: {str(e)}"
         )
 
+@router.post("/bulk-delete")
+async def delete_orders(bulk_delete: OrderBulkDelete, admin: Admin = Depends(auth_service.get_current_admin)):
+    """Elimina varias órdenes en una sola sentencia, por IDs o por rango de fechas.
+    
+    Con start_date y end_date se eliminan las órdenes creadas entre ambos días (incluidos); sin
+    start_date, todas las creadas hasta end_date. El borrado es permanente (también en el
+    archivo), por eso solo lo puede hacer un administrador autenticado.
+    
+    Args:
+        bulk_delete: IDs de las órdenes (order_ids) o rango de fechas (start_date, end_date)
+        admin: Administrador autenticado (inyectado por dependencia)
+        
+    Returns:
+        Dict[str, Any]: Mensaje de confirmación y número de órdenes eliminadas
+    """
+    if bulk_delete.order_ids is not None and (bulk_delete.start_date or bulk_delete.end_date):
+        raise HTTPException(status_code=400, detail="Indique los IDs o el rango de fechas, no ambos")
+    
+    try:
+        if bulk_delete.order_ids is not None:
+            order_ids = [UUID(order_id) for order_id in bulk_delete.order_ids]
+            deleted = await order_service.delete_orders(order_ids=order_ids)
+        else:
+            if not bulk_delete.end_date:
+                raise HTTPException(status_code=400, detail="Indique los IDs de las órdenes o la fecha final")
+            start = _local_midnight(datetime.fromisoformat(bulk_delete.start_date)) if bulk_delete.start_date else None
+            end = _local_midnight(datetime.fromisoformat(bulk_delete.end_date)) + timedelta(days=1)
+            deleted = await order_service.delete_orders(start_date=start, end_date=end)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="IDs o fechas inválidos")
+    
+    logger.info(f"Órdenes eliminadas en bloque por {admin.username}: {deleted}")
+    return {"message": f"{deleted} órdenes eliminadas correctamente", "deleted": deleted}
+
 @router.delete("/{order_id}")
 async def delete_order(order_id: str):
     """Elimina una orden.
@@ -9,6 +9,7 @@ import json
 import os
 from enum import Enum
 from pathlib import Path
+from urllib.parse import urlparse
 from typing import (
     Any,
     Dict,
@@ -137,6 +138,22 @@ class Settings:
 
         # Baileys WhatsApp API Settings
         self.BAILEYS_SERVER_URL = os.getenv("BAILEYS_SERVER_URL")
+        # Shared bridge client: pooled keep-alive connections, bounded concurrency and retries
+        # (connect-phase errors and 502/503 only) with jittered exponential backoff
+        self.BAILEYS_MAX_CONNECTIONS = int(os.getenv("BAILEYS_MAX_CONNECTIONS", "20"))
+        self.BAILEYS_MAX_CONCURRENCY = int(os.getenv("BAILEYS_MAX_CONCURRENCY", "10"))
+        self.BAILEYS_TIMEOUT_SECONDS = float(os.getenv("BAILEYS_TIMEOUT_SECONDS", "30"))
+        self.BAILEYS_MAX_RETRIES = int(os.getenv("BAILEYS_MAX_RETRIES", "3"))
+        self.BAILEYS_RETRY_BACKOFF_SECONDS = float(os.getenv("BAILEYS_RETRY_BACKOFF_SECONDS", "0.5"))
+        # Base URL at which the bridge reaches this API (menu images are fetched by URL).
+        # No default: a bind address such as 0.0.0.0 is not reachable from the bridge container
+        self.API_BASE_URL = os.getenv("API_BASE_URL")
+
+        # Menu images: transcoded once on upload; repeat sends to the same customer within
+        # MENU_IMAGE_DEDUP_SECONDS are skipped
+        self.MENU_IMAGE_MAX_SIDE = int(os.getenv("MENU_IMAGE_MAX_SIDE", "1600"))
+        self.MENU_IMAGE_JPEG_QUALITY = int(os.getenv("MENU_IMAGE_JPEG_QUALITY", "80"))
+        self.MENU_IMAGE_DEDUP_SECONDS = float(os.getenv("MENU_IMAGE_DEDUP_SECONDS", "600"))
         
         # Langfuse Configuration
         self.LANGFUSE_PUBLIC_KEY = os.getenv("LANGFUSE_PUBLIC_KEY", "")
@@ -150,6 +167,69 @@ class Settings:
         self.MAX_TOKENS = int(os.getenv("MAX_TOKENS", "2000"))
         self.MAX_LLM_CALL_RETRIES = int(os.getenv("MAX_LLM_CALL_RETRIES", "3"))
 
+        # Prompt assembly: minutes to which the time in the per-turn context is rounded
+        self.PROMPT_TIME_ROUND_MINUTES = int(os.getenv("PROMPT_TIME_ROUND_MINUTES", "5"))
+
+        # Orchestrator routing LLM (structured output, small completion budget)
+        self.ORCHESTRATOR_LLM_MODEL = os.getenv("ORCHESTRATOR_LLM_MODEL", self.LLM_MODEL)
+        self.ORCHESTRATOR_LLM_TEMPERATURE = float(os.getenv("ORCHESTRATOR_LLM_TEMPERATURE", "0"))
+        self.ORCHESTRATOR_MAX_TOKENS = int(os.getenv("ORCHESTRATOR_MAX_TOKENS", "20"))
+
+        # Conversation compaction: once a thread has more than COMPACTION_THRESHOLD_MESSAGES
+        # messages, drop the oldest turns and keep about COMPACTION_KEEP_MESSAGES
+        self.COMPACTION_THRESHOLD_MESSAGES = int(os.getenv("COMPACTION_THRESHOLD_MESSAGES", "40"))
+        self.COMPACTION_KEEP_MESSAGES = int(os.getenv("COMPACTION_KEEP_MESSAGES", "20"))
+
+        # Menu snapshot: in-memory menu served by get_menu, invalidated on every product write;
+        # the TTL only picks up changes made outside this process
+        self.MENU_SNAPSHOT_TTL_SECONDS = float(os.getenv("MENU_SNAPSHOT_TTL_SECONDS", "300"))
+
+        # phone -> (user_id, thread_id) cache used by /chat; rotations made by other workers are
+        # only picked up when the entry expires, so keep the TTL short
+        self.THREAD_CACHE_TTL_SECONDS = float(os.getenv("THREAD_CACHE_TTL_SECONDS", "60"))
+        self.THREAD_CACHE_MAX_ENTRIES = int(os.getenv("THREAD_CACHE_MAX_ENTRIES", "10000"))
+
+        # Orders dashboard: browser/proxy cache lifetime of GET /orders/stats, and page size of
+        # the keyset-paginated order listings when a cursor comes without a limit (requests are
+        # capped at ORDERS_MAX_PAGE_SIZE; without limit or cursor the whole range is returned)
+        self.ORDER_STATS_MAX_AGE_SECONDS = int(os.getenv("ORDER_STATS_MAX_AGE_SECONDS", "10"))
+        self.ORDERS_PAGE_SIZE = int(os.getenv("ORDERS_PAGE_SIZE", "50"))
+        self.ORDERS_MAX_PAGE_SIZE = int(os.getenv("ORDERS_MAX_PAGE_SIZE", "200"))
+
+        # Order events pushed to dashboards (GET /orders/events, fed by LISTEN/NOTIFY)
+        self.ORDER_EVENTS_QUEUE_SIZE = int(os.getenv("ORDER_EVENTS_QUEUE_SIZE", "100"))
+        self.ORDER_EVENTS_HEARTBEAT_SECONDS = float(os.getenv("ORDER_EVENTS_HEARTBEAT_SECONDS", "15"))
+        self.ORDER_EVENTS_RETRY_SECONDS = float(os.getenv("ORDER_EVENTS_RETRY_SECONDS", "5"))
+
+        # Order archival: every ORDER_ARCHIVE_INTERVAL_SECONDS (0 disables the in-app job) closed
+        # orders created more than ORDER_ARCHIVE_AFTER_DAYS ago move to the archive tables, in
+        # batches of ORDER_ARCHIVE_BATCH_SIZE. History listings only read the archive when their
+        # range starts at or before the newest archived order, whatever horizon archived it
+        self.ORDER_ARCHIVE_AFTER_DAYS = int(os.getenv("ORDER_ARCHIVE_AFTER_DAYS", "90"))
+        self.ORDER_ARCHIVE_BATCH_SIZE = int(os.getenv("ORDER_ARCHIVE_BATCH_SIZE", "1000"))
+        self.ORDER_ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ORDER_ARCHIVE_INTERVAL_SECONDS", "3600"))
+
+        # Response cache for FAQ turns (opt-in): conversation_agent answers without tool calls
+        # on the first turn of a thread, for customers without an open order, keyed by
+        # normalized text and prompt/menu version
+        self.RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() in ("true", "1", "t", "yes")
+        self.RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+        self.RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+
+        # Tool execution: default timeout and per-tool overrides (TOOL_TIMEOUT_<TOOL_NAME>=seconds).
+        # Order-write tools run without a timeout so a write is never cut off halfway
+        self.TOOL_CALL_TIMEOUT = float(os.getenv("TOOL_CALL_TIMEOUT", "15"))
+        self.TOOL_TIMEOUTS = {"send_menu_images": 60.0, "send_location_tool": 30.0}
+        for key, value in os.environ.items():
+            if key.startswith("TOOL_TIMEOUT_") and value:
+                self.TOOL_TIMEOUTS[key[len("TOOL_TIMEOUT_") :].lower()] = float(value)
+
+        # Local intent classifier (fast path in front of the orchestrator LLM call)
+        self.INTENT_CLASSIFIER_ENABLED = os.getenv("INTENT_CLASSIFIER_ENABLED", "true").lower() in ("true", "1", "t", "yes")
+        self.INTENT_CLASSIFIER_THRESHOLD = float(os.getenv("INTENT_CLASSIFIER_THRESHOLD", "0.75"))
+        self.INTENT_CLASSIFIER_MIN_SCORE = float(os.getenv("INTENT_CLASSIFIER_MIN_SCORE", "1.0"))
+        self.INTENT_CLASSIFIER_MAX_WORDS = int(os.getenv("INTENT_CLASSIFIER_MAX_WORDS", "12"))
+
         # JWT Configuration
         self.JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "")
         self.JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
@@ -162,8 +242,13 @@ class Settings:
 
         # Postgres Configuration
         self.POSTGRES_URL = os.getenv("POSTGRES_URL", "")
-        self.POSTGRES_POOL_SIZE = int(os.getenv("POSTGRES_POOL_SIZE", "20"))
-        self.POSTGRES_MAX_OVERFLOW = int(os.getenv("POSTGRES_MAX_OVERFLOW", "10"))
+        # One pool per worker shared by the ORM and the checkpointer; its size is the worker's
+        # share of POSTGRES_MAX_CONNECTIONS after POSTGRES_RESERVED_CONNECTIONS (scripts, admin)
+        self.POSTGRES_MAX_CONNECTIONS = int(os.getenv("POSTGRES_MAX_CONNECTIONS", "50"))
+        self.POSTGRES_RESERVED_CONNECTIONS = int(os.getenv("POSTGRES_RESERVED_CONNECTIONS", "5"))
+        self.WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+        self.POSTGRES_POOL_MIN_SIZE = int(os.getenv("POSTGRES_POOL_MIN_SIZE", "2"))
+        self.POSTGRES_POOL_TIMEOUT = float(os.getenv("POSTGRES_POOL_TIMEOUT", "30"))
         self.CHECKPOINT_TABLES = ["checkpoint_blobs", "checkpoint_writes", "checkpoints"]
 
         # Rate Limiting Configuration
@@ -234,6 +319,29 @@ class Settings:
             if env_var_name not in os.environ:
                 setattr(self, key, value)
 
+    def validate_api_base_url(self):
+        """Fail fast when the bridge is configured but cannot fetch menu images from this API.
+
+        Raises:
+            ValueError: If BAILEYS_SERVER_URL is set and API_BASE_URL is missing, not an
+                http(s) URL, or points at a wildcard bind address.
+        """
+        if not self.BAILEYS_SERVER_URL:
+            return
+        if not self.API_BASE_URL:
+            raise ValueError("API_BASE_URL is required when BAILEYS_SERVER_URL is set")
+        parsed = urlparse(self.API_BASE_URL)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError(f"API_BASE_URL must be an http(s) URL, got {self.API_BASE_URL!r}")
+        if parsed.hostname in UNREACHABLE_HOSTS:
+            raise ValueError(
+                f"API_BASE_URL host {parsed.hostname!r} is not reachable from the bridge; "
+                "use the address the bridge container resolves this API at"
+            )
+
+
+# Wildcard bind addresses: valid for listening, never as a destination for the bridge
+UNREACHABLE_HOSTS = {"0.0.0.0", "::"}
 
 # Create settings instance
 settings = Settings()
@@ -1,5 +1,8 @@
 """This file contains the LangGraph Agent/workflow and interactions with the LLM."""
 
+import asyncio
+import hashlib
+import uuid
 from typing import (
     Any,
     AsyncGenerator,
@@ -12,12 +15,20 @@ from typing import (
 
 from asgiref.sync import sync_to_async
 from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
     BaseMessage,
+    RemoveMessage,
+    SystemMessage,
     ToolMessage,
     convert_to_openai_messages,
 )
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import (
+    Runnable,
+    RunnableConfig,
+)
 from langchain_openai import ChatOpenAI
 from langfuse.callback import CallbackHandler
 from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
@@ -36,6 +47,8 @@ from core.config import (
     Environment,
     settings,
 )
+from core.langgraph.intent_classifier import classify_intent
+from core.langgraph.response_cache import response_cache
 from core.langgraph.tools import (get_menu_tool,  
                                   tools, 
                                   confirm_product,
@@ -44,8 +57,9 @@ from core.langgraph.tools import (get_menu_tool,
                                     update_order_product,
                                     send_menu_images,
                                     send_location_tool)
-from services.order_service import OrderService
+from services.connection_pool import pool_manager
 from services.database import database_service
+from services.menu_snapshot import menu_snapshot_cache
 
 from core.logging import logger
 from core.prompts import (
@@ -54,15 +68,20 @@ from core.prompts import (
     SYSTEM_PROMPT_UPDATE_ORDER,
     SYSTEM_PROMPT_PQRS,
     SYSTEM_PROMPT_ORCHESTRATOR,
+    build_prompt_messages,
+    build_turn_context,
+    prompt_cache_stats,
 )
 from schemas import (
     GraphState,
     Message,
+    RouterDecision,
 )
 from utils import (
     dump_messages,
-    prepare_messages,
-    current_colombian_time,
+    format_last_order_info,
+    get_last_order_from_context,
+    select_messages_to_compact,
 )
 
 class LangGraphAgent:
@@ -81,8 +100,14 @@ class LangGraphAgent:
             max_tokens=settings.MAX_TOKENS,
             **self._get_model_kwargs(),
         )
+        # LLM de enrutamiento: salida estructurada con enum de nodos y presupuesto mínimo de tokens
+        self.router_llm = ChatOpenAI(
+            model=settings.ORCHESTRATOR_LLM_MODEL,
+            temperature=settings.ORCHESTRATOR_LLM_TEMPERATURE,
+            api_key=settings.LLM_API_KEY,
+            max_tokens=settings.ORCHESTRATOR_MAX_TOKENS,
+        ).with_structured_output(RouterDecision, method="json_schema", strict=True, include_raw=True)
         self.tools_by_name = {tool.name: tool for tool in tools}
-        self._connection_pool: Optional[AsyncConnectionPool] = None
         self._graph: Optional[CompiledStateGraph] = None
         self.agent_tools = {
             "conversation_agent": [get_menu_tool, get_last_order, send_menu_images, send_location_tool],
@@ -90,9 +115,33 @@ class LangGraphAgent:
             "update_order_agent": [add_products_to_order,get_menu_tool,update_order_product],
             "pqrs_agent": [],
         }
+        # Runnables con las herramientas ya enlazadas: los esquemas JSON de las tools se
+        # serializan una sola vez aquí y no en cada turno
+        self.agent_llms = self._bind_agent_tools()
+        # Herramientas que modifican pedidos: tras ejecutarlas se recarga el contexto del cliente
+        self.order_write_tools = {"confirm_product", "add_products_to_order", "update_order_product"}
+        # Versión de los prompts para la caché de respuestas: cambia si cambian los prompts o el modelo
+        self._prompt_version = hashlib.sha1(
+            (SYSTEM_PROMPT_ORCHESTRATOR + SYSTEM_PROMPT_CONVERSATION + settings.LLM_MODEL).encode("utf-8")
+        ).hexdigest()[:12]
+        # Nodos cuyo texto llega al usuario: solo sus tokens se envían en streaming
+        self.streaming_nodes = {"conversation_agent", "order_data_agent", "update_order_agent", "pqrs_agent"}
 
         logger.info("llm_initialized", model=settings.LLM_MODEL, environment=settings.ENVIRONMENT.value)
 
+    def _bind_agent_tools(self) -> Dict[str, Runnable]:
+        """Build one tool-bound LLM runnable per agent.
+
+        Agents without tools use the plain LLM, since an empty tools list is rejected by the API.
+
+        Returns:
+            Dict[str, Runnable]: The bound runnable for each agent name
+        """
+        return {
+            agent: self.llm.bind_tools(agent_tools) if agent_tools else self.llm
+            for agent, agent_tools in self.agent_tools.items()
+        }
+
     def _get_model_kwargs(self) -> Dict[str, Any]:
         """Get environment-specific model kwargs.
         
@@ -114,36 +163,20 @@ class LangGraphAgent:
         return model_kwargs
 
     async def _get_connection_pool(self) -> AsyncConnectionPool:
-        """Get a PostgreSQL connection pool using environment-specific settings.
+        """Get the worker's shared PostgreSQL connection pool (also used by the ORM).
 
         Returns:
-            AsyncConnectionPool: A connection pool for PostgreSQL database.
+            AsyncConnectionPool: The pool managed by `pool_manager`, or None in production if it cannot be opened.
         """
-        if self._connection_pool is None:
-            try:
-                # Configure pool size based on environment
-                max_size = settings.POSTGRES_POOL_SIZE
-
-                self._connection_pool = AsyncConnectionPool(
-                    settings.POSTGRES_URL,
-                    open=False,
-                    max_size=max_size,
-                    kwargs={
-                        "autocommit": True,
-                        "connect_timeout": 5,
-                        "prepare_threshold": None,
-                    },
-                )
-                await self._connection_pool.open()
-                logger.info("connection_pool_created", max_size=max_size, environment=settings.ENVIRONMENT.value)
-            except Exception as e:
-                logger.error("connection_pool_creation_failed", error=str(e), environment=settings.ENVIRONMENT.value)
-                # In production, we might want to degrade gracefully
-                if settings.ENVIRONMENT == Environment.PRODUCTION:
-                    logger.warning("continuing_without_connection_pool", environment=settings.ENVIRONMENT.value)
-                    return None
-                raise e
-        return self._connection_pool
+        try:
+            return await pool_manager.get_pool()
+        except Exception as e:
+            logger.error("connection_pool_creation_failed", error=str(e), environment=settings.ENVIRONMENT.value)
+            # In production, we might want to degrade gracefully
+            if settings.ENVIRONMENT == Environment.PRODUCTION:
+                logger.warning("continuing_without_connection_pool", environment=settings.ENVIRONMENT.value)
+                return None
+            raise e
 
     async def _chat(self, state: GraphState) -> dict:
         """Process the chat state and generate a response.
@@ -195,14 +228,93 @@ class LangGraphAgent:
 
         raise Exception(f"Failed to get a response from the LLM after {max_retries} attempts")
 
+    async def _load_customer_context(self, state: GraphState) -> dict:
+        """Load the customer context once at the start of the turn.
+
+        Fetches the user, their latest order and its items in a single query so that
+        the orchestrator and the agents read from the state instead of the database.
+
+        Args:
+            state (GraphState): The current state of the conversation.
+
+        Returns:
+            dict: State update with the customer context.
+        """
+        if not state.phone:
+            return {"customer_context": None}
+        return {"customer_context": await database_service.get_customer_context(state.phone)}
+
+    async def _compact_history(self, state: GraphState) -> dict:
+        """Drop the oldest turns once the history passes the compaction threshold.
+
+        Runs at the end of every turn. Old messages (including tool calls and results) are
+        removed with RemoveMessage so the checkpointed state stays roughly constant in size.
+
+        Args:
+            state (GraphState): The current state of the conversation.
+
+        Returns:
+            dict: State update removing the old messages and their token counts.
+        """
+        removed = select_messages_to_compact(
+            state.messages, settings.COMPACTION_THRESHOLD_MESSAGES, settings.COMPACTION_KEEP_MESSAGES
+        )
+        if not removed:
+            return {}
+
+        logger.info(
+            "conversation_compacted",
+            session_id=state.session_id,
+            removed_messages=len(removed),
+            kept_messages=len(state.messages) - len(removed),
+        )
+        return {
+            "messages": [RemoveMessage(id=message.id) for message in removed],
+            "token_counts": {message.id: None for message in removed},
+        }
+
     # Define our tool node
+    async def _run_tool(self, tool_call: dict, write_lock: asyncio.Lock) -> ToolMessage:
+        """
+        Ejecuta una herramienta con su timeout y devuelve siempre un ToolMessage.
+
+        Las herramientas que modifican pedidos se serializan con `write_lock` para que dos
+        escrituras del mismo turno no compitan por el mismo pedido, y se ejecutan sin timeout:
+        cancelarlas a mitad dejaría sin saber si el pedido se guardó y el agente podría repetir
+        la escritura en el siguiente intento.
+        """
+        name = tool_call["name"]
+        timeout = settings.TOOL_TIMEOUTS.get(name, settings.TOOL_CALL_TIMEOUT)
+        try:
+            if name in self.order_write_tools:
+                async with write_lock:
+                    tool_result = await self.tools_by_name[name].ainvoke(tool_call["args"])
+            else:
+                tool_result = await asyncio.wait_for(self.tools_by_name[name].ainvoke(tool_call["args"]), timeout)
+            content = str(tool_result)
+        except asyncio.TimeoutError:
+            logger.warning("tool_call_timeout", tool=name, timeout=timeout)
+            content = str({
+                "message": f"Error: La herramienta {name} no respondió en {timeout:.0f} segundos",
+                "error": True
+            })
+        except Exception as e:
+            print(f"\033[93mError al ejecutar la herramienta {name}: {str(e)}\033[0m")
+            content = str({
+                "message": f"Error al ejecutar la herramienta: {str(e)}",
+                "error": True
+            })
+        return ToolMessage(content=content, name=name, tool_call_id=tool_call["id"])
+
     async def _tool_call(self, state: GraphState) -> GraphState:
         """
         Procesa las llamadas a herramientas desde el último mensaje.
         """
         print("\033[94m[_tool_call] Procesando llamada a herramienta\033[0m")
     
+        # Una entrada por tool_call, en el mismo orden: ToolMessage de error o corrutina a ejecutar
         outputs = []
+        write_lock = asyncio.Lock()
         for tool_call in state.messages[-1].tool_calls:
             print(f"\033[94m[tool] Ejecutando: {tool_call['name']} con args: {tool_call['args']}\033[0m")
             
@@ -265,29 +377,20 @@ class LangGraphAgent:
                     )
                     continue
             
-            try:
-                tool_result = await self.tools_by_name[tool_call["name"]].ainvoke(tool_call["args"])
-                outputs.append(
-                    ToolMessage(
-                        content=str(tool_result),
-                        name=tool_call["name"],
-                        tool_call_id=tool_call["id"],
-                    )
-                )
-            except Exception as e:
-                print(f"\033[93mError al ejecutar la herramienta {tool_call['name']}: {str(e)}\033[0m")
-                outputs.append(
-                    ToolMessage(
-                        content=str({
-                            "message": f"Error al ejecutar la herramienta: {str(e)}",
-                            "error": True
-                        }),
-                        name=tool_call["name"],
-                        tool_call_id=tool_call["id"],
-                    )
-                )
+            outputs.append(self._run_tool(tool_call, write_lock))
+
+        # Ejecutar las herramientas de forma concurrente; gather conserva el orden de tool_call_id
+        pending = [output for output in outputs if not isinstance(output, ToolMessage)]
+        results = iter(await asyncio.gather(*pending))
+        outputs = [output if isinstance(output, ToolMessage) else next(results) for output in outputs]
         
         print("\033[94m[_tool_call] Respuesta de la herramienta generada\033[0m")
+
+        # Si alguna herramienta modificó el pedido, refrescar el contexto del cliente
+        called_tools = {tool_call["name"] for tool_call in state.messages[-1].tool_calls}
+        if state.phone and called_tools & self.order_write_tools:
+            customer_context = await database_service.get_customer_context(state.phone)
+            return {"messages": outputs, "customer_context": customer_context}
         return {"messages": outputs}
 
     def _router(self, state: GraphState) -> Literal["end", "tool_node"]:
@@ -301,7 +404,176 @@ class LangGraphAgent:
         else:
             return "tool_node"
 
-    async def _orchestrator(self, state: GraphState) -> GraphState:
+    async def _detect_intent(self, state: GraphState, last_order_info: str) -> str:
+        """
+        Detecta la intención del último mensaje del usuario.
+
+        Primero intenta el clasificador local por palabras clave; si no tiene suficiente
+        confianza, consulta el LLM de enrutamiento con SYSTEM_PROMPT_ORCHESTRATOR y salida
+        estructurada (RouterDecision).
+
+        Returns:
+            str: Uno de los nodos válidos; conversation_agent si no se pudo determinar.
+        """
+        # Clasificador local: evita la llamada al LLM en los mensajes obvios
+        user_message, _ = self._current_turn(state)
+        if settings.INTENT_CLASSIFIER_ENABLED and user_message is not None:
+            prediction = classify_intent(str(user_message.content))
+            if prediction.node:
+                logger.info(
+                    "intent_classified_locally",
+                    session_id=state.session_id,
+                    intent=prediction.node,
+                    confidence=round(prediction.confidence, 2),
+                )
+                return prediction.node
+
+        # Limitar mensajes a los últimos 10; la información de la orden va en el contexto del turno
+        recent_messages = state.messages[-10:] if len(state.messages) > 10 else state.messages
+        messages = build_prompt_messages(
+            SYSTEM_PROMPT_ORCHESTRATOR,
+            recent_messages,
+            build_turn_context(last_order_info=last_order_info),
+            state.token_counts,
+        )
+
+        # Invocar el modelo de enrutamiento: la respuesta viene restringida al enum de nodos
+        response = await self.router_llm.ainvoke(dump_messages(messages))
+        prompt_cache_stats.record("orchestrator", response.get("raw"))
+        decision = response.get("parsed")
+        if decision is None:
+            logger.warning(
+                "orchestrator_routing_parse_failed",
+                session_id=state.session_id,
+                error=str(response.get("parsing_error")),
+            )
+            return "conversation_agent"
+
+        usage = getattr(response.get("raw"), "usage_metadata", None) or {}
+        logger.info(
+            "intent_classified_by_llm",
+            session_id=state.session_id,
+            intent=decision.node,
+            output_tokens=usage.get("output_tokens"),
+        )
+        return decision.node
+
+    def _notify_order_not_editable(self, state: GraphState, last_order: Optional[dict]) -> None:
+        """
+        Añade un mensaje de sistema indicando que el pedido ya no se puede modificar.
+        """
+        current_status = last_order['status'] if last_order and 'status' in last_order else "no disponible"
+        print(f"\033[93mEl pedido no está en estado 'pending', está en estado '{current_status}'. No se puede modificar. Redirigiendo a conversation_agent\033[0m")
+        
+        # Añadir un mensaje al sistema para informar al usuario
+        state.messages.append(SystemMessage(
+            content=f"El pedido ya no se puede modificar porque está en estado {current_status}. Informa al cliente sobre el estado actual sin ofrecer automáticamente ayuda para crear un nuevo pedido. Deja que el cliente decida si quiere hacer un nuevo pedido y te lo solicite explícitamente."
+        ))
+
+    def _route_after_order_write(self, state: GraphState, intent: str, last_order: Optional[dict]) -> GraphState:
+        """
+        Enruta el turno siguiente a crear o ampliar un pedido.
+
+        Si el usuario quiere pedir o añadir algo y el pedido sigue pendiente, va a
+        update_order_agent; en cualquier otro caso, a conversation_agent.
+        """
+        # Si la intención es order_data_agent o update_order_agent, redirigir a update_order_agent
+        if intent in ["order_data_agent", "update_order_agent"]:
+            # Verificar si el pedido está en estado pending
+            if last_order and last_order['status'] == "pending":
+                print("\033[93mUsuario quiere añadir más productos, redirigiendo a update_order_agent\033[0m")
+                state.node_history.append("update_order_agent")
+                return state
+            self._notify_order_not_editable(state, last_order)
+        else:
+            print("\033[93mRedirigiendo a conversation_agent\033[0m")
+        state.node_history.append("conversation_agent")
+        return state
+
+    def _response_cache_version(self) -> str:
+        """Get the version stamp of the cached responses (prompts, model and menu)."""
+        return f"{self._prompt_version}:{menu_snapshot_cache.version}"
+
+    def _current_turn(self, state: GraphState) -> tuple[Optional[Any], list]:
+        """Split the history into the last user message and the messages that followed it."""
+        for index in range(len(state.messages) - 1, -1, -1):
+            message = state.messages[index]
+            if getattr(message, "type", None) == "human":
+                return message, state.messages[index + 1 :]
+        return None, []
+
+    def _cacheable_turn(self, state: GraphState) -> tuple[Optional[Any], list]:
+        """Split the history like `_current_turn`, but only for turns whose answer can be cached.
+
+        Only the first exchange of a thread qualifies: with no earlier assistant message the
+        answer depends on the message, the prompts/menu and the customer's name alone, never on
+        the conversation ("sí" or "dale" after an order confirmation).
+        """
+        user_message, turn_messages = self._current_turn(state)
+        if user_message is None:
+            return None, []
+        earlier_messages = state.messages[: len(state.messages) - len(turn_messages) - 1]
+        if any(getattr(message, "type", None) == "ai" for message in earlier_messages):
+            return None, []
+        return user_message, turn_messages
+
+    @staticmethod
+    def _cached_response_id(turn_id: str) -> str:
+        """Get the id of the cached response message of a turn."""
+        return f"response-cache-{turn_id}"
+
+    def _lookup_cached_response(
+        self, state: GraphState, last_order: Optional[dict], turn_id: Optional[str] = None
+    ) -> Optional[AIMessage]:
+        """
+        Busca en la caché de respuestas una respuesta para el mensaje actual.
+
+        Solo aplica si la caché está habilitada, el cliente no tiene un pedido abierto y es el
+        primer turno de la conversación (`_cacheable_turn`). El mensaje devuelto lleva el id del turno para que el streaming lo distinga de las
+        respuestas de caché de turnos anteriores que siguen en el historial.
+        """
+        if not settings.RESPONSE_CACHE_ENABLED or last_order:
+            return None
+        user_message, _ = self._cacheable_turn(state)
+        if user_message is None:
+            return None
+
+        client_name = (state.customer_context or {}).get("name") or "Cliente"
+        content = response_cache.get(
+            str(user_message.content), "conversation_agent", self._response_cache_version(), client_name
+        )
+        if content is None:
+            return None
+        logger.info("response_cache_hit", session_id=state.session_id)
+        return AIMessage(
+            id=self._cached_response_id(turn_id or str(uuid.uuid4())),
+            content=content,
+            response_metadata={"response_cache": "hit"},
+        )
+
+    def _store_cached_response(self, state: GraphState, ai_message: AIMessage, client_name: Optional[str]) -> None:
+        """
+        Guarda la respuesta de conversation_agent si el turno es apto para la caché.
+
+        Apto: primer turno de la conversación, sin llamadas a herramientas ni mensajes de sistema
+        en el turno y sin pedido abierto.
+        """
+        if not settings.RESPONSE_CACHE_ENABLED or ai_message.tool_calls or not ai_message.content:
+            return
+        if get_last_order_from_context(state.customer_context):
+            return
+        user_message, turn_messages = self._cacheable_turn(state)
+        if user_message is None or turn_messages:
+            return
+        response_cache.set(
+            str(user_message.content),
+            "conversation_agent",
+            self._response_cache_version(),
+            ai_message.content,
+            client_name or "Cliente",
+        )
+
+    async def _orchestrator(self, state: GraphState, config: Optional[RunnableConfig] = None) -> GraphState:
         """
         Nodo orquestador que detecta la intención del mensaje del usuario usando el LLM y redirige al agente adecuado.
         Verifica si el cliente tiene una orden pendiente antes de permitir nuevos pedidos.
@@ -309,175 +581,31 @@ class LangGraphAgent:
         print("\033[92m[orchestrator] Entrando al orquestador\033[0m")
         #print(f"\033[92mHistorial de nodos: {state.node_history}\033[0m")
 
-        # Obtener la última orden del cliente si hay un número de teléfono
-        last_order_info = "No hay información de órdenes previas."
-        if state.phone:
-            try:
-                order_service = OrderService()
-                last_order = await order_service.get_last_order(state.phone)
-                #print(f"\033[96m[last_order]: {last_order}\033[0m")
-                if last_order:
-                    product_info = [
-                        f"{product['name']} - Cantidad: {product['quantity']} - Precio: ${product['unit_price']} - Subtotal: ${product['subtotal']}"
-                        for product in last_order['products']
-                    ]
-                    
-                    last_order_info = f"""
-                    Estado de la última orden: {last_order['status']}
-                    Fecha: {last_order['created_at']}
-                    Dirección: {last_order.get('address', 'No disponible')}
-                    
-                    Productos:
-                    {chr(10).join(f"- {item}" for item in product_info)}
-                    
-                    Total: ${last_order['total_amount']}
-                    """
-            except Exception as e:
-                print(f"\033[93mError al obtener la última orden: {str(e)}\033[0m")
+        # Última orden del cliente desde el contexto cargado al inicio del turno
+        last_order = get_last_order_from_context(state.customer_context)
+        last_order_info = format_last_order_info(last_order)
 
         # Verificar el último nodo visitado
         if state.node_history:
             last_node = state.node_history[-1]
             if last_node == "order_data_agent":
-                # Si ya se usó la tool confirm_product, usar el modelo para detectar la intención
+                # Si ya se usó la tool confirm_product, detectar la intención del usuario
                 if len(state.messages) >= 4:
                     last_message = state.messages[-4]
                     if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
                         for tool_call in last_message.tool_calls:
                             if tool_call["name"] == "confirm_product":
                                 print("\033[93mPedido creado, detectando intención del usuario\033[0m")
-                                # Preparar el prompt para el LLM
-                                current_time = current_colombian_time()
-                                formatted_prompt = SYSTEM_PROMPT_ORCHESTRATOR.format(
-                                    agent_name="Orchestrator",
-                                    last_order_info=last_order_info,
-                                    current_date_and_time=current_time
-                                )
-                                
-                                # Limitar mensajes a los últimos 10
-                                recent_messages = state.messages[-10:] if len(state.messages) > 10 else state.messages
-                                messages = prepare_messages(recent_messages, self.llm, formatted_prompt)
-
-                                # Invocar el modelo para obtener la intención
-                                response = await self.llm.ainvoke(dump_messages(messages))
-                                
-                                try:
-                                    # Obtener el contenido de la respuesta
-                                    content = response.content.strip()
-                                    
-                                    # Intentar extraer el nodo de diferentes formatos posibles
-                                    intent = None
-                                    
-                                    # Si es un JSON string, intentar parsearlo
-                                    if content.startswith('{') or content.startswith('```json'):
-                                        import json
-                                        # Limpiar el string de markdown si es necesario
-                                        json_str = content.replace('```json', '').replace('```', '').strip()
-                                        try:
-                                            parsed = json.loads(json_str)
-                                            # Intentar obtener el nodo de diferentes claves posibles
-                                            intent = parsed.get('node') or parsed.get('intention') or parsed.get('response')
-                                        except json.JSONDecodeError:
-                                            pass
-                                    
-                                    # Si no se pudo obtener el nodo del JSON, intentar extraerlo directamente
-                                    if not intent:
-                                        # Buscar uno de los nodos válidos en el texto
-                                        valid_nodes = ["order_data_agent", "conversation_agent", "update_order_agent", "pqrs_agent", "send_menu"]
-                                        for node in valid_nodes:
-                                            if node in content:
-                                                intent = node
-                                                break
-                                    
-                                    # Si la intención es order_data_agent o update_order_agent, redirigir a update_order_agent
-                                    if intent in ["order_data_agent", "update_order_agent"]:
-                                        # Verificar si el pedido está en estado pending
-                                        try:
-                                            order_service = OrderService()
-                                            last_order = await order_service.get_last_order(state.phone)
-                                            
-                                            if last_order and last_order['status'] == "pending":
-                                                print("\033[93mUsuario quiere añadir más productos, redirigiendo a update_order_agent\033[0m")
-                                                state.node_history.append("update_order_agent")
-                                                return state
-                                            else:
-                                                current_status = last_order['status'] if last_order and 'status' in last_order else "no disponible"
-                                                print(f"\033[93mEl pedido no está en estado 'pending', está en estado '{current_status}'. No se puede modificar. Redirigiendo a conversation_agent\033[0m")
-                                                
-                                                # Añadir un mensaje al sistema para informar al usuario
-                                                state.messages.append({
-                                                    "role": "system",
-                                                    "content": f"El pedido ya no se puede modificar porque está en estado {current_status}. Informa al cliente sobre el estado actual sin ofrecer automáticamente ayuda para crear un nuevo pedido. Deja que el cliente decida si quiere hacer un nuevo pedido y te lo solicite explícitamente."
-                                                })
-                                                
-                                                state.node_history.append("conversation_agent")
-                                                return state
-                                        except Exception as e:
-                                            print(f"\033[93mError al verificar el estado del pedido: {str(e)}\033[0m")
-                                            state.node_history.append("conversation_agent")
-                                            return state
-                                    else:
-                                        print("\033[93mRedirigiendo a conversation_agent\033[0m")
-                                        state.node_history.append("conversation_agent")
-                                        return state
-                                        
-                                except Exception as e:
-                                    print(f"\033[93mError al procesar la respuesta: {str(e)}\033[0m")
-                                state.node_history.append("conversation_agent")
-                                return state
+                                intent = await self._detect_intent(state, last_order_info)
+                                return self._route_after_order_write(state, intent, last_order)
                 print("\033[93mRedirigiendo a order_data_agent por ser el último nodo visitado\033[0m")
                 
                 # Añadir detección de intención para ver si quiere el menú
-                current_time = current_colombian_time()
-                formatted_prompt = SYSTEM_PROMPT_ORCHESTRATOR.format(
-                    agent_name="Orchestrator",
-                    last_order_info=last_order_info,
-                    current_date_and_time=current_time
-                )
-                
-                # Limitar mensajes a los últimos 10
-                recent_messages = state.messages[-10:] if len(state.messages) > 10 else state.messages
-                messages = prepare_messages(recent_messages, self.llm, formatted_prompt)
-
-                # Invocar el modelo para obtener la intención
-                response = await self.llm.ainvoke(dump_messages(messages))
-                print(f"\033[96m[orchestrator response]: {response}\033[0m")    
-                
-                try:
-                    # Obtener el contenido de la respuesta
-                    content = response.content.strip()
-                    
-                    # Intentar extraer el nodo de diferentes formatos posibles
-                    intent = None
-                    
-                    # Si es un JSON string, intentar parsearlo
-                    if content.startswith('{') or content.startswith('```json'):
-                        import json
-                        # Limpiar el string de markdown si es necesario
-                        json_str = content.replace('```json', '').replace('```', '').strip()
-                        try:
-                            parsed = json.loads(json_str)
-                            # Intentar obtener el nodo de diferentes claves posibles
-                            intent = parsed.get('node') or parsed.get('intention') or parsed.get('response')
-                        except json.JSONDecodeError:
-                            pass
-                    
-                    # Si no se pudo obtener el nodo del JSON, intentar extraerlo directamente
-                    if not intent:
-                        # Buscar uno de los nodos válidos en el texto
-                        valid_nodes = ["order_data_agent", "conversation_agent", "update_order_agent", "pqrs_agent", "send_menu"]
-                        for node in valid_nodes:
-                            if node in content:
-                                intent = node
-                                break
-                    
-                    # Si la intención es ver el menú, redirigir a conversation_agent
-                    if intent == "send_menu":
-                        print("\033[93mUsuario quiere ver el menú, redirigiendo a conversation_agent\033[0m")
-                        state.node_history.append("conversation_agent")
-                        return state
-                except Exception as e:
-                    print(f"\033[93mError al procesar la respuesta: {str(e)}\033[0m")
+                intent = await self._detect_intent(state, last_order_info)
+                if intent == "send_menu":
+                    print("\033[93mUsuario quiere ver el menú, redirigiendo a conversation_agent\033[0m")
+                    state.node_history.append("conversation_agent")
+                    return state
                 
                 # Si no se detectó intención de menú, seguir con order_data_agent
                 state.node_history.append("order_data_agent")
@@ -492,249 +620,45 @@ class LangGraphAgent:
                         for tool_call in fourth_last_message.tool_calls:
                             if tool_call["name"] == "add_products_to_order":
                                 print("\033[93mProductos añadidos a la orden, detectando intención del usuario\033[0m")
-                                # Preparar el prompt para el LLM
-                                current_time = current_colombian_time()
-                                formatted_prompt = SYSTEM_PROMPT_ORCHESTRATOR.format(
-                                    agent_name="Orchestrator",
-                                    last_order_info=last_order_info,
-                                    current_date_and_time=current_time
-                                )
-                                
-                                # Limitar mensajes a los últimos 10
-                                recent_messages = state.messages[-10:] if len(state.messages) > 10 else state.messages
-                                messages = prepare_messages(recent_messages, self.llm, formatted_prompt)
-
-                                # Invocar el modelo para obtener la intención
-                                response = await self.llm.ainvoke(dump_messages(messages))
-                                print(f"\033[96m[orchestrator response]: {response}\033[0m")    
-                                
-                                try:
-                                    # Obtener el contenido de la respuesta
-                                    content = response.content.strip()
-                                    
-                                    # Intentar extraer el nodo de diferentes formatos posibles
-                                    intent = None
-                                    
-                                    # Si es un JSON string, intentar parsearlo
-                                    if content.startswith('{') or content.startswith('```json'):
-                                        import json
-                                        # Limpiar el string de markdown si es necesario
-                                        json_str = content.replace('```json', '').replace('```', '').strip()
-                                        try:
-                                            parsed = json.loads(json_str)
-                                            # Intentar obtener el nodo de diferentes claves posibles
-                                            intent = parsed.get('node') or parsed.get('intention') or parsed.get('response')
-                                        except json.JSONDecodeError:
-                                            pass
-                                    
-                                    # Si no se pudo obtener el nodo del JSON, intentar extraerlo directamente
-                                    if not intent:
-                                        # Buscar uno de los nodos válidos en el texto
-                                        valid_nodes = ["order_data_agent", "conversation_agent", "update_order_agent", "pqrs_agent", "send_menu"]
-                                        for node in valid_nodes:
-                                            if node in content:
-                                                intent = node
-                                                break
-                                    
-                                    # Si la intención es order_data_agent o update_order_agent, redirigir a update_order_agent
-                                    if intent in ["order_data_agent", "update_order_agent"]:
-                                        # Verificar si el pedido está en estado pending
-                                        try:
-                                            order_service = OrderService()
-                                            last_order = await order_service.get_last_order(state.phone)
-                                            
-                                            if last_order and last_order['status'] == "pending":
-                                                print("\033[93mUsuario quiere añadir más productos, redirigiendo a update_order_agent\033[0m")
-                                                state.node_history.append("update_order_agent")
-                                                return state
-                                            else:
-                                                current_status = last_order['status'] if last_order and 'status' in last_order else "no disponible"
-                                                print(f"\033[93mEl pedido no está en estado 'pending', está en estado '{current_status}'. No se puede modificar. Redirigiendo a conversation_agent\033[0m")
-                                                
-                                                # Añadir un mensaje al sistema para informar al usuario
-                                                state.messages.append({
-                                                    "role": "system",
-                                                    "content": f"El pedido ya no se puede modificar porque está en estado {current_status}. Informa al cliente sobre el estado actual sin ofrecer automáticamente ayuda para crear un nuevo pedido. Deja que el cliente decida si quiere hacer un nuevo pedido y te lo solicite explícitamente."
-                                                })
-                                                
-                                                state.node_history.append("conversation_agent")
-                                                return state
-                                        except Exception as e:
-                                            print(f"\033[93mError al verificar el estado del pedido: {str(e)}\033[0m")
-                                            state.node_history.append("conversation_agent")
-                                            return state
-                                    else:
-                                        print("\033[93mRedirigiendo a conversation_agent\033[0m")
-                                        state.node_history.append("conversation_agent")
-                                        return state
-                                        
-                                except Exception as e:
-                                    print(f"\033[93mError al procesar la respuesta: {str(e)}\033[0m")
-                                state.node_history.append("conversation_agent")
-                                return state
+                                intent = await self._detect_intent(state, last_order_info)
+                                return self._route_after_order_write(state, intent, last_order)
                 print("\033[93mRedirigiendo a update_order_agent por ser el último nodo visitado\033[0m")
                 
                 # Añadir detección de intención para ver si quiere el menú
-                current_time = current_colombian_time()
-                formatted_prompt = SYSTEM_PROMPT_ORCHESTRATOR.format(
-                    agent_name="Orchestrator",
-                    last_order_info=last_order_info,
-                    current_date_and_time=current_time
-                )
-                
-                # Limitar mensajes a los últimos 10
-                recent_messages = state.messages[-10:] if len(state.messages) > 10 else state.messages
-                messages = prepare_messages(recent_messages, self.llm, formatted_prompt)
-
-                # Invocar el modelo para obtener la intención
-                response = await self.llm.ainvoke(dump_messages(messages))
-                #print(f"\033[96m[orchestrator response]: {response}\033[0m")    
-                
-                try:
-                    # Obtener el contenido de la respuesta
-                    content = response.content.strip()
-                    
-                    # Intentar extraer el nodo de diferentes formatos posibles
-                    intent = None
-                    
-                    # Si es un JSON string, intentar parsearlo
-                    if content.startswith('{') or content.startswith('```json'):
-                        import json
-                        # Limpiar el string de markdown si es necesario
-                        json_str = content.replace('```json', '').replace('```', '').strip()
-                        try:
-                            parsed = json.loads(json_str)
-                            # Intentar obtener el nodo de diferentes claves posibles
-                            intent = parsed.get('node') or parsed.get('intention') or parsed.get('response')
-                        except json.JSONDecodeError:
-                            pass
-                    
-                    # Si no se pudo obtener el nodo del JSON, intentar extraerlo directamente
-                    if not intent:
-                        # Buscar uno de los nodos válidos en el texto
-                        valid_nodes = ["order_data_agent", "conversation_agent", "update_order_agent", "pqrs_agent", "send_menu"]
-                        for node in valid_nodes:
-                            if node in content:
-                                intent = node
-                                break
-                    
-                    # Si la intención es ver el menú, redirigir a conversation_agent
-                    if intent == "send_menu":
-                        print("\033[93mUsuario quiere ver el menú, redirigiendo a conversation_agent\033[0m")
-                        state.node_history.append("conversation_agent")
-                        return state
-                except Exception as e:
-                    print(f"\033[93mError al procesar la respuesta: {str(e)}\033[0m")
+                intent = await self._detect_intent(state, last_order_info)
+                if intent == "send_menu":
+                    print("\033[93mUsuario quiere ver el menú, redirigiendo a conversation_agent\033[0m")
+                    state.node_history.append("conversation_agent")
+                    return state
                 
                 # Si no se detectó intención de menú, seguir con update_order_agent
                 # Verificar si el pedido está en estado pending antes de redirigir
-                try:
-                    order_service = OrderService()
-                    last_order = await order_service.get_last_order(state.phone)
-                    
-                    if last_order and last_order['status'] == "pending":
-                        state.node_history.append("update_order_agent")
-                        return state
-                    else:
-                        current_status = last_order['status'] if last_order and 'status' in last_order else "no disponible"
-                        print(f"\033[93mEl pedido no está en estado 'pending', está en estado '{current_status}'. No se puede modificar. Redirigiendo a conversation_agent\033[0m")
-                        
-                        # Añadir un mensaje al sistema para informar al usuario
-                        state.messages.append({
-                            "role": "system",
-                            "content": f"El pedido ya no se puede modificar porque está en estado {current_status}. Informa al cliente sobre el estado actual sin ofrecer automáticamente ayuda para crear un nuevo pedido. Deja que el cliente decida si quiere hacer un nuevo pedido y te lo solicite explícitamente."
-                        })
-                        
-                        intent = "conversation_agent"
-                except Exception as e:
-                    print(f"\033[93mError al verificar el estado del pedido: {str(e)}\033[0m")
-                    state.node_history.append("conversation_agent")
+                if last_order and last_order['status'] == "pending":
+                    state.node_history.append("update_order_agent")
                     return state
+                self._notify_order_not_editable(state, last_order)
 
-        # Preparar el prompt para el LLM con la información de la orden
-        current_time = current_colombian_time()
-        formatted_prompt = SYSTEM_PROMPT_ORCHESTRATOR.format(
-            agent_name="Orchestrator",
-            last_order_info=last_order_info,
-            current_date_and_time=current_time
-        )
-        
-        # Limitar mensajes a los últimos 10
-        recent_messages = state.messages[-10:] if len(state.messages) > 10 else state.messages
-        messages = prepare_messages(recent_messages, self.llm, formatted_prompt)
-
-        # Invocar el modelo para obtener la intención
-        response = await self.llm.ainvoke(dump_messages(messages))
-        #print(f"\033[96m[orchestrator response]: {response}\033[0m")    
-        
-        try:
-            # Obtener el contenido de la respuesta
-            content = response.content.strip()
-            
-            # Intentar extraer el nodo de diferentes formatos posibles
-            intent = None
-            
-            # Si es un JSON string, intentar parsearlo
-            if content.startswith('{') or content.startswith('```json'):
-                import json
-                # Limpiar el string de markdown si es necesario
-                json_str = content.replace('```json', '').replace('```', '').strip()
-                try:
-                    parsed = json.loads(json_str)
-                    # Intentar obtener el nodo de diferentes claves posibles
-                    intent = parsed.get('node') or parsed.get('intention') or parsed.get('response')
-                except json.JSONDecodeError:
-                    pass
-            
-            # Si no se pudo obtener el nodo del JSON, intentar extraerlo directamente
-            if not intent:
-                # Buscar uno de los nodos válidos en el texto
-                valid_nodes = ["order_data_agent", "conversation_agent", "update_order_agent", "pqrs_agent", "send_menu"]
-                for node in valid_nodes:
-                    if node in content:
-                        intent = node
-                        break
-            
-            # Si no se encontró un nodo válido, usar conversation_agent como fallback
-            if not intent or intent not in valid_nodes:
-                print("\033[93mNodo no válido detectado, usando conversation_agent como fallback\033[0m")
-                intent = "conversation_agent"
-                
-        except Exception as e:
-            print(f"\033[93mError al procesar la respuesta: {str(e)}\033[0m")
-            intent = "conversation_agent"
+        # Caché de respuestas: preguntas frecuentes ya respondidas no pasan por ningún LLM
+        turn_id = ((config or {}).get("configurable") or {}).get("turn_id")
+        cached_message = self._lookup_cached_response(state, last_order, turn_id)
+        if cached_message is not None:
+            # Solo la actualización: devolver el estado completo reemitiría todo el historial en streaming
+            return {"messages": [cached_message], "node_history": state.node_history + ["cached_response"]}
 
+        intent = await self._detect_intent(state, last_order_info)
         print(f"\033[96m[orchestrator intent detected]: {intent}\033[0m")
 
         # Verificar si hay una orden pendiente antes de permitir nuevos pedidos
         if intent == "order_data_agent" and state.phone:
-            last_order = await order_service.get_last_order(state.phone)
             if last_order and last_order['status'] == "pending":
                 print("\033[93mCliente tiene una orden pendiente, redirigiendo a update_order_agent\033[0m")
                 intent = "update_order_agent"
         
         # Verificar si la intención es update_order_agent y si el pedido está en estado pending
         if intent == "update_order_agent" and state.phone:
-            try:
-                order_service = OrderService()
-                last_order = await order_service.get_last_order(state.phone)
-                
-                # Solo permitir update_order_agent si el pedido está en estado pending
-                if not last_order or last_order['status'] != "pending":
-                    current_status = last_order['status'] if last_order and 'status' in last_order else "no disponible"
-                    print(f"\033[93mEl pedido no está en estado 'pending', está en estado '{current_status}'. No se puede modificar. Redirigiendo a conversation_agent\033[0m")
-                    
-                    # Añadir un mensaje al sistema para informar al usuario
-                    state.messages.append({
-                        "role": "system",
-                        "content": f"El pedido ya no se puede modificar porque está en estado {current_status}. Informa al cliente sobre el estado actual sin ofrecer automáticamente ayuda para crear un nuevo pedido. Deja que el cliente decida si quiere hacer un nuevo pedido y te lo solicite explícitamente."
-                    })
-                    
-                    state.node_history.append("conversation_agent")
-                    intent = "conversation_agent"
-            except Exception as e:
-                print(f"\033[93mError al verificar el estado del pedido: {str(e)}\033[0m")
-                # En caso de error, es más seguro redirigir a conversation_agent
+            # Solo permitir update_order_agent si el pedido está en estado pending
+            if not last_order or last_order['status'] != "pending":
+                self._notify_order_not_editable(state, last_order)
                 intent = "conversation_agent"
         
         # Si la intención es ver el menú, redirigir a conversation_agent
@@ -742,10 +666,9 @@ class LangGraphAgent:
             print("\033[93mUsuario quiere ver el menú, redirigiendo a conversation_agent\033[0m")
             
             # Guardar información especial para que conversation_agent sepa que debe mostrar el menú
-            state.messages.append({
-                "role": "system",
-                "content": "El usuario ha solicitado ver el menú. Por favor, envíale el menú utilizando las herramientas disponibles."
-            })
+            state.messages.append(SystemMessage(
+                content="El usuario ha solicitado ver el menú. Por favor, envíale el menú utilizando las herramientas disponibles."
+            ))
             
             intent = "conversation_agent"
 
@@ -759,46 +682,28 @@ class LangGraphAgent:
         print("\033[92m[conversation_agent] Entrando al agente de conversación\033[0m")
         #print(f"\033[92mHistorial de nodos: {state.node_history}\033[0m")
 
-        # Obtener el nombre del cliente y la dirección del último pedido si están disponibles
-        client_name = None
-        if state.phone:
-            try:
-                user_details = await database_service.get_user_details_with_latest_order(state.phone)
-                print(f"\033[96m[User details from database]: {user_details}\033[0m")
-                if user_details and user_details["name"]:
-                    client_name = user_details["name"]
-                    print(f"\033[96m[Nombre del cliente detectado]: {client_name}\033[0m")
-            except Exception as e:
-                print(f"\033[93mError al obtener detalles del usuario: {str(e)}\033[0m")
+        # Obtener el nombre del cliente desde el contexto del turno
+        customer_context = state.customer_context or {}
+        client_name = customer_context.get("name")
+        if client_name:
+            print(f"\033[96m[Nombre del cliente detectado]: {client_name}\033[0m")
 
-        # Formatear el prompt con el nombre del cliente y la fecha actual
-        current_time = current_colombian_time()
-        formatted_prompt = SYSTEM_PROMPT_CONVERSATION.format(
-            client_name=client_name or "Cliente",
-            current_date_and_time=current_time
-        )
-        
-        # Mostrar las primeras 200 caracteres del prompt formateado para depuración
-        prompt_preview = formatted_prompt[:200] + "..." if len(formatted_prompt) > 200 else formatted_prompt
-        #print(f"\033[95m[Prompt formateado preview]: {prompt_preview}\033[0m")
-        
-        # Verificar explícitamente si el nombre del cliente está en el prompt
-        if client_name and client_name in formatted_prompt:
-            print(f"\033[92m[✓] Nombre '{client_name}' incluido en el prompt\033[0m")
-        else:
-            print(f"\033[91m[✗] Nombre del cliente NO encontrado en el prompt formateado\033[0m")
+        # Contexto del turno con el nombre del cliente y la fecha actual
+        turn_context = build_turn_context(client_name=client_name or "Cliente")
 
         # Limitar mensajes a los últimos 10
         recent_messages = state.messages[-10:] if len(state.messages) > 10 else state.messages
-        messages = prepare_messages(recent_messages, self.llm, formatted_prompt)
+        messages = build_prompt_messages(SYSTEM_PROMPT_CONVERSATION, recent_messages, turn_context, state.token_counts)
         
         # Mostrar los primeros mensajes para depuración
         if messages:
             first_message = messages[0]
             print(f"\033[95m[Primer mensaje enviado al LLM]: Tipo: {type(first_message)}, Contenido: {str(first_message)[:200]}...\033[0m")
         
-        llm_with_tools = self.llm.bind_tools(self.agent_tools["conversation_agent"])
+        llm_with_tools = self.agent_llms["conversation_agent"]
         ai_message = await llm_with_tools.ainvoke(dump_messages(messages))
+        prompt_cache_stats.record("conversation_agent", ai_message)
+        self._store_cached_response(state, ai_message, client_name)
         if hasattr(ai_message, 'tool_calls') and ai_message.tool_calls:
             for tool_call in ai_message.tool_calls:
                 if tool_call["name"] == "get_last_order":
@@ -822,63 +727,28 @@ class LangGraphAgent:
         print("\033[92m[order_data_agent] Entrando al agente de datos de pedido\033[0m")
         #print(f"\033[92mHistorial de nodos: {state.node_history}\033[0m")
         
-        # Obtener el nombre del cliente y la dirección del último pedido si están disponibles
-        client_name = None
-        previous_address = None
-        if state.phone:
-            try:
-                user_details = await database_service.get_user_details_with_latest_order(state.phone)
-                # Imprimir la estructura completa para depuración
-                print(f"\033[96m[User details from database (COMPLETO)]: {user_details}\033[0m")
-                
-                if user_details and user_details["name"]:
-                    client_name = user_details["name"]
-                    print(f"\033[96m[Nombre del cliente detectado]: {client_name}\033[0m")
-                
-                # Verificar todas las posibles ubicaciones de la dirección
-                if user_details:
-                    # Intento 1: Dirección en el nivel principal
-                    if "address" in user_details and user_details["address"]:
-                        previous_address = user_details["address"]
-                        print(f"\033[96m[Dirección encontrada en nivel principal]: {previous_address}\033[0m")
-                    
-                    # Intento 2: Dirección dentro de "order"
-                    elif "order" in user_details and user_details["order"] and "address" in user_details["order"]:
-                        previous_address = user_details["order"]["address"]
-                        print(f"\033[96m[Dirección encontrada en 'order']: {previous_address}\033[0m")
-                    
-                    # Intento 3: Dirección dentro de "has_order"
-                    elif "has_order" in user_details and user_details["has_order"] and "order" in user_details:
-                        if "address" in user_details["order"]:
-                            previous_address = user_details["order"]["address"]
-                            print(f"\033[96m[Dirección encontrada en 'order' con has_order=True]: {previous_address}\033[0m")
-                    
-                    # Si no se encuentra la dirección
-                    if not previous_address:
-                        print("\033[93m[ADVERTENCIA] No se pudo encontrar la dirección en los detalles del usuario\033[0m")
-                else:
-                    print("\033[93m[ADVERTENCIA] No se encontraron detalles del usuario\033[0m")
-                    
-            except Exception as e:
-                print(f"\033[93mError al obtener detalles del usuario: {str(e)}\033[0m")
+        # Obtener el nombre del cliente y la dirección del último pedido desde el contexto del turno
+        customer_context = state.customer_context or {}
+        client_name = customer_context.get("name")
+        previous_address = customer_context.get("address")
+        if client_name:
+            print(f"\033[96m[Nombre del cliente detectado]: {client_name}\033[0m")
+        if not previous_address:
+            print("\033[93m[ADVERTENCIA] No se pudo encontrar la dirección en el contexto del cliente\033[0m")
         
-        # Formatear el prompt con los datos del cliente y la fecha actual
-        current_time = current_colombian_time()
-        formatted_prompt = SYSTEM_PROMPT_ORDER_DATA.format(
+        # Contexto del turno con los datos del cliente y la fecha actual
+        turn_context = build_turn_context(
             client_name=client_name or "Cliente",
             previous_address=previous_address or "No disponible",
-            current_date_and_time=current_time
         )
-        
-        # Mostrar las primeras 200 caracteres del prompt formateado para depuración
-        prompt_preview = formatted_prompt[:200] + "..." if len(formatted_prompt) > 200 else formatted_prompt
-        print(f"\033[95m[Prompt formateado preview]: {prompt_preview}\033[0m")
+        print(f"\033[95m[Contexto del turno]: {turn_context}\033[0m")
         
         # Limitar mensajes a los últimos 10
         recent_messages = state.messages[-10:] if len(state.messages) > 10 else state.messages
-        messages = prepare_messages(recent_messages, self.llm, formatted_prompt)
-        llm_with_tools = self.llm.bind_tools(self.agent_tools["order_data_agent"])
+        messages = build_prompt_messages(SYSTEM_PROMPT_ORDER_DATA, recent_messages, turn_context, state.token_counts)
+        llm_with_tools = self.agent_llms["order_data_agent"]
         response_msg = await llm_with_tools.ainvoke(dump_messages(messages))
+        prompt_cache_stats.record("order_data_agent", response_msg)
         
         # Verificar y procesar llamadas a herramientas
         if hasattr(response_msg, 'tool_calls') and response_msg.tool_calls:
@@ -900,7 +770,7 @@ class LangGraphAgent:
                     # Asegurar que se incluye el teléfono
                     arguments["phone"] = state.phone
         
-        generated_state = {"messages": [response_msg]}
+        generated_state = {"messages": [response_msg], "token_counts": state.token_counts}
         logger.info(
             "llm_response_generated",
             session_id=state.session_id,
@@ -918,62 +788,20 @@ class LangGraphAgent:
         print("\033[92m[update_order_agent] Entrando al agente de actualización de pedidos\033[0m")
         print(f"\033[92mHistorial de nodos: {state.node_history}\033[0m")
         
-        # Obtener el nombre del cliente
-        client_name = None
-        if state.phone:
-            try:
-                user_details = await database_service.get_user_details_with_latest_order(state.phone)
-                print(f"\033[96m[User details from database]: {user_details}\033[0m")
-                if user_details and user_details["name"]:
-                    client_name = user_details["name"]
-                    print(f"\033[96m[Nombre del cliente detectado]: {client_name}\033[0m")
-            except Exception as e:
-                print(f"\033[93mError al obtener detalles del usuario: {str(e)}\033[0m")
-        
-        # Obtener la última orden del cliente
-        last_order_info = "No hay información de órdenes previas."
-        if state.phone:
-            try:
-                order_service = OrderService()
-                last_order = await order_service.get_last_order(state.phone)
-                #print(f"\033[96m[last_order]: {last_order}\033[0m")
-                if last_order:
-                    product_info = [
-                        f"{product['name']} - Cantidad: {product['quantity']} - Precio: ${product['unit_price']} - Subtotal: ${product['subtotal']}"
-                        for product in last_order['products']
-                    ]
-                    
-                    last_order_info = f"""
-                    Estado de la última orden: {last_order['status']}
-                    Fecha: {last_order['created_at']}
-                    Dirección: {last_order.get('address', 'No disponible')}
-                    
-                    Productos:
-                    {chr(10).join(f"- {item}" for item in product_info)}
-                    
-                    Total: ${last_order['total_amount']}
-                    """
-                    print(f"\033[96m[last_order_info]: {last_order_info}\033[0m")
-            except Exception as e:
-                print(f"\033[93mError al obtener la última orden: {str(e)}\033[0m")
+        # Obtener el nombre del cliente y su última orden desde el contexto del turno
+        customer_context = state.customer_context or {}
+        client_name = customer_context.get("name")
+        last_order_info = format_last_order_info(get_last_order_from_context(customer_context))
 
-        # Preparar el prompt con la información de la orden
-        current_time = current_colombian_time()
-        formatted_prompt = SYSTEM_PROMPT_UPDATE_ORDER.format(
-            client_name=client_name or "Cliente",
-            last_order_info=last_order_info,
-            current_date_and_time=current_time
-        )
-        
-        # Mostrar las primeras 200 caracteres del prompt formateado para depuración
-        prompt_preview = formatted_prompt[:200] + "..." if len(formatted_prompt) > 200 else formatted_prompt
-        #print(f"\033[95m[Prompt formateado preview]: {prompt_preview}\033[0m")
+        # Contexto del turno con la información de la orden
+        turn_context = build_turn_context(client_name=client_name or "Cliente", last_order_info=last_order_info)
         
         # Limitar mensajes a los últimos 10
         recent_messages = state.messages[-10:] if len(state.messages) > 10 else state.messages
-        messages = prepare_messages(recent_messages, self.llm, formatted_prompt)
-        llm_with_tools = self.llm.bind_tools(self.agent_tools["update_order_agent"])
+        messages = build_prompt_messages(SYSTEM_PROMPT_UPDATE_ORDER, recent_messages, turn_context, state.token_counts)
+        llm_with_tools = self.agent_llms["update_order_agent"]
         response_msg = await llm_with_tools.ainvoke(dump_messages(messages))
+        prompt_cache_stats.record("update_order_agent", response_msg)
         
         # Verificar y procesar llamadas a herramientas
         if hasattr(response_msg, 'tool_calls') and response_msg.tool_calls:
@@ -1007,7 +835,7 @@ class LangGraphAgent:
                         # Establecer un diccionario vacío como valor por defecto para evitar errores
                         tool_call["args"]["new_data"] = {}
         
-        generated_state = {"messages": [response_msg]}
+        generated_state = {"messages": [response_msg], "token_counts": state.token_counts}
         logger.info(
             "llm_response_generated",
             session_id=state.session_id,
@@ -1023,9 +851,11 @@ class LangGraphAgent:
         Agente especializado en gestión de PQRS.
         """
         print("\033[92m[pqrs_agent]\033[0m")
-        messages = prepare_messages(state.messages, self.llm, SYSTEM_PROMPT_PQRS)
-        llm_with_tools = self.llm.bind_tools(self.agent_tools["pqrs_agent"])
-        generated_state = {"messages": [await llm_with_tools.ainvoke(dump_messages(messages))]}
+        messages = build_prompt_messages(SYSTEM_PROMPT_PQRS, state.messages, build_turn_context(), state.token_counts)
+        llm_with_tools = self.agent_llms["pqrs_agent"]
+        response_msg = await llm_with_tools.ainvoke(dump_messages(messages))
+        prompt_cache_stats.record("pqrs_agent", response_msg)
+        generated_state = {"messages": [response_msg], "token_counts": state.token_counts}
         logger.info(
             "llm_response_generated",
             session_id=state.session_id,
@@ -1058,19 +888,22 @@ class LangGraphAgent:
             try:
                 builder = StateGraph(GraphState)
                 # Nodos principales
+                builder.add_node("load_customer_context", self._load_customer_context)
                 builder.add_node("orchestrator", self._orchestrator)
                 builder.add_node("conversation_agent", self.conversation_agent)
                 builder.add_node("order_data_agent", self.order_data_agent)
                 builder.add_node("update_order_agent", self.update_order_agent)
                 builder.add_node("pqrs_agent", self.pqrs_agent)
+                builder.add_node("compact_history", self._compact_history)
 
                 # Nodos de herramienta específicos
                 builder.add_node("conversation_tool_call", self._conversation_tool_call)
                 builder.add_node("order_data_tool_call", self._order_data_tool_call)
                 builder.add_node("update_order_tool_call", self._update_order_tool_call)
 
-                # Nodo de entrada
-                builder.set_entry_point("orchestrator")
+                # Nodo de entrada: cargar el contexto del cliente una sola vez por turno
+                builder.set_entry_point("load_customer_context")
+                builder.add_edge("load_customer_context", "orchestrator")
 
                 # Enrutamiento del orquestador
                 builder.add_conditional_edges(
@@ -1081,6 +914,7 @@ class LangGraphAgent:
                         "order_data_agent": "order_data_agent",
                         "update_order_agent": "update_order_agent",
                         "pqrs_agent": "pqrs_agent",
+                        "cached_response": "compact_history",
                     },
                 )
 
@@ -1088,7 +922,7 @@ class LangGraphAgent:
                 builder.add_conditional_edges(
                     "conversation_agent",
                     self._router,
-                    {"tool_node": "conversation_tool_call", "end": END},
+                    {"tool_node": "conversation_tool_call", "end": "compact_history"},
                 )
                 builder.add_edge("conversation_tool_call", "conversation_agent")
 
@@ -1096,7 +930,7 @@ class LangGraphAgent:
                 builder.add_conditional_edges(
                     "order_data_agent",
                     self._router,
-                    {"tool_node": "order_data_tool_call", "end": END},
+                    {"tool_node": "order_data_tool_call", "end": "compact_history"},
                 )
                 builder.add_edge("order_data_tool_call", "order_data_agent")
 
@@ -1104,14 +938,13 @@ class LangGraphAgent:
                 builder.add_conditional_edges(
                     "update_order_agent",
                     self._router,
-                    {"tool_node": "update_order_tool_call", "end": END},
+                    {"tool_node": "update_order_tool_call", "end": "compact_history"},
                 )
                 builder.add_edge("update_order_tool_call", "update_order_agent")
 
-                # Configurar puntos de finalización para cada agente
-                builder.set_finish_point("conversation_agent")
-                builder.set_finish_point("order_data_agent")
-                builder.set_finish_point("update_order_agent")
+                # Fin de turno: todos los agentes pasan por la compactación del historial
+                builder.add_edge("pqrs_agent", "compact_history")
+                builder.add_edge("compact_history", END)
 
                 # Get connection pool (may be None in production if DB unavailable)
                 connection_pool = await self._get_connection_pool()
@@ -1191,20 +1024,30 @@ class LangGraphAgent:
             raise e
 
     async def get_stream_response(
-        self, messages: list[Message], session_id: str, user_id: Optional[str] = None
+        self,
+        messages: list[Message],
+        session_id: str,
+        user_id: Optional[str] = None,
+        initial_state: Optional[dict] = None,
     ) -> AsyncGenerator[str, None]:
         """Get a stream response from the LLM.
 
+        Only the text generated by the user-facing agents is streamed: the orchestrator's
+        routing call and tool-call chunks are filtered out using the node metadata.
+
         Args:
             messages (list[Message]): The messages to send to the LLM.
             session_id (str): The session ID for the conversation.
             user_id (Optional[str]): The user ID for the conversation.
+            initial_state (Optional[dict]): Initial state to be passed to the graph.
 
         Yields:
             str: Tokens of the LLM response.
         """
+        # Id del turno: marca la respuesta de caché creada en esta llamada
+        turn_id = str(uuid.uuid4())
         config = {
-            "configurable": {"thread_id": session_id},
+            "configurable": {"thread_id": session_id, "turn_id": turn_id},
             "callbacks": [
                 CallbackHandler(
                     environment=settings.ENVIRONMENT.value, debug=False, user_id=user_id, session_id=session_id
@@ -1214,11 +1057,24 @@ class LangGraphAgent:
         if self._graph is None:
             self._graph = await self.create_graph()
 
+        state = {"messages": dump_messages(messages), "session_id": session_id}
+        if initial_state:
+            state.update(initial_state)
+
         try:
-            async for token, _ in self._graph.astream(
-                {"messages": dump_messages(messages), "session_id": session_id}, config, stream_mode="messages"
-            ):
+            async for token, metadata in self._graph.astream(state, config, stream_mode="messages"):
                 try:
+                    # Solo los tokens de texto de los agentes que responden al usuario
+                    # La respuesta de la caché llega como un mensaje completo desde el orquestador; las
+                    # de turnos anteriores también se reemiten desde el historial y se descartan por id
+                    if metadata.get("langgraph_node") == "orchestrator":
+                        if isinstance(token, AIMessage) and token.id == self._cached_response_id(turn_id):
+                            yield token.content
+                        continue
+                    if metadata.get("langgraph_node") not in self.streaming_nodes:
+                        continue
+                    if not isinstance(token, AIMessageChunk) or token.tool_call_chunks or not token.content:
+                        continue
                     yield token.content
                 except Exception as token_error:
                     logger.error("Error processing token", error=str(token_error), session_id=session_id)
@@ -0,0 +1,170 @@
+"""Clasificador local de intenciones para el orquestador.
+
+Clasifica los mensajes obvios ("menú", "ubicación", "¿dónde está mi pedido?", saludos)
+con puntuación de palabras clave y n-gramas en español, sin llamar al LLM. Si la
+confianza no supera el umbral configurado, devuelve `None` y el orquestador
+consulta el LLM como siempre.
+"""
+
+from typing import (
+    Dict,
+    NamedTuple,
+    Optional,
+)
+
+from core.config import settings
+from utils.text import normalize_text
+
+# Frases (ya normalizadas: minúsculas y sin tildes) y su peso para cada nodo destino.
+# Las frases de varias palabras se comparan como n-gramas completos.
+INTENT_KEYWORDS: Dict[str, Dict[str, float]] = {
+    "send_menu": {
+        "menu": 3.0,
+        "carta": 2.5,
+        "que tienen": 2.5,
+        "que hay": 2.0,
+        "que ofrecen": 2.5,
+        "que venden": 2.5,
+        "que platos": 2.5,
+        "platos": 1.0,
+        "almuerzo de hoy": 2.0,
+        "ejecutivo": 1.5,
+    },
+    "order_data_agent": {
+        "pedir": 2.5,
+        "quiero pedir": 1.5,
+        "hacer un pedido": 3.0,
+        "ordenar": 2.5,
+        "me regala": 2.0,
+        "me regalas": 2.0,
+        "me vende": 2.0,
+        "quiero una": 1.5,
+        "quiero un": 1.5,
+        "quisiera": 1.0,
+        "para llevar": 1.5,
+    },
+    "update_order_agent": {
+        "agregar": 3.0,
+        "agregale": 3.0,
+        "agregala": 3.0,
+        "anadir": 3.0,
+        "anadele": 3.0,
+        "adicionar": 3.0,
+        "sumale": 2.5,
+        "modificar": 3.0,
+        "cambiar": 2.5,
+        "cambiame": 2.5,
+        "quitar": 2.5,
+        "quitale": 2.5,
+        "otra mas": 1.5,
+        "en vez de": 2.0,
+    },
+    "pqrs_agent": {
+        "queja": 3.5,
+        "quejarme": 3.5,
+        "reclamo": 3.5,
+        "reclamar": 3.5,
+        "sugerencia": 3.5,
+        "peticion": 2.5,
+        "inconformidad": 3.5,
+        "inconforme": 3.5,
+        "mal servicio": 3.5,
+        "pesimo": 3.0,
+        "llego frio": 3.0,
+        "llego mal": 3.0,
+        "me cobraron de mas": 3.5,
+    },
+    "conversation_agent": {
+        "hola": 1.0,
+        "buenas": 1.0,
+        "buenos dias": 1.0,
+        "buenas tardes": 1.0,
+        "buenas noches": 1.0,
+        "gracias": 2.0,
+        "muchas gracias": 1.0,
+        "ubicacion": 3.0,
+        "donde estan": 3.0,
+        "donde quedan": 3.0,
+        "donde queda": 3.0,
+        "como llego": 3.0,
+        "horario": 3.0,
+        "a que hora": 3.0,
+        "abren": 2.0,
+        "cierran": 2.0,
+        "domicilios": 2.0,
+        "donde esta mi pedido": 4.0,
+        "estado de mi pedido": 4.0,
+        "como va mi pedido": 4.0,
+        "ya viene": 2.5,
+        "cuanto se demora": 3.0,
+        "cuanto falta": 3.0,
+        "mascotas": 2.5,
+        "pet friendly": 2.5,
+    },
+}
+
+_MAX_NGRAM = max(len(phrase.split()) for phrases in INTENT_KEYWORDS.values() for phrase in phrases)
+
+
+class IntentPrediction(NamedTuple):
+    """Resultado del clasificador local.
+
+    Attributes:
+        node: Nodo destino si la confianza supera el umbral, None si hay que consultar el LLM
+        confidence: Proporción del puntaje del mejor nodo sobre el puntaje total
+        scores: Puntaje acumulado por nodo
+    """
+
+    node: Optional[str]
+    confidence: float
+    scores: Dict[str, float]
+
+
+def _ngrams(tokens: list[str]) -> set[str]:
+    """Genera todos los n-gramas (1.._MAX_NGRAM) de la lista de tokens."""
+    grams = set()
+    for size in range(1, _MAX_NGRAM + 1):
+        for start in range(len(tokens) - size + 1):
+            grams.add(" ".join(tokens[start : start + size]))
+    return grams
+
+
+def classify_intent(
+    text: str,
+    threshold: Optional[float] = None,
+    min_score: Optional[float] = None,
+    max_words: Optional[int] = None,
+) -> IntentPrediction:
+    """Clasifica un mensaje del usuario en uno de los nodos del orquestador.
+
+    Args:
+        text: Mensaje del usuario
+        threshold: Confianza mínima para responder sin LLM (por defecto INTENT_CLASSIFIER_THRESHOLD)
+        min_score: Puntaje mínimo del mejor nodo (por defecto INTENT_CLASSIFIER_MIN_SCORE)
+        max_words: Mensajes más largos se delegan al LLM (por defecto INTENT_CLASSIFIER_MAX_WORDS)
+
+    Returns:
+        IntentPrediction: Nodo detectado (o None), confianza y puntajes por nodo
+    """
+    threshold = settings.INTENT_CLASSIFIER_THRESHOLD if threshold is None else threshold
+    min_score = settings.INTENT_CLASSIFIER_MIN_SCORE if min_score is None else min_score
+    max_words = settings.INTENT_CLASSIFIER_MAX_WORDS if max_words is None else max_words
+
+    tokens = normalize_text(text).split()
+    if not tokens or len(tokens) > max_words:
+        return IntentPrediction(None, 0.0, {})
+
+    grams = _ngrams(tokens)
+    scores = {
+        node: sum(weight for phrase, weight in phrases.items() if phrase in grams)
+        for node, phrases in INTENT_KEYWORDS.items()
+    }
+    total = sum(scores.values())
+    if not total:
+        return IntentPrediction(None, 0.0, scores)
+
+    best_node = max(scores, key=scores.get)
+    confidence = scores[best_node] / total
+    if scores[best_node] < min_score or confidence < threshold:
+        return IntentPrediction(None, confidence, scores)
+    return IntentPrediction(best_node, confidence, scores)
@@ -0,0 +1,119 @@
+"""Caché de respuestas exactas para turnos de preguntas frecuentes.
+
+Los mensajes como "hola", "¿a qué hora abren?" o "¿hacen domicilios?" producen respuestas
+prácticamente iguales para todos los clientes. Cuando es el primer turno de la conversación (la
+respuesta no depende de mensajes anteriores), el turno no usó herramientas y el cliente no tiene
+un pedido abierto, la respuesta de conversation_agent se guarda con clave (texto normalizado,
+agente, versión de prompts/menú); un mensaje idéntico posterior se responde desde la caché sin
+llamar al orquestador ni al agente. El nombre del cliente se guarda como plantilla.
+"""
+
+import re
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Dict,
+    Optional,
+    Tuple,
+)
+
+from core.config import settings
+from utils.text import normalize_text
+
+# Marcador con el que se guarda el nombre del cliente dentro de la respuesta
+CLIENT_NAME_PLACEHOLDER = "{client_name}"
+
+
+class ResponseCache:
+    """Caché en memoria con expiración (TTL), desalojo LRU y contadores de aciertos/fallos."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        """Inicializa la caché.
+
+        Args:
+            max_entries: Número máximo de respuestas guardadas
+            ttl_seconds: Segundos que una respuesta sigue siendo válida
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(text: str, agent: str, version: str) -> Tuple[str, str, str]:
+        """Construye la clave a partir del texto normalizado, el agente y la versión."""
+        return normalize_text(text), agent, version
+
+    def get(self, text: str, agent: str, version: str, client_name: Optional[str] = None) -> Optional[str]:
+        """Busca una respuesta guardada.
+
+        Args:
+            text: Mensaje del usuario
+            agent: Agente que generó la respuesta
+            version: Versión de prompts y menú vigente
+            client_name: Nombre con el que se rellena la plantilla
+
+        Returns:
+            Optional[str]: La respuesta con el nombre del cliente, o None si no hay una vigente
+        """
+        key = self._key(text, agent, version)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1].replace(CLIENT_NAME_PLACEHOLDER, client_name or "")
+
+    def set(self, text: str, agent: str, version: str, response: str, client_name: Optional[str] = None) -> None:
+        """Guarda una respuesta, reemplazando el nombre del cliente por el marcador.
+
+        Solo se reemplaza el nombre como palabra completa ("Ana" y no "mañana"); si aparece más
+        de una vez no se puede saber cuál es el saludo y la respuesta no se guarda.
+
+        Args:
+            text: Mensaje del usuario
+            agent: Agente que generó la respuesta
+            version: Versión de prompts y menú vigente
+            response: Respuesta del agente
+            client_name: Nombre del cliente a convertir en plantilla
+        """
+        if not normalize_text(text):
+            return
+        if client_name:
+            name_pattern = re.compile(rf"(?<!\w){re.escape(client_name)}(?!\w)")
+            response, replaced = name_pattern.subn(CLIENT_NAME_PLACEHOLDER, response)
+            if replaced > 1:
+                return
+
+        key = self._key(text, agent, version)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Elimina todas las respuestas guardadas."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Devuelve el tamaño y los contadores de la caché."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": settings.RESPONSE_CACHE_ENABLED,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+)
@@ -1,13 +1,36 @@
 import os
-import aiohttp
+import time
 import json
 from langchain_core.tools import tool
+from services.baileys_client import baileys_client
 from services.menu_service import menu_service
 from core.config import settings
 
 # Usar la URL de Baileys desde la configuración
 # BAILEYS_SERVER_URL = os.getenv("BAILEYS_SERVER_URL", "http://198.244.188.104:3001")
 
+# Envíos recientes por (teléfono, content_hash) -> momento (time.monotonic) del envío
+_recent_menu_sends: dict[tuple[str, str], float] = {}
+
+
+def _pending_menu_images(phone: str, menu_images: list[dict]) -> list[dict]:
+    """
+    Filtra las imágenes que ya se enviaron a este cliente dentro de la ventana MENU_IMAGE_DEDUP_SECONDS.
+
+    Args:
+        phone: Número de teléfono del cliente
+        menu_images: Referencias de las imágenes del menú
+
+    Returns:
+        list[dict]: Las imágenes que sí hay que enviar
+    """
+    now = time.monotonic()
+    for key, sent_at in list(_recent_menu_sends.items()):
+        if now - sent_at >= settings.MENU_IMAGE_DEDUP_SECONDS:
+            del _recent_menu_sends[key]
+    return [image for image in menu_images if (phone, image["content_hash"]) not in _recent_menu_sends]
+
+
 @tool
 async def send_menu_images(phone: str) -> dict:
     """
@@ -20,7 +43,7 @@ async def send_menu_images(phone: str) -> dict:
         dict: Resultado de la operación con mensaje de éxito o error
     """
     try:
-        # Obtener todas las imágenes del menú
+        # Obtener las referencias de las imágenes del menú (sin el contenido binario)
         menu_images = await menu_service.get_menu()
         
         if not menu_images:
@@ -28,43 +51,38 @@ async def send_menu_images(phone: str) -> dict:
                 "message": "No hay imágenes de menú disponibles",
                 "error": True
             }
+
+        pending_images = _pending_menu_images(phone, menu_images)
+        if not pending_images:
+            return {
+                "message": "Las imágenes del menú ya se enviaron al cliente hace poco; no se reenviaron",
+                "error": False
+            }
             
-        # Enviar cada imagen al cliente
-        async with aiohttp.ClientSession() as session:
-            for menu_image in menu_images:
-                # Verificar que la imagen en hexadecimal no esté vacía
-                if not menu_image.image_hex:
-                    print(f"Error: La imagen del menú {menu_image.tipo_menu.value} está vacía")
-                    continue
+        # Enviar cada imagen al cliente por referencia: el puente la descarga por URL una sola
+        # vez y la guarda en caché por su content_hash
+        for menu_image in pending_images:
+            payload = {
+                "phone": phone,
+                "imageUrl": f"{settings.API_BASE_URL}{settings.API_V1_STR}/menu/images/{menu_image['content_hash']}",
+                "contentHash": menu_image["content_hash"],
+                "caption": f"Menú {menu_image['tipo_menu'].value}"
+            }
+            
+            print(f"\nEnviando imagen del menú {menu_image['tipo_menu'].value}...")
+            print(f"\033[92m\nURL del servidor Baileys: {settings.BAILEYS_SERVER_URL}\033[0m")
 
-                # Preparar los datos para enviar en el formato que espera el endpoint
-                payload = {
-                    "phone": phone,
-                    "imageHex": menu_image.image_hex,
-                    "caption": f"Menú {menu_image.tipo_menu.value}"
+            # Enviar la imagen
+            response = await baileys_client.send_image(payload)
+            print(f"Respuesta del servidor: {response.text}")
+            print(f"Status code: {response.status_code}")
+            
+            if not response.is_success:
+                return {
+                    "message": f"Error al enviar imagen: {response.text}",
+                    "error": True
                 }
-                
-                print(f"\nEnviando imagen del menú {menu_image.tipo_menu.value}...")
-                #print(f"Payload: {json.dumps(payload, indent=2)}")
-                print(f"\033[92m\nURL del servidor Baileys: {settings.BAILEYS_SERVER_URL}\033[0m")
-
-                # Enviar la imagen
-                async with session.post(
-                    f"{settings.BAILEYS_SERVER_URL}/api/send-images",
-                    json=payload,
-                    headers={
-                        "Content-Type": "application/json"
-                    }
-                ) as response:
-                    response_text = await response.text()
-                    print(f"Respuesta del servidor: {response_text}")
-                    print(f"Status code: {response.status}")
-                    
-                    if not response.ok:
-                        return {
-                            "message": f"Error al enviar imagen: {response_text}",
-                            "error": True
-                        }
+            _recent_menu_sends[(phone, menu_image["content_hash"])] = time.monotonic()
         
         return {
             "message": "Imágenes del menú enviadas exitosamente",
@@ -79,7 +97,7 @@ async def send_menu_images(phone: str) -> dict:
         }
 
 @tool
-def send_location_tool(phone: str) -> str:
+async def send_location_tool(phone: str) -> str:
     """
     Envía la ubicación del restaurante al cliente.
 
@@ -89,27 +107,18 @@ def send_location_tool(phone: str) -> str:
     Retorna:
         str: Mensaje de confirmación si el envío se realiza con éxito, o mensaje de error en caso contrario.
     """
-    import asyncio
-    async def _send():
-        print(f"\033[92m\nsend_location_tool activada\033[0m")
-        try:
-            # Definir la ubicación del restaurante
-            location_data = {
-                "number": phone
-            }
-
-            # Hacer la solicitud al endpoint para enviar la ubicación
-            async with aiohttp.ClientSession() as session:
-                async with session.post(f'{settings.BAILEYS_SERVER_URL}/api/send-location', json=location_data) as response:
-                    print(f"Respuesta del servidor: {response.status}")
-                    if response.status == 200:
-                        return "Ubicación del restaurante enviada correctamente."
-                    else:
-                        try:
-                            error_msg = (await response.json()).get('error', 'Error desconocido')
-                        except Exception:
-                            error_msg = await response.text()
-                        return f"Error al enviar la ubicación: {error_msg}"
-        except Exception as e:
-            return f"Error al enviar la ubicación: {str(e)}"
-    return asyncio.run(_send()) 
\ No newline at end of file
+    print(f"\033[92m\nsend_location_tool activada\033[0m")
+    try:
+        # Hacer la solicitud al endpoint para enviar la ubicación
+        response = await baileys_client.send_location(phone)
+        print(f"Respuesta del servidor: {response.status_code}")
+        if response.status_code == 200:
+            return "Ubicación del restaurante enviada correctamente."
+        else:
+            try:
+                error_msg = response.json().get('error', 'Error desconocido')
+            except Exception:
+                error_msg = response.text
+            return f"Error al enviar la ubicación: {error_msg}"
+    except Exception as e:
+        return f"Error al enviar la ubicación: {str(e)}"
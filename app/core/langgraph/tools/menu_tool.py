@@ -1,24 +1,17 @@
 """Herramienta para obtener el menú de un restaurante de comidas rápidas."""
 
 from langchain_core.tools import tool
-from services.inventory_service import InventoryService
-import asyncio
+from services.menu_snapshot import menu_snapshot_cache
 
 @tool
-def get_menu() -> dict:
+async def get_menu() -> str:
     """
-    Obtiene el menú de productos desde la base de datos, organizado por categorías.
-    Retorna un diccionario con las categorías como claves y listas de productos como valores.
+    Obtiene el menú de productos, organizado por categorías.
+
+    Returns:
+        str: Texto con el menú completo agrupado por categoría: cada categoría
+        va seguida de la lista de sus productos con nombre, descripción y precio.
     """
-    inventory_service = InventoryService()
-    products = asyncio.run(inventory_service.get_menu_products())
-    
-    # Organizar productos por categoría
-    menu_by_category = {}
-    for product in products:
-        category = product["category"]
-        if category not in menu_by_category:
-            menu_by_category[category] = []
-        menu_by_category[category].append(product)
-    
-    return menu_by_category
\ No newline at end of file
+    # Snapshot en memoria: solo consulta la base de datos si el menú cambió o expiró
+    snapshot = await menu_snapshot_cache.get()
+    return snapshot.text
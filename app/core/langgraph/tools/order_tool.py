@@ -1,15 +1,13 @@
 """Herramienta para confirmar productos en la base de datos."""
 
 from langchain_core.tools import tool
-from services.order_service import OrderService
+from services.order_service import CLOSED_STATUSES, OrderService
 from services.database import database_service
-import asyncio
 from typing import List, Dict, Any
-from sqlmodel import Session
 from uuid import UUID
 
 @tool
-def confirm_product(
+async def confirm_product(
     phone: str,
     name: str,
     address: str,
@@ -42,33 +40,28 @@ def confirm_product(
         print(f"\033[96m[confirm_product] Productos: {products}\033[0m")
         
         # Actualizar el nombre del usuario
-        user = asyncio.run(database_service.get_user_by_phone(phone))
+        user = await database_service.get_user_by_phone(phone)
         if user:
-            asyncio.run(database_service.update_user_name(user.id, name))
+            await database_service.update_user_name(user.id, name)
         
         order_service = OrderService()
-        order = asyncio.run(
-            order_service.create_order(
-                customer_id=phone,
-                address=address,
-                products=products
-            )
+        order = await order_service.create_order(
+            customer_id=phone,
+            address=address,
+            products=products
         )
         
-        # Cargar los items dentro de una nueva sesión
-        with Session(database_service.engine) as session:
-            session.add(order)
-            session.refresh(order)
-            items_data = [
-                {
-                    "name": item.product_name,
-                    "quantity": item.quantity,
-                    "unit_price": item.unit_price,
-                    "subtotal": item.subtotal,
-                    "details": item.details
-                }
-                for item in order.items
-            ]
+        # Los items son los mismos productos recibidos: no hace falta recargarlos de la base de datos
+        items_data = [
+            {
+                "name": product["product_name"],
+                "quantity": product["quantity"],
+                "unit_price": product["unit_price"],
+                "subtotal": product["subtotal"],
+                "details": product.get("details", "")
+            }
+            for product in products
+        ]
         
         # Loguear información de orden creada con dirección
         print(f"\033[96m[confirm_product] Orden creada - ID: {order.id}, Address: '{order.address}'\033[0m")
@@ -85,7 +78,7 @@ def confirm_product(
         return {"message": f"Error al procesar el pedido: {str(e)}", "status": "error"}
 
 @tool
-def get_last_order(phone: str) -> dict:
+async def get_last_order(phone: str) -> dict:
     """
     Obtiene el estado y los productos de la última orden de un cliente.
         
@@ -93,7 +86,7 @@ def get_last_order(phone: str) -> dict:
         dict: Información de la última orden del cliente o mensaje indicando que no hay órdenes
     """
     order_service = OrderService()
-    last_order = asyncio.run(order_service.get_last_order(phone))
+    last_order = await order_service.get_last_order(phone)
     
     if not last_order:
         return {
@@ -108,7 +101,7 @@ def get_last_order(phone: str) -> dict:
     }
 
 @tool
-def add_products_to_order(phone: str, products: List[Dict[str, Any]]) -> dict:
+async def add_products_to_order(phone: str, products: List[Dict[str, Any]]) -> dict:
     """
     Añade productos a la última orden existente del cliente.
     
@@ -129,26 +122,24 @@ def add_products_to_order(phone: str, products: List[Dict[str, Any]]) -> dict:
         order_service = OrderService()
         
         # Obtener la última orden del cliente
-        last_order = asyncio.run(order_service.get_last_order(phone))
+        last_order = await order_service.get_last_order(phone)
         if not last_order:
             return {
                 "message": "No se encontró ninguna orden pendiente para este cliente",
                 "error": True
             }
             
-        # Verificar que la orden no esté en estado 'completed' o 'cancelled'
-        if last_order['status'] in ['completed', 'cancelled']:
+        # Verificar que la orden no esté cerrada (completado, completed o cancelled)
+        if last_order['status'] in CLOSED_STATUSES:
             return {
                 "message": f"No se pueden añadir productos a una orden en estado '{last_order['status']}'",
                 "error": True
             }
             
         # Añadir productos a la orden
-        updated_order = asyncio.run(
-            order_service.add_products_to_order(
-                order_id=UUID(last_order['order_id']),
-                products=products
-            )
+        updated_order = await order_service.add_products_to_order(
+            order_id=UUID(last_order['order_id']),
+            products=products
         )
 
         return {
@@ -162,7 +153,7 @@ def add_products_to_order(phone: str, products: List[Dict[str, Any]]) -> dict:
         }
 
 @tool
-def update_order_product(phone: str, product_name: str, new_data: Dict[str, Any]) -> dict:
+async def update_order_product(phone: str, product_name: str, new_data: Dict[str, Any]) -> dict:
     """
     Modifica los datos de un producto específico en la última orden del cliente.
     
@@ -181,27 +172,25 @@ def update_order_product(phone: str, product_name: str, new_data: Dict[str, Any]
         order_service = OrderService()
         
         # Obtener la última orden del cliente
-        last_order = asyncio.run(order_service.get_last_order(phone))
+        last_order = await order_service.get_last_order(phone)
         if not last_order:
             return {
                 "message": "No se encontró ninguna orden pendiente para este cliente",
                 "error": True
             }
             
-        # Verificar que la orden no esté en estado 'completed' o 'cancelled'
-        if last_order['status'] in ['completed', 'cancelled']:
+        # Verificar que la orden no esté cerrada (completado, completed o cancelled)
+        if last_order['status'] in CLOSED_STATUSES:
             return {
                 "message": f"No se pueden modificar productos en una orden en estado '{last_order['status']}'",
                 "error": True
             }
             
         # Modificar el producto en la orden
-        updated_order = asyncio.run(
-            order_service.update_order_product(
-                order_id=UUID(last_order['order_id']),
-                product_name=product_name,
-                new_data=new_data
-            )
+        updated_order = await order_service.update_order_product(
+            order_id=UUID(last_order['order_id']),
+            product_name=product_name,
+            new_data=new_data
         )
 
         return {
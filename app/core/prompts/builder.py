@@ -0,0 +1,118 @@
+"""Prompt assembly with a static, cacheable prefix and a per-turn context suffix.
+
+Provider-side prompt caching only reuses an identical prefix. The agent prompts are therefore
+sent unchanged as the first system message, followed by the conversation history, and the
+values that change every turn (client name, address, last order, date and time) go in a
+second system message after the history.
+"""
+
+from collections import defaultdict
+from typing import (
+    Any,
+    Dict,
+    Optional,
+)
+
+from langchain_core.messages import BaseMessage
+
+from core.config import settings
+from core.logging import logger
+from schemas import Message
+from utils import (
+    current_colombian_time,
+    prepare_messages,
+)
+
+
+def build_turn_context(
+    client_name: Optional[str] = None,
+    previous_address: Optional[str] = None,
+    last_order_info: Optional[str] = None,
+    include_time: bool = True,
+) -> str:
+    """Build the per-turn context message that follows the conversation history.
+
+    Args:
+        client_name: The customer's name, if the agent uses it
+        previous_address: The address of the customer's last order, if the agent uses it
+        last_order_info: The formatted last order, if the agent uses it
+        include_time: Whether to add the current date and time (rounded to PROMPT_TIME_ROUND_MINUTES)
+
+    Returns:
+        str: The context message content
+    """
+    lines = ["# Contexto del turno", ""]
+    if client_name is not None:
+        lines.append(f"- Nombre del cliente: {client_name}")
+    if previous_address is not None:
+        lines.append(f"- Dirección de la última orden: {previous_address}")
+    if include_time:
+        lines.append(f"- Fecha y hora actual: {current_colombian_time(round_minutes=settings.PROMPT_TIME_ROUND_MINUTES)}")
+    if last_order_info is not None:
+        lines += ["", "## Última orden del cliente", "", last_order_info.strip()]
+    return "\n".join(lines)
+
+
+def build_prompt_messages(
+    static_prompt: str,
+    history: list[BaseMessage],
+    turn_context: str,
+    token_counts: Optional[Dict[str, int]] = None,
+) -> list[BaseMessage | Message]:
+    """Assemble the messages for an agent call: static prompt, trimmed history, turn context.
+
+    Args:
+        static_prompt: The agent's system prompt, identical on every call
+        history: The conversation messages
+        turn_context: The per-turn context built with `build_turn_context`
+        token_counts: Cached token counts by message id, updated in place
+
+    Returns:
+        list[BaseMessage | Message]: The messages to send to the LLM
+    """
+    messages = prepare_messages(history, static_prompt, token_counts)
+    return messages + [Message(role="system", content=turn_context)]
+
+
+class PromptCacheStats:
+    """Accumulates prompt and cached-prompt token counts per agent from the LLM responses."""
+
+    def __init__(self):
+        """Initialize empty counters."""
+        self._stats = defaultdict(lambda: {"calls": 0, "input_tokens": 0, "cached_tokens": 0})
+
+    def record(self, agent: str, message: Any) -> None:
+        """Record the usage metadata of an LLM response.
+
+        Args:
+            agent: The agent that made the call
+            message: The AIMessage returned by the model
+        """
+        usage = getattr(message, "usage_metadata", None)
+        if not usage:
+            return
+        input_tokens = usage.get("input_tokens", 0)
+        cached_tokens = (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+
+        stats = self._stats[agent]
+        stats["calls"] += 1
+        stats["input_tokens"] += input_tokens
+        stats["cached_tokens"] += cached_tokens
+        logger.debug("prompt_cache_usage", agent=agent, input_tokens=input_tokens, cached_tokens=cached_tokens)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Get the counters and the cached-token ratio per agent.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Stats by agent name
+        """
+        return {
+            agent: {
+                **stats,
+                "cache_hit_rate": round(stats["cached_tokens"] / stats["input_tokens"], 4) if stats["input_tokens"] else 0.0,
+            }
+            for agent, stats in self._stats.items()
+        }
+
+
+prompt_cache_stats = PromptCacheStats()
@@ -38,9 +38,16 @@ from api.menu import router as menu_router
 from api.orders import router as orders_router
 from api.auth import router as auth_router
 from core.config import settings
+from core.langgraph.response_cache import response_cache
 from core.limiter import limiter
 from core.logging import logger
+from core.prompts import prompt_cache_stats
+from services.baileys_client import baileys_client
+from services.connection_pool import pool_manager
 from services.database import database_service
+from services.order_archiver import order_archiver
+from services.order_events import order_event_broadcaster
+from services.thread_cache import thread_cache
 from utils.utils import current_colombian_time
 
 # Initialize Langfuse
@@ -60,7 +67,17 @@ async def lifespan(app: FastAPI):
         version=settings.VERSION,
         api_prefix=settings.API_V1_STR,
     )
+    settings.validate_api_base_url()
+    await pool_manager.open()
+    await baileys_client.start()
+    await order_event_broadcaster.start()
+    await order_archiver.start()
     yield
+    await order_archiver.stop()
+    await order_event_broadcaster.stop()
+    await baileys_client.close()
+    await database_service.async_engine.dispose()
+    await pool_manager.close()
     logger.info("application_shutdown")
 
 
@@ -161,6 +178,12 @@ async def health_check(request: Request) -> Dict[str, Any]:
         "version": settings.VERSION,
         "environment": settings.ENVIRONMENT.value,
         "components": {"api": "healthy", "database": "healthy" if db_healthy else "unhealthy"},
+        "database_pool": pool_manager.stats(),
+        "prompt_cache": prompt_cache_stats.snapshot(),
+        "response_cache": response_cache.stats(),
+        "thread_cache": thread_cache.stats(),
+        "order_events": order_event_broadcaster.stats(),
+        "order_archiver": order_archiver.stats(),
         "timestamp": current_colombian_time(),
     }
 
@@ -3,7 +3,7 @@ from enum import Enum
 from typing import Optional
 
 from sqlmodel import Field, SQLModel
-from sqlalchemy import Text
+from sqlalchemy import LargeBinary
 
 
 class MenuType(str, Enum):
@@ -16,11 +16,15 @@ class MenuType(str, Enum):
 
 class MenuImage(SQLModel, table=True):
     """
-    Modelo para almacenar las imágenes del menú en formato hexadecimal
+    Modelo para almacenar las imágenes del menú, ya codificadas como JPEG para WhatsApp.
+    El puente de WhatsApp las descarga por URL y las guarda en caché por su content_hash.
     """
     __tablename__ = "menu_images"
 
     id: Optional[int] = Field(default=None, primary_key=True)
     tipo_menu: MenuType = Field(sa_column_kwargs={"nullable": False})
-    image_hex: str = Field(sa_type=Text)
-    created_at: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"nullable": False}) 
\ No newline at end of file
+    image_data: bytes = Field(sa_type=LargeBinary)
+    content_hash: str = Field(index=True, max_length=64)
+    content_type: str = Field(default="image/jpeg")
+    size_bytes: int = Field(default=0)
+    created_at: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"nullable": False})
@@ -2,12 +2,13 @@
 
 from datetime import datetime
 from typing import Optional
+from sqlalchemy import Index, text
 from sqlmodel import Field, SQLModel, Relationship
 from uuid import UUID, uuid4
 from utils.utils import current_colombian_time
 
-class Order(SQLModel, table=True):
-    """Modelo para la tabla de pedidos.
+class OrderBase(SQLModel):
+    """Campos de un pedido, comunes a la tabla de pedidos y a su archivo.
     
     Attributes:
         id: Identificador único del pedido
@@ -19,22 +20,31 @@ class Order(SQLModel, table=True):
         updated_at: Fecha y hora de última actualización del pedido
     """
     id: UUID = Field(default_factory=uuid4, primary_key=True)
-    customer_id: str = Field(index=True)
+    customer_id: str
     status: str = Field(default="pending")
     total_amount: float = Field(default=0.0)
     address: str = Field(default="")
     created_at: datetime = Field(default_factory=lambda: datetime.fromisoformat(current_colombian_time()))
     updated_at: datetime = Field(default_factory=lambda: datetime.fromisoformat(current_colombian_time()))
+
+class Order(OrderBase, table=True):
+    """Modelo para la tabla de pedidos (pedidos abiertos y recientes)."""
+    __table_args__ = (
+        # Listados por rango de fechas con paginación por cursor sobre (created_at, id)
+        Index("ix_order_created_at_id", "created_at", "id"),
+        # Último pedido de un cliente (get_last_order, get_customer_context): el primer registro
+        # del índice para ese customer_id, sin ordenar sus pedidos
+        Index("ix_order_customer_id_created_at", "customer_id", text("created_at DESC")),
+    )
     
-    # Relación con los items del pedido
-    items: list["OrderItem"] = Relationship(back_populates="order")
+    # Relación con los items del pedido (Postgres los elimina con el pedido: ON DELETE CASCADE)
+    items: list["OrderItem"] = Relationship(back_populates="order", passive_deletes=True)
 
-class OrderItem(SQLModel, table=True):
-    """Modelo para la tabla de items de pedido.
+class OrderItemBase(SQLModel):
+    """Campos de un item de pedido, comunes a la tabla de items y a su archivo.
     
     Attributes:
         id: Identificador único del item
-        order_id: ID del pedido al que pertenece
         product_id: ID del producto
         product_name: Nombre del producto
         quantity: Cantidad del producto
@@ -43,13 +53,47 @@ class OrderItem(SQLModel, table=True):
         details: Observaciones o detalles específicos del producto en este pedido
     """
     id: UUID = Field(default_factory=uuid4, primary_key=True)
-    order_id: UUID = Field(foreign_key="order.id", index=True)
     product_id: str = Field(index=True)
     product_name: str
     quantity: int
     unit_price: float
     subtotal: float
     details: str = Field(default="")
+
+class OrderItem(OrderItemBase, table=True):
+    """Modelo para la tabla de items de pedido.
+    
+    Attributes:
+        order_id: ID del pedido al que pertenece
+    """
+    order_id: UUID = Field(foreign_key="order.id", index=True, ondelete="CASCADE")
     
     # Relación con el pedido
-    order: Order = Relationship(back_populates="items") 
\ No newline at end of file
+    order: Order = Relationship(back_populates="items")
+
+class OrderArchive(OrderBase, table=True):
+    """Modelo para el archivo de pedidos: pedidos cerrados antiguos que el archivador
+    (services/order_archiver.py) saca de la tabla de pedidos. Solo lo leen los listados
+    históricos.
+    """
+    __tablename__ = "order_archive"
+    __table_args__ = (
+        Index("ix_order_archive_created_at_id", "created_at", "id"),
+        Index("ix_order_archive_customer_id_created_at", "customer_id", text("created_at DESC")),
+    )
+    
+    # Relación con los items archivados del pedido
+    items: list["OrderItemArchive"] = Relationship(back_populates="order", passive_deletes=True)
+
+class OrderItemArchive(OrderItemBase, table=True):
+    """Modelo para el archivo de items de pedido.
+    
+    Attributes:
+        order_id: ID del pedido archivado al que pertenece
+    """
+    __tablename__ = "orderitem_archive"
+    
+    order_id: UUID = Field(foreign_key="order_archive.id", index=True, ondelete="CASCADE")
+    
+    # Relación con el pedido archivado
+    order: OrderArchive = Relationship(back_populates="items")
@@ -7,7 +7,7 @@ from schemas.chat import (
     Message,
     StreamResponse,
 )
-from schemas.graph import GraphState
+from schemas.graph import GraphState, RouterDecision
 from schemas.order import OrderStatusUpdate, OrderResponse
 
 __all__ = [
@@ -17,6 +17,7 @@ __all__ = [
     "Message",
     "StreamResponse",
     "GraphState",
+    "RouterDecision",
     "OrderStatusUpdate",
     "OrderResponse",
 ]
@@ -2,7 +2,7 @@
 
 import re
 import uuid
-from typing import Annotated, List, Optional
+from typing import Annotated, Any, Dict, List, Literal, Optional
 
 from langgraph.graph.message import add_messages
 from pydantic import (
@@ -12,6 +12,16 @@ from pydantic import (
 )
 
 
+def merge_token_counts(left: Dict[str, int], right: Dict[str, Optional[int]]) -> Dict[str, int]:
+    """Reducer for the per-message token counts.
+
+    Newer counts are merged into the existing ones; a None value removes the entry
+    (used when old messages are compacted away).
+    """
+    merged = {**(left or {}), **(right or {})}
+    return {message_id: tokens for message_id, tokens in merged.items() if tokens is not None}
+
+
 class GraphState(BaseModel):
     """State definition for the LangGraph Agent/Workflow."""
 
@@ -24,6 +34,14 @@ class GraphState(BaseModel):
         description="Historial de nodos por los que ha pasado la conversación"
     )
     phone: Optional[str] = None
+    customer_context: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Usuario, último pedido y productos del cliente, cargados una vez por turno"
+    )
+    token_counts: Annotated[Dict[str, int], merge_token_counts] = Field(
+        default_factory=dict,
+        description="Tokens de cada mensaje por id, calculados una sola vez con el tokenizador local"
+    )
 
     @field_validator("session_id")
     @classmethod
@@ -48,3 +66,11 @@ class GraphState(BaseModel):
             if not re.match(r"^[a-zA-Z0-9_\-]+$", v):
                 raise ValueError("Session ID must contain only alphanumeric characters, underscores, and hyphens")
             return v
+
+
+class RouterDecision(BaseModel):
+    """Structured output of the orchestrator routing call."""
+
+    node: Literal["order_data_agent", "conversation_agent", "update_order_agent", "pqrs_agent", "send_menu"] = Field(
+        ..., description="Nodo destino para el mensaje del usuario"
+    )
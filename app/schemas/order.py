@@ -1,6 +1,6 @@
 """Esquemas Pydantic para las operaciones de órdenes."""
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 
 class OrderStatusUpdate(BaseModel):
@@ -8,6 +8,12 @@ class OrderStatusUpdate(BaseModel):
     order_id: str
     state: str
 
+class OrderBulkDelete(BaseModel):
+    """Modelo para eliminar varias órdenes: por IDs o por rango de fechas (YYYY-MM-DD)."""
+    order_ids: Optional[List[str]] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+
 class OrderResponse(BaseModel):
     """Modelo de respuesta para una orden."""
     id: str
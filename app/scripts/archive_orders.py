@@ -0,0 +1,51 @@
+"""Mueve una vez al archivo los pedidos cerrados antiguos (lo mismo que hace el archivador de la aplicación).
+
+Sirve para el primer archivado de una base con historial o para ejecutarlo desde cron con
+ORDER_ARCHIVE_INTERVAL_SECONDS=0. Las tablas order_archive y orderitem_archive se crean con
+scripts/create_tables.py. Tras el primer archivado de un historial grande, VACUUM FULL (o
+pg_repack) de order y orderitem devuelve el espacio; después autovacuum lo reutiliza. Uso:
+
+    python scripts/archive_orders.py [--days 90] [--batch-size 1000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Agregar el directorio raíz de la aplicación al PYTHONPATH
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(app_dir)
+
+# Cargar variables del entorno desde .env.development
+dotenv_path = os.path.join(app_dir, ".env.development")
+load_dotenv(dotenv_path=dotenv_path)
+
+from core.config import settings  # noqa: E402
+from services.connection_pool import pool_manager  # noqa: E402
+from services.database import database_service  # noqa: E402
+from services.order_archiver import OrderArchiver  # noqa: E402
+
+
+async def main(days: int, batch_size: int) -> None:
+    """Archiva los pedidos cerrados creados hace más de `days` días."""
+    archiver = OrderArchiver(interval_seconds=0, after_days=days, batch_size=batch_size)
+    try:
+        archived = await archiver.archive_once()
+    finally:
+        await database_service.async_engine.dispose()
+        await pool_manager.close()
+    print(f"Pedidos archivados: {archived}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--days", type=int, default=settings.ORDER_ARCHIVE_AFTER_DAYS, help="Antigüedad mínima en días"
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.ORDER_ARCHIVE_BATCH_SIZE, help="Pedidos por lote")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.days, args.batch_size))
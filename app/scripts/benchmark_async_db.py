@@ -0,0 +1,102 @@
+"""Mide el throughput de `/chat` con consultas síncronas (bloqueantes) frente a asíncronas.
+
+Llama al endpoint real `/api/v1/chatbot/chat` en proceso (httpx.ASGITransport) con muchas
+conversaciones simultáneas. Las consultas a la base de datos y la llamada al LLM se simulan con
+latencias fijas para no necesitar Postgres ni API: en modo "Session síncrona" cada consulta
+duerme con time.sleep dentro de la corrutina (lo que hacía `Session(engine)` dentro de los
+métodos async, bloqueando el event loop); en modo "AsyncSession" duerme con asyncio.sleep. Uso:
+
+    python scripts/benchmark_async_db.py [--conversations 50] [--query-ms 5] [--queries 4] [--llm-ms 300]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Agregar el directorio raíz de la aplicación al PYTHONPATH
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(app_dir)
+
+import httpx  # noqa: E402
+
+from api import chatbot  # noqa: E402
+from core.limiter import limiter  # noqa: E402
+from main import app  # noqa: E402
+from schemas.chat import Message  # noqa: E402
+from services.database import database_service  # noqa: E402
+
+
+def install_fakes(blocking: bool, query_seconds: float, queries: int, llm_seconds: float) -> None:
+    """Reemplaza los servicios que usa /chat por versiones con latencia simulada."""
+
+    async def query() -> None:
+        if blocking:
+            time.sleep(query_seconds)
+        else:
+            await asyncio.sleep(query_seconds)
+
+    async def resolve_user_thread(phone: str):
+        await query()
+        return 1, f"thread-{phone}"
+
+    async def get_response(messages, session_id, user_id=None, initial_state=None):
+        # Contexto del cliente y escrituras del turno, más la llamada al LLM (siempre asíncrona)
+        for _ in range(queries - 1):
+            await query()
+        await asyncio.sleep(llm_seconds)
+        return [Message(role="assistant", content="Hola, ¿qué deseas pedir?")]
+
+    database_service.resolve_user_thread = resolve_user_thread
+    chatbot.agent.get_response = get_response
+
+
+async def run(conversations: int) -> dict:
+    """Envía un mensaje por conversación, todas a la vez, y mide latencias y throughput."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def chat(i: int) -> float:
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/v1/chatbot/chat",
+                params={"phone": f"57300{i:07d}"},
+                json={"messages": [{"role": "user", "content": "Hola"}]},
+            )
+            response.raise_for_status()
+            return (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        latencies = sorted(await asyncio.gather(*(chat(i) for i in range(conversations))))
+        total_s = time.perf_counter() - start
+
+    return {
+        "throughput": conversations / total_s,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=50, help="Conversaciones simultáneas")
+    parser.add_argument("--query-ms", type=float, default=5, help="Latencia simulada de cada consulta")
+    parser.add_argument("--queries", type=int, default=4, help="Consultas por turno (mínimo 1)")
+    parser.add_argument("--llm-ms", type=float, default=300, help="Latencia simulada del LLM")
+    args = parser.parse_args()
+
+    limiter.enabled = False
+    results = {}
+    for name, blocking in (("Session síncrona", True), ("AsyncSession", False)):
+        install_fakes(blocking, args.query_ms / 1000, max(args.queries, 1), args.llm_ms / 1000)
+        results[name] = asyncio.run(run(args.conversations))
+
+    print(
+        f"Conversaciones: {args.conversations}  consultas/turno: {args.queries} x {args.query_ms:.0f} ms"
+        f"  LLM: {args.llm_ms:.0f} ms"
+    )
+    print(f"{'sesión':<20}{'turnos/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<20}{r['throughput']:>10.1f}{r['p50_ms']:>10.0f}{r['p95_ms']:>10.0f}")
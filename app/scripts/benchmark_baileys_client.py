@@ -0,0 +1,118 @@
+"""Mide las conexiones TCP y la latencia de una ráfaga de notificaciones al puente de WhatsApp.
+
+Compara un `httpx.AsyncClient` nuevo por notificación (comportamiento anterior de
+`send_whatsapp_notification`) con el `BaileysClient` compartido. El puente se simula con un
+servidor HTTP/1.1 local con keep-alive que cuenta las conexiones aceptadas; `--handshake-ms`
+añade la latencia de establecer cada conexión (RTT de red + TCP), que en localhost es casi nula.
+Uso:
+
+    python scripts/benchmark_baileys_client.py [--notifications 200] [--handshake-ms 20] [--bursts 3]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Agregar el directorio raíz de la aplicación al PYTHONPATH
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(app_dir)
+
+import httpx  # noqa: E402
+
+from core.config import settings  # noqa: E402
+from services.baileys_client import BaileysClient  # noqa: E402
+
+RESPONSE = b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: 16\r\n\r\n{"success":true}'
+
+
+class FakeBridge:
+    """Servidor HTTP mínimo con keep-alive que responde 200 a cada POST."""
+
+    def __init__(self, handshake_seconds: float):
+        self.handshake_seconds = handshake_seconds
+        self.connections = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Atiende las solicitudes de una conexión hasta que el cliente la cierre."""
+        self.connections += 1
+        await asyncio.sleep(self.handshake_seconds)
+        try:
+            while True:
+                headers = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in headers.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                await reader.readexactly(length)
+                writer.write(RESPONSE)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+async def per_call_client(base_url: str, phone: str) -> None:
+    """Notificación con un cliente nuevo por llamada (versión anterior)."""
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        await client.post(f"{base_url}/api/send-message", json={"number": phone, "message": "Tu pedido está en camino"})
+
+
+async def run(notifications: int, bursts: int, handshake_seconds: float, shared: bool) -> dict:
+    """Lanza las ráfagas y devuelve conexiones abiertas y latencias."""
+    bridge = FakeBridge(handshake_seconds)
+    server = await asyncio.start_server(bridge.handle, "127.0.0.1", 0)
+    base_url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+    client = BaileysClient(
+        base_url=base_url,
+        max_connections=settings.BAILEYS_MAX_CONNECTIONS,
+        max_concurrency=settings.BAILEYS_MAX_CONCURRENCY,
+        timeout=settings.BAILEYS_TIMEOUT_SECONDS,
+        max_retries=settings.BAILEYS_MAX_RETRIES,
+        retry_backoff=settings.BAILEYS_RETRY_BACKOFF_SECONDS,
+    )
+
+    async def notify(i: int) -> float:
+        start = time.perf_counter()
+        phone = f"57300{i:07d}"
+        if shared:
+            await client.send_message(phone, "Tu pedido está en camino")
+        else:
+            await per_call_client(base_url, phone)
+        return (time.perf_counter() - start) * 1000
+
+    latencies, start = [], time.perf_counter()
+    for _ in range(bursts):
+        latencies += await asyncio.gather(*(notify(i) for i in range(notifications)))
+    total_ms = (time.perf_counter() - start) * 1000
+
+    await client.close()
+    server.close()
+    await server.wait_closed()
+    latencies.sort()
+    return {
+        "connections": bridge.connections,
+        "total_ms": total_ms,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notifications", type=int, default=200, help="Notificaciones por ráfaga")
+    parser.add_argument("--bursts", type=int, default=3, help="Ráfagas consecutivas")
+    parser.add_argument("--handshake-ms", type=float, default=20, help="Latencia simulada al abrir una conexión")
+    args = parser.parse_args()
+
+    results = {
+        "cliente por llamada": asyncio.run(run(args.notifications, args.bursts, args.handshake_ms / 1000, shared=False)),
+        "BaileysClient": asyncio.run(run(args.notifications, args.bursts, args.handshake_ms / 1000, shared=True)),
+    }
+    print(f"Ráfagas: {args.bursts} x {args.notifications} notificaciones  (apertura de conexión: {args.handshake_ms:.0f} ms)")
+    print(f"{'cliente':<22}{'conexiones':>12}{'total ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<22}{r['connections']:>12}{r['total_ms']:>10.0f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}")
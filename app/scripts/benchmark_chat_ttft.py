@@ -0,0 +1,60 @@
+"""Mide el tiempo hasta el primer token de `/chat/stream` frente al tiempo de respuesta de `/chat`.
+
+Requiere el servidor corriendo (con base de datos y LLM configurados). Para `/chat` el primer
+token llega con la respuesta completa; para `/chat/stream` se mide el primer evento SSE con
+contenido y el evento final (done=True). Uso:
+
+    python scripts/benchmark_chat_ttft.py --base-url http://localhost:8000 --phone 573001234567 [--runs 5]
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+import httpx
+
+MESSAGE = {"messages": [{"role": "user", "content": "Hola, ¿qué me recomiendas del menú de hoy?"}]}
+
+
+def blocking_chat(client: httpx.Client, base_url: str, phone: str) -> float:
+    """Devuelve el tiempo total de /chat en ms."""
+    start = time.perf_counter()
+    response = client.post(f"{base_url}/api/v1/chatbot/chat", params={"phone": phone}, json=MESSAGE)
+    response.raise_for_status()
+    return (time.perf_counter() - start) * 1000
+
+
+def streaming_chat(client: httpx.Client, base_url: str, phone: str) -> tuple[float, float]:
+    """Devuelve (tiempo al primer token, tiempo total) de /chat/stream en ms."""
+    start = time.perf_counter()
+    first_token_ms = None
+    with client.stream("POST", f"{base_url}/api/v1/chatbot/chat/stream", params={"phone": phone}, json=MESSAGE) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[len("data: ") :])
+            if first_token_ms is None and event["content"] and not event["done"]:
+                first_token_ms = (time.perf_counter() - start) * 1000
+            if event["done"]:
+                break
+    total_ms = (time.perf_counter() - start) * 1000
+    return first_token_ms or total_ms, total_ms
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000", help="URL del servidor")
+    parser.add_argument("--phone", required=True, help="Teléfono de prueba (se crea el usuario si no existe)")
+    parser.add_argument("--runs", type=int, default=5, help="Repeticiones por endpoint")
+    args = parser.parse_args()
+
+    with httpx.Client(timeout=120) as client:
+        blocking = [blocking_chat(client, args.base_url, args.phone) for _ in range(args.runs)]
+        streaming = [streaming_chat(client, args.base_url, args.phone) for _ in range(args.runs)]
+
+    print(f"Repeticiones: {args.runs}")
+    print(f"/chat         primer token (= respuesta completa): p50 {statistics.median(blocking):7.0f} ms")
+    print(f"/chat/stream  primer token:                        p50 {statistics.median(t for t, _ in streaming):7.0f} ms")
+    print(f"/chat/stream  respuesta completa:                  p50 {statistics.median(t for _, t in streaming):7.0f} ms")
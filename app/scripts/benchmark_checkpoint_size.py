@@ -0,0 +1,81 @@
+"""Mide el tamaño del checkpoint de mensajes según la longitud de la conversación, con y sin compactación.
+
+Simula turnos típicos (mensaje del usuario, tool call, resultado de la herramienta y respuesta),
+serializa el canal `messages` con el mismo serializador que usa AsyncPostgresSaver
+(JsonPlusSerializer) y mide bytes y tiempo de deserialización (carga del estado). Con
+compactación se aplica `select_messages_to_compact` al final de cada turno, igual que el nodo
+`compact_history`. Uso:
+
+    python scripts/benchmark_checkpoint_size.py [--turns 10 25 50 100 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+
+# Agregar el directorio raíz de la aplicación al PYTHONPATH
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(app_dir)
+
+from langchain_core.messages import (  # noqa: E402
+    AIMessage,
+    HumanMessage,
+    ToolMessage,
+)
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer  # noqa: E402
+
+from core.config import settings  # noqa: E402
+from utils import select_messages_to_compact  # noqa: E402
+
+
+def turn_messages(turn: int) -> list:
+    """Mensajes de un turno con una llamada a herramienta."""
+    call_id = f"call_{turn}"
+    return [
+        HumanMessage(content=f"Quiero agregar una limonada de coco al pedido, turno {turn}", id=str(uuid.uuid4())),
+        AIMessage(
+            content="",
+            tool_calls=[{"name": "get_menu", "args": {}, "id": call_id}],
+            id=str(uuid.uuid4()),
+        ),
+        ToolMessage(
+            content=str({"Bebidas": [{"name": "Limonada de coco", "price": 9000, "description": "Natural"}] * 6}),
+            tool_call_id=call_id,
+            id=str(uuid.uuid4()),
+        ),
+        AIMessage(content="Listo, agregué la limonada de coco ($9.000) a tu pedido. ¿Algo más?", id=str(uuid.uuid4())),
+    ]
+
+
+def measure(messages: list, serde: JsonPlusSerializer) -> tuple[int, float]:
+    """Devuelve (bytes serializados, ms de deserialización)."""
+    type_, data = serde.dumps_typed(messages)
+    start = time.perf_counter()
+    for _ in range(20):
+        serde.loads_typed((type_, data))
+    return len(data), (time.perf_counter() - start) / 20 * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 25, 50, 100, 200], help="Longitudes a medir")
+    args = parser.parse_args()
+
+    serde = JsonPlusSerializer()
+    threshold, keep = settings.COMPACTION_THRESHOLD_MESSAGES, settings.COMPACTION_KEEP_MESSAGES
+    print(f"Compactación: umbral {threshold} mensajes, ventana {keep}")
+    print(f"{'turnos':>7}{'msgs':>7}{'bytes':>10}{'carga ms':>10}{'msgs comp.':>12}{'bytes comp.':>13}{'carga ms':>10}")
+
+    full, compacted = [], []
+    for turn in range(1, max(args.turns) + 1):
+        new_messages = turn_messages(turn)
+        full += new_messages
+        compacted += new_messages
+        removed = {id(message) for message in select_messages_to_compact(compacted, threshold, keep)}
+        compacted = [message for message in compacted if id(message) not in removed]
+        if turn in args.turns:
+            full_bytes, full_ms = measure(full, serde)
+            comp_bytes, comp_ms = measure(compacted, serde)
+            print(f"{turn:>7}{len(full):>7}{full_bytes:>10}{full_ms:>10.2f}{len(compacted):>12}{comp_bytes:>13}{comp_ms:>10.2f}")
@@ -0,0 +1,152 @@
+"""Compara get_last_order en dos consultas con índice por customer_id frente a una consulta con índice compuesto.
+
+Necesita una base de datos (POSTGRES_URL). Inserta pedidos de prueba (por defecto 1.000.000 de
+pedidos de 50.000 clientes, 2 items cada uno), consulta el último pedido de una muestra de
+clientes con cada versión y al final elimina los datos:
+
+- "antes": índice solo sobre customer_id; una consulta para el pedido (ordenando los pedidos
+  del cliente) y otra para sus items, como get_last_order antes de este cambio.
+- "ahora": índice (customer_id, created_at DESC) y OrderService.get_last_order (una consulta).
+
+Al terminar deja los índices como los declara el modelo (igual que migrate_order_indexes.py). Uso:
+
+    python scripts/benchmark_last_order.py [--orders 1000000] [--customers 50000] [--lookups 2000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+from dotenv import load_dotenv
+
+# Agregar el directorio raíz de la aplicación al PYTHONPATH
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(app_dir)
+
+# Cargar variables del entorno desde .env.development
+dotenv_path = os.path.join(app_dir, ".env.development")
+load_dotenv(dotenv_path=dotenv_path)
+
+from sqlalchemy import text  # noqa: E402
+from sqlmodel import select  # noqa: E402
+
+from models.order import (  # noqa: E402
+    Order,
+    OrderItem,
+)
+from services.connection_pool import pool_manager  # noqa: E402
+from services.database import database_service  # noqa: E402
+from services.order_service import order_service  # noqa: E402
+
+SEED = [
+    """
+    INSERT INTO "order" (id, customer_id, status, total_amount, address, created_at, updated_at)
+    SELECT gen_random_uuid(), 'bench-' || (g % :customers),
+           (ARRAY['pendiente', 'en preparación', 'en reparto', 'completado'])[1 + (g / :customers + g) % 4],
+           24000, 'Calle ' || g, ts, ts
+    FROM generate_series(1, :orders) g,
+         LATERAL (SELECT timestamp '2001-01-01' + g * interval '1 minute' AS ts) t
+    """,
+    """
+    INSERT INTO orderitem (id, order_id, product_id, product_name, quantity, unit_price, subtotal, details)
+    SELECT gen_random_uuid(), o.id, 'p' || k, 'Producto ' || k, 2, 6000, 12000, ''
+    FROM "order" o, generate_series(1, 2) k
+    WHERE o.customer_id LIKE 'bench-%'
+    """,
+]
+
+CLEANUP = [
+    """DELETE FROM orderitem WHERE order_id IN (SELECT id FROM "order" WHERE customer_id LIKE 'bench-%')""",
+    """DELETE FROM "order" WHERE customer_id LIKE 'bench-%'""",
+]
+
+OLD_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS ix_order_customer_id ON "order" (customer_id)',
+    "DROP INDEX IF EXISTS ix_order_customer_id_created_at",
+    'ANALYZE "order"',
+]
+
+NEW_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS ix_order_customer_id_created_at ON "order" (customer_id, created_at DESC)',
+    "DROP INDEX IF EXISTS ix_order_customer_id",
+    'ANALYZE "order"',
+]
+
+
+async def execute(statements: list[str], **params) -> None:
+    """Ejecuta las sentencias en una transacción."""
+    async with database_service.async_engine.begin() as conn:
+        for statement in statements:
+            await conn.execute(text(statement), params)
+
+
+async def legacy_get_last_order(customer_id: str) -> dict | None:
+    """Versión anterior de get_last_order: pedido e items en dos consultas."""
+    async with database_service.async_session() as session:
+        statement = select(Order).where(Order.customer_id == customer_id).order_by(Order.created_at.desc()).limit(1)
+        order = (await session.exec(statement)).first()
+        if not order or order.status == "completado":
+            return None
+        items = (await session.exec(select(OrderItem).where(OrderItem.order_id == order.id))).all()
+        return {"order_id": str(order.id), "products": [item.product_name for item in items]}
+
+
+async def measure(get_last_order, customers: list[str]) -> dict:
+    """Consulta el último pedido de cada cliente de la muestra y devuelve latencias en ms."""
+    latencies = []
+    found = 0
+    for customer_id in customers:
+        start = time.perf_counter()
+        order = await get_last_order(customer_id)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found += order is not None
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "found": found,
+    }
+
+
+async def main(orders: int, customers: int, lookups: int) -> None:
+    """Inserta los datos, mide ambas versiones y limpia."""
+    await execute(CLEANUP)
+    print(f"Insertando {orders} pedidos de {customers} clientes...")
+    start = time.perf_counter()
+    await execute(SEED, orders=orders, customers=customers)
+    print(f"Datos insertados en {time.perf_counter() - start:.0f} s")
+
+    sample = [f"bench-{random.randrange(customers)}" for _ in range(lookups)]
+    try:
+        await execute(OLD_INDEXES)
+        await measure(legacy_get_last_order, sample[:100])
+        before = await measure(legacy_get_last_order, sample)
+
+        await execute(NEW_INDEXES)
+        await measure(order_service.get_last_order, sample[:100])
+        after = await measure(order_service.get_last_order, sample)
+    finally:
+        await execute(CLEANUP)
+        await execute(NEW_INDEXES)
+        await database_service.async_engine.dispose()
+        await pool_manager.close()
+
+    assert before["found"] == after["found"], (before["found"], after["found"])
+    print(f"Consultas: {lookups} clientes al azar ({after['found']} con pedido abierto)")
+    print(f"{'versión':<44}{'p50 ms':>10}{'p95 ms':>10}")
+    print(f"{'antes: índice customer_id, 2 consultas':<44}{before['p50']:>10.2f}{before['p95']:>10.2f}")
+    print(f"{'ahora: índice compuesto, 1 consulta':<44}{after['p50']:>10.2f}{after['p95']:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=1_000_000, help="Pedidos de prueba a insertar")
+    parser.add_argument("--customers", type=int, default=50_000, help="Clientes entre los que se reparten")
+    parser.add_argument("--lookups", type=int, default=2000, help="Clientes consultados con cada versión")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.orders, args.customers, args.lookups))
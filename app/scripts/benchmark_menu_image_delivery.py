@@ -0,0 +1,75 @@
+"""Compara los bytes movidos por solicitud de menú: imagen en hexadecimal frente a envío por referencia.
+
+Antes, cada envío cargaba `image_hex` de Postgres y lo enviaba como JSON al puente de WhatsApp
+(el doble del tamaño binario). Ahora se envía solo la URL y el content_hash; el puente descarga
+cada imagen una vez y la guarda en caché, y los reenvíos al mismo cliente dentro de la ventana
+MENU_IMAGE_DEDUP_SECONDS se omiten. Usa las imágenes de wha_api/common (o las indicadas). Uso:
+
+    python scripts/benchmark_menu_image_delivery.py [--requests 200] [--customers 50] [--images a.jpg b.jpg]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+# Agregar el directorio raíz de la aplicación al PYTHONPATH
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(app_dir)
+
+from core.config import settings  # noqa: E402
+from utils import content_hash  # noqa: E402
+
+DEFAULT_IMAGES = [
+    os.path.join(os.path.dirname(app_dir), "wha_api", "common", name) for name in ("menu_carta.jpg", "menu_ejecutivo.jpg")
+]
+
+
+def hex_payload_bytes(phone: str, image: bytes) -> int:
+    """Bytes del JSON enviado al puente con la imagen en hexadecimal (formato anterior)."""
+    return len(json.dumps({"phone": phone, "imageHex": image.hex(), "caption": "Menú carta"}))
+
+
+def reference_payload_bytes(phone: str, image_hash: str) -> int:
+    """Bytes del JSON enviado al puente con la referencia a la imagen."""
+    url = f"{settings.API_BASE_URL or 'http://api:8080'}{settings.API_V1_STR}/menu/images/{image_hash}"
+    return len(json.dumps({"phone": phone, "imageUrl": url, "contentHash": image_hash, "caption": "Menú carta"}))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="Solicitudes de menú simuladas")
+    parser.add_argument("--customers", type=int, default=50, help="Clientes distintos")
+    parser.add_argument("--images", nargs="+", default=DEFAULT_IMAGES, help="Imágenes del menú")
+    args = parser.parse_args()
+
+    images = []
+    for path in args.images:
+        with open(path, "rb") as f:
+            images.append(f.read())
+    hashes = [content_hash(image) for image in images]
+
+    random.seed(7)
+    phones = [f"57300{random.randrange(args.customers):07d}" for _ in range(args.requests)]
+
+    hex_bytes = sum(hex_payload_bytes(phone, image) for phone in phones for image in images)
+
+    bridge_cache, recent_sends = set(), set()
+    reference_bytes = 0
+    for phone in phones:
+        for image, image_hash in zip(images, hashes):
+            # Ventana de deduplicación: en esta simulación todas las solicitudes caen dentro de ella
+            if (phone, image_hash) in recent_sends:
+                continue
+            recent_sends.add((phone, image_hash))
+            reference_bytes += reference_payload_bytes(phone, image_hash)
+            if image_hash not in bridge_cache:
+                bridge_cache.add(image_hash)
+                reference_bytes += len(image)
+
+    print(f"Solicitudes: {args.requests}  clientes: {args.customers}  imágenes: {len(images)} ({sum(map(len, images))} bytes)")
+    print(f"{'envío':<22}{'bytes totales':>15}{'bytes/solicitud':>17}")
+    print(f"{'hexadecimal':<22}{hex_bytes:>15}{hex_bytes / args.requests:>17.0f}")
+    print(f"{'referencia + caché':<22}{reference_bytes:>15}{reference_bytes / args.requests:>17.0f}")
+    print(f"Reducción: {hex_bytes / reference_bytes:.1f}x")
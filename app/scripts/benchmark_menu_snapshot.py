@@ -0,0 +1,83 @@
+"""Compara la herramienta get_menu consultando la base de datos en cada llamada frente al snapshot en memoria.
+
+La consulta de productos se simula con una latencia fija (por defecto 3 ms, un SELECT de la
+tabla product contra Postgres local) para que el script no necesite base de datos. Se cuentan
+las consultas hechas y el tiempo por llamada; a mitad de la corrida se invalida el snapshot,
+como lo haría una escritura de InventoryService. Uso:
+
+    python scripts/benchmark_menu_snapshot.py [--calls 1000] [--io-ms 3] [--products 60]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Agregar el directorio raíz de la aplicación al PYTHONPATH
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(app_dir)
+
+from langchain_core.tools import tool  # noqa: E402
+
+from core.langgraph.tools import get_menu_tool  # noqa: E402
+from services.inventory_service import inventory_service  # noqa: E402
+from services.menu_snapshot import menu_snapshot_cache  # noqa: E402
+
+queries = 0
+
+
+def install_fake_products(io_seconds: float, count: int) -> None:
+    """Reemplaza la consulta de productos por una simulada que cuenta las llamadas."""
+    products = [
+        {"name": f"Plato {i}", "description": "Descripción del plato", "price": 10000 + i * 500, "category": f"Categoría {i % 6}"}
+        for i in range(count)
+    ]
+
+    async def fake_get_menu_products() -> list[dict]:
+        global queries
+        queries += 1
+        await asyncio.sleep(io_seconds)
+        return [dict(product) for product in products]
+
+    inventory_service.get_menu_products = fake_get_menu_products
+
+
+@tool
+async def legacy_get_menu() -> dict:
+    """Versión anterior de get_menu: consulta y agrupa los productos en cada llamada."""
+    products = await inventory_service.get_menu_products()
+    menu_by_category = {}
+    for product in products:
+        menu_by_category.setdefault(product["category"], []).append(product)
+    return menu_by_category
+
+
+async def run(menu_tool, calls: int) -> tuple[float, int]:
+    """Devuelve (ms promedio por llamada, consultas hechas)."""
+    global queries
+    queries = 0
+    start = time.perf_counter()
+    for i in range(calls):
+        if i == calls // 2:
+            menu_snapshot_cache.invalidate()
+        await menu_tool.ainvoke({})
+    return (time.perf_counter() - start) / calls * 1000, queries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1000, help="Llamadas a la herramienta")
+    parser.add_argument("--io-ms", type=float, default=3, help="Latencia simulada de la consulta")
+    parser.add_argument("--products", type=int, default=60, help="Productos en el menú")
+    args = parser.parse_args()
+
+    install_fake_products(args.io_ms / 1000, args.products)
+    results = {
+        "consulta por llamada": asyncio.run(run(legacy_get_menu, args.calls)),
+        "snapshot en memoria": asyncio.run(run(get_menu_tool, args.calls)),
+    }
+    print(f"Llamadas: {args.calls}  productos: {args.products}  (consulta simulada: {args.io_ms:.1f} ms)")
+    print(f"{'get_menu':<22}{'ms/llamada':>12}{'consultas':>11}")
+    for name, (ms, count) in results.items():
+        print(f"{name:<22}{ms:>12.3f}{count:>11}")
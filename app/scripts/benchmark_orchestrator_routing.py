@@ -0,0 +1,135 @@
+"""Compara el enrutamiento del orquestador en texto libre contra la salida estructurada.
+
+Envía cada mensaje de los fixtures etiquetados a:
+
+- legacy: el LLM general (LLM_MODEL, MAX_TOKENS) con la respuesta en texto libre y el
+  parseo anterior (bloques ```json, json.loads y búsqueda del nombre del nodo).
+- structured: el LLM de enrutamiento (ORCHESTRATOR_LLM_MODEL, ORCHESTRATOR_MAX_TOKENS)
+  con salida estructurada RouterDecision.
+
+Reporta latencia p50/p95, tokens de completion promedio y precisión. Requiere LLM_API_KEY.
+Uso:
+
+    python scripts/benchmark_orchestrator_routing.py [--limit 40] [--concurrency 4]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+# Agregar el directorio raíz de la aplicación al PYTHONPATH
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(app_dir)
+
+from langchain_core.messages import HumanMessage, SystemMessage  # noqa: E402
+from langchain_openai import ChatOpenAI  # noqa: E402
+
+from core.config import settings  # noqa: E402
+from core.prompts import SYSTEM_PROMPT_ORCHESTRATOR  # noqa: E402
+from schemas import RouterDecision  # noqa: E402
+from scripts.evaluate_intent_classifier import FIXTURES_PATH, load_fixtures  # noqa: E402
+
+VALID_NODES = ["order_data_agent", "conversation_agent", "update_order_agent", "pqrs_agent", "send_menu"]
+
+
+def parse_free_text(content: str) -> str:
+    """Parseo anterior de la respuesta en texto libre del orquestador."""
+    content = content.strip()
+    intent = None
+    if content.startswith("{") or content.startswith("```json"):
+        json_str = content.replace("```json", "").replace("```", "").strip()
+        try:
+            parsed = json.loads(json_str)
+            intent = parsed.get("node") or parsed.get("intention") or parsed.get("response")
+        except json.JSONDecodeError:
+            pass
+    if not intent:
+        intent = next((node for node in VALID_NODES if node in content), None)
+    return intent if intent in VALID_NODES else "conversation_agent"
+
+
+async def run_legacy(llm: ChatOpenAI, messages: list) -> tuple[str, int]:
+    """Ruta anterior: texto libre + parseo manual."""
+    response = await llm.ainvoke(messages)
+    usage = response.usage_metadata or {}
+    return parse_free_text(response.content), usage.get("output_tokens", 0)
+
+
+async def run_structured(router_llm, messages: list) -> tuple[str, int]:
+    """Ruta nueva: salida estructurada con enum de nodos."""
+    response = await router_llm.ainvoke(messages)
+    usage = getattr(response["raw"], "usage_metadata", None) or {}
+    decision = response["parsed"]
+    return (decision.node if decision else "conversation_agent"), usage.get("output_tokens", 0)
+
+
+async def benchmark(name: str, runner, model, fixtures: list[dict], concurrency: int) -> dict:
+    """Ejecuta una ruta sobre todos los fixtures y agrega latencia, tokens y precisión."""
+    prompt = SYSTEM_PROMPT_ORCHESTRATOR.format(
+        agent_name="Orchestrator",
+        last_order_info="No hay información de órdenes previas.",
+        current_date_and_time="",
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, tokens, correct = [], [], 0
+
+    async def one(fixture: dict) -> None:
+        nonlocal correct
+        messages = [SystemMessage(content=prompt), HumanMessage(content=fixture["text"])]
+        async with semaphore:
+            start = time.perf_counter()
+            node, output_tokens = await runner(model, messages)
+            latencies.append((time.perf_counter() - start) * 1000)
+        tokens.append(output_tokens)
+        correct += node == fixture["label"]
+
+    await asyncio.gather(*(one(fixture) for fixture in fixtures))
+    latencies.sort()
+    return {
+        "name": name,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "avg_output_tokens": statistics.mean(tokens),
+        "accuracy": correct / len(fixtures),
+    }
+
+
+async def main(limit: int, concurrency: int) -> None:
+    """Corre ambas rutas y muestra la comparación."""
+    if not settings.LLM_API_KEY:
+        sys.exit("LLM_API_KEY no está configurada")
+
+    fixtures = load_fixtures(FIXTURES_PATH)[:limit]
+    legacy_llm = ChatOpenAI(
+        model=settings.LLM_MODEL,
+        temperature=settings.DEFAULT_LLM_TEMPERATURE,
+        api_key=settings.LLM_API_KEY,
+        max_tokens=settings.MAX_TOKENS,
+    )
+    router_llm = ChatOpenAI(
+        model=settings.ORCHESTRATOR_LLM_MODEL,
+        temperature=settings.ORCHESTRATOR_LLM_TEMPERATURE,
+        api_key=settings.LLM_API_KEY,
+        max_tokens=settings.ORCHESTRATOR_MAX_TOKENS,
+    ).with_structured_output(RouterDecision, method="json_schema", strict=True, include_raw=True)
+
+    results = [
+        await benchmark("legacy", run_legacy, legacy_llm, fixtures, concurrency),
+        await benchmark("structured", run_structured, router_llm, fixtures, concurrency),
+    ]
+    print(f"Mensajes: {len(fixtures)}  concurrencia: {concurrency}")
+    print(f"{'ruta':<12}{'p50 ms':>10}{'p95 ms':>10}{'tokens out':>12}{'precisión':>11}")
+    for r in results:
+        print(f"{r['name']:<12}{r['p50_ms']:>10.0f}{r['p95_ms']:>10.0f}{r['avg_output_tokens']:>12.1f}{r['accuracy']:>11.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=40, help="Número de fixtures a enviar")
+    parser.add_argument("--concurrency", type=int, default=4, help="Peticiones simultáneas")
+    args = parser.parse_args()
+    asyncio.run(main(args.limit, args.concurrency))
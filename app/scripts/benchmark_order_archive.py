@@ -0,0 +1,158 @@
+"""Mide el tamaño de la tabla de pedidos y las consultas del tablero antes y después de archivar el historial.
+
+Necesita una base de datos con las tablas de archivo (scripts/create_tables.py). Inserta pedidos
+de prueba: un historial de pedidos cerrados en 2005 (por defecto 500.000, 2 items cada uno) y
+pedidos de los últimos 7 días. Mide el tamaño de order + orderitem (con índices) y las consultas
+del tablero de los últimos 30 días (primera página y estadísticas), archiva con
+OrderService.archive_orders, compacta las tablas (VACUUM FULL) y vuelve a medir, además de un
+listado de 2005 (que lee el archivo). Al final elimina los datos. Uso:
+
+    python scripts/benchmark_order_archive.py [--history 500000] [--recent 5000] [--repeats 20]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import (
+    datetime,
+    timedelta,
+)
+
+from dotenv import load_dotenv
+
+# Agregar el directorio raíz de la aplicación al PYTHONPATH
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(app_dir)
+
+# Cargar variables del entorno desde .env.development
+dotenv_path = os.path.join(app_dir, ".env.development")
+load_dotenv(dotenv_path=dotenv_path)
+
+from sqlalchemy import text  # noqa: E402
+
+from core.config import settings  # noqa: E402
+from services.connection_pool import pool_manager  # noqa: E402
+from services.database import database_service  # noqa: E402
+from services.order_service import order_service  # noqa: E402
+from utils.utils import current_colombian_time  # noqa: E402
+
+HISTORY_START = datetime(2005, 1, 1)
+HISTORY_END = datetime(2006, 1, 1)
+
+SEED = [
+    """
+    INSERT INTO "order" (id, customer_id, status, total_amount, address, created_at, updated_at)
+    SELECT gen_random_uuid(), 'bench-archive-' || (g % 20000), 'completado', 20000, 'Calle ' || g, ts, ts
+    FROM generate_series(1, :history) g,
+         LATERAL (SELECT timestamp '2005-01-01' + (g % 364) * interval '1 day' + (g % 86400) * interval '1 second' AS ts) t
+    """,
+    """
+    INSERT INTO "order" (id, customer_id, status, total_amount, address, created_at, updated_at)
+    SELECT gen_random_uuid(), 'bench-archive-' || (g % 20000),
+           (ARRAY['pendiente', 'en preparación', 'en reparto', 'completado'])[1 + g % 4],
+           20000, 'Calle ' || g, ts, ts
+    FROM generate_series(1, :recent) g,
+         LATERAL (SELECT CAST(:now AS timestamp) - (g % 10080) * interval '1 minute' AS ts) t
+    """,
+    """
+    INSERT INTO orderitem (id, order_id, product_id, product_name, quantity, unit_price, subtotal, details)
+    SELECT gen_random_uuid(), o.id, 'p' || k, 'Producto ' || k, 1, 10000, 10000, ''
+    FROM "order" o, generate_series(1, 2) k
+    WHERE o.customer_id LIKE 'bench-archive-%'
+    """,
+    'ANALYZE "order"',
+    "ANALYZE orderitem",
+]
+
+CLEANUP = [
+    """DELETE FROM "order" WHERE customer_id LIKE 'bench-archive-%'""",
+    """DELETE FROM order_archive WHERE customer_id LIKE 'bench-archive-%'""",
+]
+
+HOT_SIZE = """SELECT pg_total_relation_size('"order"') + pg_total_relation_size('orderitem')"""
+
+
+async def execute(statements: list[str], **params) -> None:
+    """Ejecuta las sentencias en una transacción."""
+    async with database_service.async_engine.begin() as conn:
+        for statement in statements:
+            await conn.execute(text(statement), params)
+
+
+async def hot_size_mb() -> float:
+    """Devuelve el tamaño en MB de order y orderitem con sus índices."""
+    async with database_service.async_engine.connect() as conn:
+        return (await conn.execute(text(HOT_SIZE))).scalar_one() / 1024 / 1024
+
+
+async def timed_ms(func, repeats: int) -> float:
+    """Devuelve la mediana en ms de `repeats` ejecuciones."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        await func()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+async def measure_dashboard(repeats: int) -> dict:
+    """Mide la primera página y las estadísticas de los últimos 30 días."""
+    end = datetime.fromisoformat(current_colombian_time()) + timedelta(days=1)
+    start = end - timedelta(days=30)
+    return {
+        "size": await hot_size_mb(),
+        "page": await timed_ms(
+            lambda: order_service.get_orders_by_date_range(start, end, limit=settings.ORDERS_PAGE_SIZE + 1), repeats
+        ),
+        "stats": await timed_ms(lambda: order_service.get_order_stats(start, end), repeats),
+    }
+
+
+async def main(history: int, recent: int, repeats: int) -> None:
+    """Inserta los datos, mide antes y después de archivar e imprime la tabla."""
+    await execute(CLEANUP)
+    await execute(SEED, history=history, recent=recent, now=current_colombian_time())
+    try:
+        before = await measure_dashboard(repeats)
+
+        start = time.perf_counter()
+        archived = await order_service.archive_orders(HISTORY_END, settings.ORDER_ARCHIVE_BATCH_SIZE)
+        archive_s = time.perf_counter() - start
+        # Compactación única tras el primer archivado de un historial grande (VACUUM FULL o
+        # pg_repack); después autovacuum reutiliza el espacio de los pedidos archivados
+        async with database_service.async_engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text('VACUUM FULL ANALYZE "order"'))
+            await conn.execute(text("VACUUM FULL ANALYZE orderitem"))
+
+        after = await measure_dashboard(repeats)
+        history_page = await timed_ms(
+            lambda: order_service.get_orders_by_date_range(
+                HISTORY_START, HISTORY_END, limit=settings.ORDERS_PAGE_SIZE + 1
+            ),
+            repeats,
+        )
+    finally:
+        await execute(CLEANUP)
+        await database_service.async_engine.dispose()
+        await pool_manager.close()
+
+    print(f"Historial: {history} pedidos cerrados de 2005; recientes: {recent} (2 items cada uno)")
+    print(f"Archivados: {archived} en {archive_s:.1f} s ({archived / archive_s:.0f} pedidos/s)")
+    print(f"{'':<18}{'order+items MB':>16}{'1a página ms':>15}{'estadísticas ms':>18}")
+    for name, r in (("sin archivar", before), ("archivado", after)):
+        print(f"{name:<18}{r['size']:>16.1f}{r['page']:>15.2f}{r['stats']:>18.2f}")
+    print(f"Primera página de 2005 (lee el archivo): {history_page:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--history", type=int, default=500_000, help="Pedidos cerrados de 2005")
+    parser.add_argument("--recent", type=int, default=5000, help="Pedidos de los últimos 7 días")
+    parser.add_argument("--repeats", type=int, default=20, help="Repeticiones de cada medición")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.history, args.recent, args.repeats))
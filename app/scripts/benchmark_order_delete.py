@@ -0,0 +1,148 @@
+"""Compara la eliminación de pedidos uno a uno con el ORM frente a un DELETE en bloque con ON DELETE CASCADE.
+
+Necesita una base de datos con la llave en cascada (scripts/migrate_order_cascade.py). Inserta
+pedidos de prueba en marzo de 2002 (3 items cada uno) y los elimina con cada versión:
+
+- "ORM, uno a uno": la versión anterior de delete_order (carga el pedido y sus items y los
+  elimina objeto por objeto) llamada por cada pedido.
+- "DELETE por IDs" / "DELETE por fechas": OrderService.delete_orders, una sola sentencia (por
+  fechas elimina todos los pedidos de marzo de 2002).
+
+Uso:
+
+    python scripts/benchmark_order_delete.py [--orders 2000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+# Agregar el directorio raíz de la aplicación al PYTHONPATH
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(app_dir)
+
+# Cargar variables del entorno desde .env.development
+dotenv_path = os.path.join(app_dir, ".env.development")
+load_dotenv(dotenv_path=dotenv_path)
+
+from sqlalchemy import text  # noqa: E402
+from sqlmodel import select  # noqa: E402
+
+from models.order import (  # noqa: E402
+    Order,
+    OrderItem,
+)
+from services.connection_pool import pool_manager  # noqa: E402
+from services.database import database_service  # noqa: E402
+from services.order_service import order_service  # noqa: E402
+
+START = datetime(2002, 3, 1)
+END = datetime(2002, 4, 1)
+
+SEED = [
+    """
+    INSERT INTO "order" (id, customer_id, status, total_amount, address, created_at, updated_at)
+    SELECT gen_random_uuid(), 'bench-delete', 'pendiente', 30000, 'Calle ' || g, ts, ts
+    FROM generate_series(1, :orders) g,
+         LATERAL (SELECT timestamp '2002-03-01' + (g % 30) * interval '1 day' AS ts) t
+    """,
+    """
+    INSERT INTO orderitem (id, order_id, product_id, product_name, quantity, unit_price, subtotal, details)
+    SELECT gen_random_uuid(), o.id, 'p' || k, 'Producto ' || k, 1, 10000, 10000, ''
+    FROM "order" o, generate_series(1, 3) k
+    WHERE o.customer_id = 'bench-delete'
+    """,
+]
+
+
+async def seed(orders: int) -> list:
+    """Inserta los pedidos de prueba y devuelve sus IDs."""
+    async with database_service.async_engine.begin() as conn:
+        for statement in SEED:
+            await conn.execute(text(statement), {"orders": orders})
+        rows = await conn.execute(text("""SELECT id FROM "order" WHERE customer_id = 'bench-delete'"""))
+        return [row.id for row in rows]
+
+
+async def remaining() -> tuple:
+    """Cuenta los pedidos e items de prueba que quedan."""
+    async with database_service.async_engine.connect() as conn:
+        row = (
+            await conn.execute(
+                text(
+                    """SELECT count(*), (SELECT count(*) FROM orderitem i JOIN "order" o ON o.id = i.order_id """
+                    """WHERE o.customer_id = 'bench-delete') FROM "order" WHERE customer_id = 'bench-delete'"""
+                )
+            )
+        ).first()
+        return tuple(row)
+
+
+async def orm_delete_order(order_id) -> bool:
+    """Versión anterior de delete_order."""
+    async with database_service.async_session() as session:
+        order = await session.get(Order, order_id)
+        if not order:
+            return False
+        items = (await session.exec(select(OrderItem).where(OrderItem.order_id == order_id))).all()
+        for item in items:
+            await session.delete(item)
+        await session.delete(order)
+        await session.commit()
+        return True
+
+
+async def orm_delete(order_ids: list) -> None:
+    """Elimina cada pedido con la versión anterior."""
+    for order_id in order_ids:
+        await orm_delete_order(order_id)
+
+
+async def bulk_delete_ids(order_ids: list) -> None:
+    """Elimina todos los pedidos por IDs en una sentencia."""
+    await order_service.delete_orders(order_ids=order_ids)
+
+
+async def bulk_delete_range(order_ids: list) -> None:
+    """Elimina todos los pedidos del mes de prueba en una sentencia."""
+    await order_service.delete_orders(start_date=START, end_date=END)
+
+
+async def main(orders: int) -> None:
+    """Mide cada versión sobre los mismos datos e imprime la tabla."""
+    results = []
+    try:
+        await bulk_delete_range([])
+        for name, func in (
+            ("ORM, uno a uno", orm_delete),
+            ("DELETE por IDs", bulk_delete_ids),
+            ("DELETE por fechas", bulk_delete_range),
+        ):
+            order_ids = await seed(orders)
+            start = time.perf_counter()
+            await func(order_ids)
+            elapsed = (time.perf_counter() - start) * 1000
+            assert await remaining() == (0, 0)
+            results.append((name, elapsed))
+    finally:
+        await bulk_delete_range([])
+        await database_service.async_engine.dispose()
+        await pool_manager.close()
+
+    print(f"Pedidos eliminados por medición: {orders} (3 items cada uno)")
+    print(f"{'versión':<22}{'total ms':>12}{'ms por pedido':>16}")
+    for name, elapsed in results:
+        print(f"{name:<22}{elapsed:>12.0f}{elapsed / orders:>16.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=2000, help="Pedidos de prueba a eliminar")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.orders))
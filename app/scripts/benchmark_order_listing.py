@@ -0,0 +1,101 @@
+"""Mide el listado de pedidos del tablero completo frente a paginado por cursor, según el tamaño del historial.
+
+Necesita una base de datos (POSTGRES_URL). Para cada tamaño inserta pedidos de prueba en enero
+de 2000 (los mismos datos que benchmark_order_stats.py), mide el listado del mes completo (lo
+que hacía /orders/by-date sin límite), la primera página y una página a mitad del historial
+alcanzada por cursor, y al final elimina los datos. Uso:
+
+    python scripts/benchmark_order_listing.py [--sizes 10000 100000] [--page-size 50] [--repeats 5]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Agregar el directorio raíz de la aplicación al PYTHONPATH
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(app_dir)
+
+from sqlalchemy import text  # noqa: E402
+
+from scripts.benchmark_order_stats import (  # noqa: E402
+    CLEANUP,
+    END,
+    SEED,
+    START,
+    execute,
+)
+from services.connection_pool import pool_manager  # noqa: E402
+from services.database import database_service  # noqa: E402
+from services.order_service import order_service  # noqa: E402
+
+
+async def timed_ms(func, repeats: int) -> float:
+    """Devuelve la mediana en ms de `repeats` ejecuciones."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        await func()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+async def middle_cursor(orders: int) -> tuple:
+    """Devuelve (created_at, id) del pedido que está a mitad del historial."""
+    async with database_service.async_engine.connect() as conn:
+        row = (
+            await conn.execute(
+                text(
+                    'SELECT created_at, id FROM "order" WHERE customer_id LIKE \'bench-%\' '
+                    "ORDER BY created_at DESC, id DESC OFFSET :offset LIMIT 1"
+                ),
+                {"offset": orders // 2},
+            )
+        ).first()
+    return row.created_at, row.id
+
+
+async def measure(orders: int, page_size: int, repeats: int) -> dict:
+    """Inserta `orders` pedidos y mide el listado completo y las páginas."""
+    await execute(CLEANUP)
+    await execute(SEED, orders=orders)
+    try:
+        after = await middle_cursor(orders)
+        return {
+            "full": await timed_ms(lambda: order_service.get_orders_by_date_range(START, END), 1),
+            "first": await timed_ms(
+                lambda: order_service.get_orders_by_date_range(START, END, limit=page_size + 1), repeats
+            ),
+            "middle": await timed_ms(
+                lambda: order_service.get_orders_by_date_range(START, END, limit=page_size + 1, after=after), repeats
+            ),
+        }
+    finally:
+        await execute(CLEANUP)
+
+
+async def main(sizes: list[int], page_size: int, repeats: int) -> None:
+    """Mide cada tamaño de historial e imprime la tabla."""
+    try:
+        results = {orders: await measure(orders, page_size, repeats) for orders in sizes}
+    finally:
+        await database_service.async_engine.dispose()
+        await pool_manager.close()
+
+    print(f"Página: {page_size} pedidos (3 items cada uno)")
+    print(f"{'pedidos':>10}{'mes completo ms':>18}{'1a página ms':>15}{'página media ms':>18}")
+    for orders, r in results.items():
+        print(f"{orders:>10}{r['full']:>18.0f}{r['first']:>15.1f}{r['middle']:>18.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000], help="Tamaños de historial")
+    parser.add_argument("--page-size", type=int, default=50, help="Pedidos por página")
+    parser.add_argument("--repeats", type=int, default=5, help="Repeticiones de cada medición de página")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.sizes, args.page_size, args.repeats))
@@ -0,0 +1,165 @@
+"""Compara las estadísticas del tablero de pedidos calculadas en Python frente a GROUP BY en Postgres.
+
+Necesita una base de datos (POSTGRES_URL). Inserta pedidos de prueba (por defecto 100.000, con
+3 items cada uno y 5.000 clientes) fechados en enero de 2000 para no mezclarse con datos reales,
+mide ambas versiones sobre ese rango y al final los elimina. "Python" es el cálculo anterior de
+/orders/by-date: carga pedidos e items, consulta los usuarios aparte y suma en bucles. Uso:
+
+    python scripts/benchmark_order_stats.py [--orders 100000] [--repeats 3]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+# Agregar el directorio raíz de la aplicación al PYTHONPATH
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(app_dir)
+
+# Cargar variables del entorno desde .env.development
+dotenv_path = os.path.join(app_dir, ".env.development")
+load_dotenv(dotenv_path=dotenv_path)
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.orm import selectinload  # noqa: E402
+from sqlmodel import select  # noqa: E402
+
+from models.order import Order  # noqa: E402
+from models.user import User  # noqa: E402
+from services.connection_pool import pool_manager  # noqa: E402
+from services.database import database_service  # noqa: E402
+from services.order_service import order_service  # noqa: E402
+
+START = datetime(2000, 1, 1)
+END = datetime(2000, 2, 1)
+
+SEED = [
+    """
+    INSERT INTO "user" (name, phone, created_at)
+    SELECT 'Cliente ' || g, 'bench-' || g, now() FROM generate_series(0, 4999) g
+    ON CONFLICT (phone) DO NOTHING
+    """,
+    """
+    INSERT INTO "order" (id, customer_id, status, total_amount, address, created_at, updated_at)
+    SELECT gen_random_uuid(), 'bench-' || (g % 5000),
+           (ARRAY['pendiente', 'en preparación', 'en reparto', 'completado'])[1 + g % 4],
+           36000, 'Calle ' || g, ts, ts
+    FROM generate_series(1, :orders) g,
+         LATERAL (SELECT timestamp '2000-01-01' + (g % 30) * interval '1 day' + (g % 86400) * interval '1 second' AS ts) t
+    """,
+    """
+    INSERT INTO orderitem (id, order_id, product_id, product_name, quantity, unit_price, subtotal, details)
+    SELECT gen_random_uuid(), o.id, 'p' || k, 'Producto ' || k, 2, 6000, 12000, ''
+    FROM "order" o, generate_series(1, 3) k
+    WHERE o.customer_id LIKE 'bench-%'
+    """,
+    'ANALYZE "order"',
+    "ANALYZE orderitem",
+]
+
+CLEANUP = [
+    """DELETE FROM orderitem WHERE order_id IN (SELECT id FROM "order" WHERE customer_id LIKE 'bench-%')""",
+    """DELETE FROM "order" WHERE customer_id LIKE 'bench-%'""",
+    """DELETE FROM "user" WHERE phone LIKE 'bench-%'""",
+]
+
+
+async def execute(statements: list[str], **params) -> None:
+    """Ejecuta las sentencias en una transacción."""
+    async with database_service.async_engine.begin() as conn:
+        for statement in statements:
+            await conn.execute(text(statement), params)
+
+
+async def python_stats() -> dict:
+    """Versión anterior: pedidos e items a memoria, usuarios en otra consulta, sumas en Python."""
+    orders_data = await legacy_orders_by_date_range(START, END)
+    # El código anterior no deduplicaba los teléfonos: con 100.000 pedidos el IN supera el
+    # límite de 65.535 parámetros de Postgres y la consulta falla; aquí se deduplican
+    customer_phones = list({order["customer_id"] for order in orders_data})
+    async with database_service.async_session() as session:
+        users = (await session.exec(select(User).where(User.phone.in_(customer_phones)))).all()
+        user_map = {user.phone: user.name for user in users}
+
+    total_sales = 0
+    for order in orders_data:
+        if order["status"] == "completado":
+            for product in order["products"]:
+                total_sales += float(product["subtotal"])
+    return {
+        "total_orders": len(orders_data),
+        "pending_orders": len([o for o in orders_data if o["status"] == "pendiente"]),
+        "complete_orders": len([o for o in orders_data if o["status"] == "completado"]),
+        "total_sales": total_sales,
+        "customers": len(user_map),
+    }
+
+
+async def legacy_orders_by_date_range(start: datetime, end: datetime) -> list[dict]:
+    """Listado anterior de get_orders_by_date_range (sin el nombre del cliente)."""
+    async with database_service.async_session() as session:
+        statement = (
+            select(Order)
+            .options(selectinload(Order.items))
+            .where(Order.created_at >= start, Order.created_at <= end)
+            .order_by(Order.created_at.desc())
+        )
+        return [
+            {
+                "customer_id": order.customer_id,
+                "status": order.status,
+                "products": [{"subtotal": item.subtotal} for item in order.items],
+            }
+            for order in (await session.exec(statement)).all()
+        ]
+
+
+async def timed(func, repeats: int) -> tuple[float, dict]:
+    """Devuelve (mediana en ms, último resultado)."""
+    times = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = await func()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+async def main(orders: int, repeats: int) -> None:
+    """Inserta los datos de prueba, mide ambas versiones y limpia."""
+    await execute(CLEANUP)
+    print(f"Insertando {orders} pedidos de prueba...")
+    await execute(SEED, orders=orders)
+    try:
+        python_ms, python_result = await timed(python_stats, repeats)
+        sql_ms, sql_result = await timed(lambda: order_service.get_order_stats(START, END), repeats)
+        list_ms, orders_data = await timed(lambda: order_service.get_orders_by_date_range(START, END), repeats)
+
+        for key in ("total_orders", "pending_orders", "complete_orders", "total_sales"):
+            assert python_result[key] == sql_result[key], (key, python_result[key], sql_result[key])
+
+        print(f"Pedidos: {orders}  items: {orders * 3}  resultado: {sql_result}")
+        print(f"{'versión':<38}{'ms':>10}")
+        print(f"{'estadísticas en Python (antes)':<38}{python_ms:>10.0f}")
+        print(f"{'estadísticas con GROUP BY (ahora)':<38}{sql_ms:>10.1f}")
+        print(f"{'listado con nombres por JOIN (ahora)':<38}{list_ms:>10.0f}")
+        print(f"Aceleración de las estadísticas: {python_ms / sql_ms:.0f}x ({len(orders_data)} pedidos en el listado)")
+    finally:
+        await execute(CLEANUP)
+        await database_service.async_engine.dispose()
+        await pool_manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=100_000, help="Pedidos de prueba a insertar")
+    parser.add_argument("--repeats", type=int, default=3, help="Repeticiones de cada medición")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.orders, args.repeats))
@@ -0,0 +1,163 @@
+"""Compara la creación de pedidos con el unit of work del ORM frente a los INSERT de varias filas.
+
+Necesita una base de datos (POSTGRES_URL). Para pedidos de 1, 10 y 50 items crea N pedidos con
+cada versión y les añade 1 producto, midiendo el tiempo por pedido y las sentencias SQL enviadas
+(contadas con un evento de SQLAlchemy). "ORM" es la versión anterior de create_order y
+add_products_to_order: un OrderItem por producto en la sesión, flush para obtener el ID,
+UPDATE del total y refresh. Los pedidos creados se eliminan al final. Uso:
+
+    python scripts/benchmark_order_writes.py [--orders 200] [--items 1 10 50]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+# Agregar el directorio raíz de la aplicación al PYTHONPATH
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(app_dir)
+
+# Cargar variables del entorno desde .env.development
+dotenv_path = os.path.join(app_dir, ".env.development")
+load_dotenv(dotenv_path=dotenv_path)
+
+from sqlalchemy import (  # noqa: E402
+    event,
+    text,
+)
+
+from models.order import (  # noqa: E402
+    Order,
+    OrderItem,
+)
+from services.connection_pool import pool_manager  # noqa: E402
+from services.database import database_service  # noqa: E402
+from services.order_service import order_service  # noqa: E402
+from utils.utils import current_colombian_time  # noqa: E402
+
+CUSTOMER = "bench-writes"
+statements = 0
+
+
+def count_statements(*_args) -> None:
+    """Cuenta cada sentencia que SQLAlchemy envía a Postgres."""
+    global statements
+    statements += 1
+
+
+async def orm_create_order(products: list[dict]) -> Order:
+    """Versión anterior de create_order (sin el aviso al tablero)."""
+    async with database_service.async_session() as session:
+        order = Order(customer_id=CUSTOMER, address="Calle 1")
+        session.add(order)
+        await session.flush()
+        total_amount = 0
+        for product in products:
+            session.add(OrderItem(order_id=order.id, product_id="", details="", **product))
+            total_amount += product["subtotal"]
+        order.total_amount = total_amount
+        session.add(order)
+        await session.commit()
+        await session.refresh(order)
+        return order
+
+
+async def orm_add_products(order_id, products: list[dict]) -> Order:
+    """Versión anterior de add_products_to_order."""
+    async with database_service.async_session() as session:
+        order = await session.get(Order, order_id)
+        total_amount = order.total_amount
+        for product in products:
+            session.add(OrderItem(order_id=order.id, product_id="", details="", **product))
+            total_amount += product["subtotal"]
+        order.total_amount = total_amount
+        order.updated_at = datetime.fromisoformat(current_colombian_time())
+        session.add(order)
+        await session.commit()
+        await session.refresh(order)
+        return order
+
+
+async def bulk_create_order(products: list[dict]) -> Order:
+    """Versión actual (OrderService.create_order)."""
+    return await order_service.create_order(CUSTOMER, "Calle 1", products)
+
+
+async def bulk_add_products(order_id, products: list[dict]) -> Order:
+    """Versión actual (OrderService.add_products_to_order)."""
+    return await order_service.add_products_to_order(order_id, products)
+
+
+async def measure(create, add, orders: int, items: int) -> dict:
+    """Crea `orders` pedidos de `items` items y les añade un producto; devuelve ms y sentencias."""
+    global statements
+    products = [
+        {"product_name": f"Producto {i}", "quantity": 2, "unit_price": 5000, "subtotal": 10000} for i in range(items)
+    ]
+    extra = [{"product_name": "Gaseosa", "quantity": 1, "unit_price": 3000, "subtotal": 3000}]
+
+    create_ms, add_ms = [], []
+    statements = 0
+    for _ in range(orders):
+        start = time.perf_counter()
+        order = await create(products)
+        create_ms.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        order = await add(order.id, extra)
+        add_ms.append((time.perf_counter() - start) * 1000)
+        assert order.total_amount == 10000 * items + 3000
+    return {
+        "create_ms": statistics.median(create_ms),
+        "add_ms": statistics.median(add_ms),
+        "statements": statements / orders,
+    }
+
+
+async def cleanup() -> None:
+    """Elimina los pedidos de prueba."""
+    async with database_service.async_engine.begin() as conn:
+        await conn.execute(
+            text('DELETE FROM orderitem WHERE order_id IN (SELECT id FROM "order" WHERE customer_id = :c)'),
+            {"c": CUSTOMER},
+        )
+        await conn.execute(text('DELETE FROM "order" WHERE customer_id = :c'), {"c": CUSTOMER})
+
+
+async def main(orders: int, item_counts: list[int]) -> None:
+    """Mide ambas versiones para cada número de items e imprime la tabla."""
+    event.listen(database_service.async_engine.sync_engine, "before_cursor_execute", count_statements)
+    results = []
+    try:
+        # Calentamiento (conexiones del pool y compilación de sentencias)
+        await measure(orm_create_order, orm_add_products, 5, 1)
+        await measure(bulk_create_order, bulk_add_products, 5, 1)
+        for items in item_counts:
+            for name, create, add in (
+                ("ORM", orm_create_order, orm_add_products),
+                ("INSERT múltiple", bulk_create_order, bulk_add_products),
+            ):
+                results.append((items, name, await measure(create, add, orders, items)))
+    finally:
+        await cleanup()
+        await database_service.async_engine.dispose()
+        await pool_manager.close()
+
+    print(f"Pedidos por medición: {orders} (mediana por pedido)")
+    print(f"{'items':>6}  {'versión':<18}{'crear ms':>10}{'añadir ms':>11}{'sentencias':>12}")
+    for items, name, r in results:
+        print(f"{items:>6}  {name:<18}{r['create_ms']:>10.2f}{r['add_ms']:>11.2f}{r['statements']:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=200, help="Pedidos creados por medición")
+    parser.add_argument("--items", type=int, nargs="+", default=[1, 10, 50], help="Items por pedido")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.orders, args.items))
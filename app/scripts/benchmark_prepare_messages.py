@@ -0,0 +1,92 @@
+"""Mide `prepare_messages` sobre historiales de 200 mensajes.
+
+Compara el recorte anterior (`trim_messages` sobre el historial volcado a dicts y re-tokenizado
+completo en cada llamada) con el recorrido desde el final usando los conteos por mensaje
+cacheados en el estado: en frío (sin cache) y en régimen (solo los mensajes nuevos del turno
+se tokenizan). Ambas variantes usan el mismo tokenizador local. Uso:
+
+    python scripts/benchmark_prepare_messages.py [--messages 200] [--iterations 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+
+# Agregar el directorio raíz de la aplicación al PYTHONPATH
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(app_dir)
+
+from langchain_core.messages import (  # noqa: E402
+    AIMessage,
+    HumanMessage,
+    ToolMessage,
+    trim_messages,
+)
+
+from core.config import settings  # noqa: E402
+from utils import count_message_tokens, dump_messages, prepare_messages  # noqa: E402
+
+
+def build_history(size: int) -> list:
+    """Crea un historial realista: turnos humano → IA con tool call → resultado → IA."""
+    messages = []
+    while len(messages) < size:
+        turn = len(messages)
+        call_id = f"call_{turn}"
+        messages += [
+            HumanMessage(content=f"Hola, quiero 2 bandejas paisas y una limonada para la calle {turn} # 45-12", id=str(uuid.uuid4())),
+            AIMessage(
+                content="",
+                tool_calls=[{"name": "get_menu", "args": {}, "id": call_id}],
+                id=str(uuid.uuid4()),
+            ),
+            ToolMessage(content=str({"Platos": [{"name": "Bandeja paisa", "price": 28000}] * 8}), tool_call_id=call_id, id=str(uuid.uuid4())),
+            AIMessage(content="¡Claro! La bandeja paisa cuesta $28.000. ¿Confirmo tu pedido con la limonada?", id=str(uuid.uuid4())),
+        ]
+    return messages[:size]
+
+
+def legacy_prepare(messages: list) -> list:
+    """Recorte anterior: volcar todo el historial y contar tokens desde cero."""
+    return trim_messages(
+        dump_messages(messages),
+        strategy="last",
+        token_counter=lambda msgs: sum(count_message_tokens(m) for m in msgs),
+        max_tokens=settings.MAX_TOKENS,
+        start_on="human",
+        include_system=False,
+        allow_partial=False,
+    )
+
+
+def time_ms(fn, iterations: int) -> float:
+    """Tiempo promedio por llamada en milisegundos."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=200, help="Tamaño del historial")
+    parser.add_argument("--iterations", type=int, default=200, help="Repeticiones por variante")
+    args = parser.parse_args()
+
+    history = build_history(args.messages)
+    cache = {}
+    prepare_messages(history, "system", cache)
+    new_turn = history + [HumanMessage(content="¿Cuánto se demora?", id=str(uuid.uuid4()))]
+
+    legacy_ms = time_ms(lambda: legacy_prepare(history), args.iterations)
+    cold_ms = time_ms(lambda: prepare_messages(history, "system", {}), args.iterations)
+    warm_ms = time_ms(lambda: prepare_messages(new_turn, "system", dict(cache)), args.iterations)
+
+    legacy_len = len(legacy_prepare(history))
+    new_len = len(prepare_messages(history, "system", {})) - 1
+    print(f"Historial: {args.messages} mensajes, MAX_TOKENS={settings.MAX_TOKENS}, mensajes conservados: {legacy_len} / {new_len}")
+    print(f"trim_messages (re-tokeniza todo):  {legacy_ms:8.3f} ms")
+    print(f"recorrido desde el final, en frío: {cold_ms:8.3f} ms")
+    print(f"recorrido con conteos cacheados:   {warm_ms:8.3f} ms")
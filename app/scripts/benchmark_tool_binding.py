@@ -0,0 +1,45 @@
+"""Mide el costo de enlazar las herramientas al LLM en cada turno frente a reutilizar el runnable cacheado.
+
+No hace llamadas a la API: solo compara `llm.bind_tools(...)` (serialización de los esquemas
+JSON de las tools) contra la búsqueda en `LangGraphAgent.agent_llms`. Uso:
+
+    python scripts/benchmark_tool_binding.py [--iterations 2000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Agregar el directorio raíz de la aplicación al PYTHONPATH
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(app_dir)
+
+from core.langgraph.graph import LangGraphAgent  # noqa: E402
+
+
+def time_per_call(fn, iterations: int) -> float:
+    """Devuelve el tiempo promedio por llamada en microsegundos."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000, help="Repeticiones por agente")
+    args = parser.parse_args()
+
+    agent = LangGraphAgent()
+    print(f"{'agente':<22}{'bind por turno µs':>20}{'cacheado µs':>14}")
+    total_bind = total_cached = 0.0
+    for name, agent_tools in agent.agent_tools.items():
+        if not agent_tools:
+            continue
+        bind_us = time_per_call(lambda: agent.llm.bind_tools(agent_tools), args.iterations)
+        cached_us = time_per_call(lambda: agent.agent_llms[name], args.iterations)
+        total_bind += bind_us
+        total_cached += cached_us
+        print(f"{name:<22}{bind_us:>20.1f}{cached_us:>14.3f}")
+    print(f"{'total':<22}{total_bind:>20.1f}{total_cached:>14.3f}")
@@ -0,0 +1,103 @@
+"""Compara la ejecución secuencial y concurrente de las tool calls de un AIMessage con herramientas falsas.
+
+Las herramientas falsas solo duermen (simulan get_menu, get_last_order y envío de imágenes),
+así que no se necesita base de datos ni API. Verifica además que el orden de los ToolMessage
+coincide con el de los tool_call_id y que una herramienta lenta se corta por timeout. Uso:
+
+    python scripts/benchmark_tool_concurrency.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+# Agregar el directorio raíz de la aplicación al PYTHONPATH
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(app_dir)
+
+from langchain_core.messages import AIMessage  # noqa: E402
+from langchain_core.tools import tool  # noqa: E402
+
+from core.config import settings  # noqa: E402
+from core.langgraph.graph import LangGraphAgent  # noqa: E402
+from schemas import GraphState  # noqa: E402
+
+
+@tool
+async def fake_get_menu() -> str:
+    """Simula la consulta del menú."""
+    await asyncio.sleep(0.30)
+    return "menu"
+
+
+@tool
+async def fake_get_last_order() -> str:
+    """Simula la consulta de la última orden."""
+    await asyncio.sleep(0.20)
+    return "last_order"
+
+
+@tool
+async def fake_send_image(image: str) -> str:
+    """Simula el envío de una imagen del menú."""
+    await asyncio.sleep(0.25)
+    return f"sent {image}"
+
+
+@tool
+async def fake_slow_tool() -> str:
+    """Simula una herramienta colgada."""
+    await asyncio.sleep(10)
+    return "never"
+
+
+def build_state(tool_calls: list[dict]) -> GraphState:
+    """Crea un estado cuyo último mensaje pide las tool calls indicadas."""
+    return GraphState(session_id="bench-session", messages=[AIMessage(content="", tool_calls=tool_calls)])
+
+
+async def sequential(agent: LangGraphAgent, state: GraphState) -> list:
+    """Ejecución anterior: una herramienta tras otra."""
+    write_lock = asyncio.Lock()
+    return [await agent._run_tool(tool_call, write_lock) for tool_call in state.messages[-1].tool_calls]
+
+
+async def main() -> None:
+    """Corre la comparación y las verificaciones de orden y timeout."""
+    agent = LangGraphAgent()
+    agent.tools_by_name = {t.name: t for t in (fake_get_menu, fake_get_last_order, fake_send_image, fake_slow_tool)}
+
+    tool_calls = [
+        {"name": "fake_get_menu", "args": {}, "id": "call_menu"},
+        {"name": "fake_get_last_order", "args": {}, "id": "call_order"},
+        *({"name": "fake_send_image", "args": {"image": f"img{i}"}, "id": f"call_img{i}"} for i in range(3)),
+    ]
+
+    start = time.perf_counter()
+    await sequential(agent, build_state(tool_calls))
+    sequential_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    result = await agent._tool_call(build_state(tool_calls))
+    concurrent_ms = (time.perf_counter() - start) * 1000
+
+    ids = [message.tool_call_id for message in result["messages"]]
+    assert ids == [tool_call["id"] for tool_call in tool_calls], ids
+    print(f"Tool calls: {len(tool_calls)}")
+    print(f"Secuencial:  {sequential_ms:7.0f} ms")
+    print(f"Concurrente: {concurrent_ms:7.0f} ms  (orden de tool_call_id conservado)")
+
+    settings.TOOL_TIMEOUTS["fake_slow_tool"] = 0.5
+    start = time.perf_counter()
+    result = await agent._tool_call(build_state([
+        {"name": "fake_slow_tool", "args": {}, "id": "call_slow"},
+        {"name": "fake_get_menu", "args": {}, "id": "call_menu"},
+    ]))
+    timeout_ms = (time.perf_counter() - start) * 1000
+    assert "error" in result["messages"][0].content and result["messages"][1].content == "menu"
+    print(f"Con una herramienta colgada (timeout 0.5 s): {timeout_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
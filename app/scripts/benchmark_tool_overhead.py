@@ -0,0 +1,113 @@
+"""Mide el overhead de las tools síncronas con `asyncio.run` frente a las tools async bajo concurrencia.
+
+Simula N conversaciones simultáneas que llaman `get_menu` y `get_last_order`. Los métodos de
+los servicios se reemplazan dentro del script por corrutinas que solo esperan `--io-ms`
+(simulando el viaje a la base de datos), de modo que lo que se mide es el costo de la
+ejecución de la tool: salto a un hilo del executor más un event loop nuevo por llamada
+(versión anterior) frente a un `await` directo en el loop principal. Uso:
+
+    python scripts/benchmark_tool_overhead.py [--conversations 100] [--io-ms 5]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+# Agregar el directorio raíz de la aplicación al PYTHONPATH
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(app_dir)
+
+from langchain_core.tools import tool  # noqa: E402
+
+from core.langgraph.tools import get_last_order, get_menu_tool  # noqa: E402
+from services.inventory_service import inventory_service  # noqa: E402
+from services.order_service import OrderService  # noqa: E402
+
+IO_SECONDS = 0.005
+
+
+async def fake_get_menu_products() -> list[dict]:
+    """Simula la consulta de productos del menú."""
+    await asyncio.sleep(IO_SECONDS)
+    return [{"name": f"Plato {i}", "description": "", "price": 10000, "category": f"cat{i % 4}"} for i in range(20)]
+
+
+async def fake_get_last_order(self, customer_id: str) -> dict:
+    """Simula la consulta de la última orden."""
+    await asyncio.sleep(IO_SECONDS)
+    return {"order_id": "00000000-0000-0000-0000-000000000000", "status": "pending", "products": []}
+
+
+@tool
+def legacy_get_menu() -> dict:
+    """Versión anterior de get_menu: tool síncrona con asyncio.run."""
+    products = asyncio.run(inventory_service.get_menu_products())
+    menu_by_category = {}
+    for product in products:
+        menu_by_category.setdefault(product["category"], []).append(product)
+    return menu_by_category
+
+
+@tool
+def legacy_get_last_order(phone: str) -> dict:
+    """Versión anterior de get_last_order: tool síncrona con asyncio.run."""
+    last_order = asyncio.run(OrderService().get_last_order(phone))
+    return {"message": "Se encontró la última orden del cliente", "has_orders": True, "order": last_order}
+
+
+async def run(menu_tool, order_tool, conversations: int) -> dict:
+    """Lanza las conversaciones concurrentes y mide latencia por turno y pico de hilos."""
+    peak_threads = threading.active_count()
+    stop = asyncio.Event()
+
+    async def sample_threads() -> None:
+        nonlocal peak_threads
+        while not stop.is_set():
+            peak_threads = max(peak_threads, threading.active_count())
+            await asyncio.sleep(0.001)
+
+    async def conversation(i: int) -> float:
+        start = time.perf_counter()
+        await asyncio.gather(menu_tool.ainvoke({}), order_tool.ainvoke({"phone": f"57300{i:07d}"}))
+        return (time.perf_counter() - start) * 1000
+
+    sampler = asyncio.create_task(sample_threads())
+    start = time.perf_counter()
+    latencies = sorted(await asyncio.gather(*(conversation(i) for i in range(conversations))))
+    total_ms = (time.perf_counter() - start) * 1000
+    stop.set()
+    await sampler
+    return {
+        "total_ms": total_ms,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "peak_threads": peak_threads,
+    }
+
+
+def main(conversations: int) -> None:
+    """Compara ambas versiones de las tools, cada una en un event loop (y executor) nuevo."""
+    inventory_service.get_menu_products = fake_get_menu_products
+    OrderService.get_last_order = fake_get_last_order
+
+    results = {
+        "sync + asyncio.run": asyncio.run(run(legacy_get_menu, legacy_get_last_order, conversations)),
+        "async": asyncio.run(run(get_menu_tool, get_last_order, conversations)),
+    }
+    print(f"Conversaciones concurrentes: {conversations}  (I/O simulado: {IO_SECONDS * 1000:.0f} ms)")
+    print(f"{'tools':<20}{'total ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'hilos pico':>12}")
+    for name, r in results.items():
+        print(f"{name:<20}{r['total_ms']:>10.0f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['peak_threads']:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=100, help="Conversaciones simultáneas")
+    parser.add_argument("--io-ms", type=float, default=5, help="Latencia simulada de cada consulta")
+    args = parser.parse_args()
+    IO_SECONDS = args.io_ms / 1000
+    main(args.conversations)
@@ -0,0 +1,82 @@
+"""Evalúa el clasificador local de intenciones contra el conjunto etiquetado de fixtures.
+
+Reporta la tasa de aciertos locales (mensajes resueltos sin llamar al LLM), la precisión
+sobre esos aciertos y el costo por mensaje. Uso:
+
+    python scripts/evaluate_intent_classifier.py [--threshold 0.75] [--verbose]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+# Agregar el directorio raíz de la aplicación al PYTHONPATH
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(app_dir)
+
+from core.langgraph.intent_classifier import classify_intent  # noqa: E402
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "intent_fixtures.jsonl")
+
+
+def load_fixtures(path: str) -> list[dict]:
+    """Carga los mensajes etiquetados (una línea JSON con `text` y `label` por mensaje)."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def evaluate(fixtures: list[dict], threshold: float = None, verbose: bool = False) -> dict:
+    """Clasifica cada fixture y calcula tasa de aciertos locales y precisión."""
+    hits = 0
+    correct = 0
+    errors = []
+    per_label = Counter()
+    per_label_hits = Counter()
+
+    start = time.perf_counter()
+    for fixture in fixtures:
+        prediction = classify_intent(fixture["text"], threshold=threshold)
+        per_label[fixture["label"]] += 1
+        if prediction.node is None:
+            continue
+        hits += 1
+        per_label_hits[fixture["label"]] += 1
+        if prediction.node == fixture["label"]:
+            correct += 1
+        else:
+            errors.append((fixture["text"], fixture["label"], prediction.node, round(prediction.confidence, 2)))
+    elapsed = time.perf_counter() - start
+
+    if verbose:
+        for text, label, predicted, confidence in errors:
+            print(f"  ERROR  {text!r}: esperado={label} obtenido={predicted} confianza={confidence}")
+
+    return {
+        "total": len(fixtures),
+        "hits": hits,
+        "hit_rate": hits / len(fixtures) if fixtures else 0.0,
+        "accuracy_on_hits": correct / hits if hits else 0.0,
+        "errors": len(errors),
+        "per_label_hit_rate": {label: per_label_hits[label] / per_label[label] for label in sorted(per_label)},
+        "us_per_message": elapsed / len(fixtures) * 1e6 if fixtures else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threshold", type=float, default=None, help="Umbral de confianza (por defecto el configurado)")
+    parser.add_argument("--fixtures", default=FIXTURES_PATH, help="Ruta al archivo JSONL etiquetado")
+    parser.add_argument("--verbose", action="store_true", help="Mostrar los mensajes mal clasificados")
+    args = parser.parse_args()
+
+    report = evaluate(load_fixtures(args.fixtures), threshold=args.threshold, verbose=args.verbose)
+    print(f"Mensajes evaluados:        {report['total']}")
+    print(f"Resueltos sin LLM:         {report['hits']} ({report['hit_rate']:.1%})")
+    print(f"Precisión sobre resueltos: {report['accuracy_on_hits']:.1%} ({report['errors']} errores)")
+    print(f"Costo por mensaje:         {report['us_per_message']:.1f} µs")
+    print("Tasa de aciertos por etiqueta:")
+    for label, rate in report["per_label_hit_rate"].items():
+        print(f"  {label:<20} {rate:.1%}")
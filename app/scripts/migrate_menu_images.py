@@ -0,0 +1,90 @@
+"""Migra la tabla menu_images del formato hexadecimal (image_hex) a JPEG binario direccionado por hash.
+
+Agrega las columnas image_data, content_hash, content_type y size_bytes, convierte cada imagen
+existente a un JPEG listo para WhatsApp (mismo proceso que MenuService.insert_menu) y, cuando
+todas las filas quedaron convertidas, elimina la columna image_hex. Se puede ejecutar varias
+veces sin efectos adicionales. Uso:
+
+    python scripts/migrate_menu_images.py
+"""
+
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Agregar el directorio raíz de la aplicación al PYTHONPATH
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(app_dir)
+
+# Cargar variables del entorno desde .env.development
+dotenv_path = os.path.join(app_dir, ".env.development")
+load_dotenv(dotenv_path=dotenv_path)
+
+from sqlalchemy import text  # noqa: E402
+from sqlmodel import create_engine  # noqa: E402
+
+from core.config import settings  # noqa: E402
+from utils import content_hash, encode_whatsapp_jpeg  # noqa: E402
+
+ADD_COLUMNS = [
+    "ALTER TABLE menu_images ADD COLUMN IF NOT EXISTS image_data BYTEA",
+    "ALTER TABLE menu_images ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)",
+    "ALTER TABLE menu_images ADD COLUMN IF NOT EXISTS content_type VARCHAR NOT NULL DEFAULT 'image/jpeg'",
+    "ALTER TABLE menu_images ADD COLUMN IF NOT EXISTS size_bytes INTEGER NOT NULL DEFAULT 0",
+    "CREATE INDEX IF NOT EXISTS ix_menu_images_content_hash ON menu_images (content_hash)",
+]
+
+
+def migrate_menu_images():
+    """
+    Convierte las imágenes en hexadecimal a JPEG binario y elimina la columna image_hex.
+    """
+    engine = create_engine(settings.POSTGRES_URL)
+    with engine.begin() as connection:
+        for statement in ADD_COLUMNS:
+            connection.execute(text(statement))
+
+        has_hex = connection.execute(
+            text(
+                "SELECT 1 FROM information_schema.columns "
+                "WHERE table_name = 'menu_images' AND column_name = 'image_hex'"
+            )
+        ).first()
+        if not has_hex:
+            print("La tabla menu_images ya está migrada.")
+            return
+
+        rows = connection.execute(
+            text("SELECT id, image_hex FROM menu_images WHERE image_data IS NULL AND image_hex IS NOT NULL")
+        ).all()
+        for row_id, image_hex in rows:
+            image_data = encode_whatsapp_jpeg(
+                bytes.fromhex(image_hex),
+                max_side=settings.MENU_IMAGE_MAX_SIDE,
+                quality=settings.MENU_IMAGE_JPEG_QUALITY,
+            )
+            connection.execute(
+                text(
+                    "UPDATE menu_images SET image_data = :image_data, content_hash = :content_hash, "
+                    "content_type = 'image/jpeg', size_bytes = :size_bytes WHERE id = :id"
+                ),
+                {
+                    "image_data": image_data,
+                    "content_hash": content_hash(image_data),
+                    "size_bytes": len(image_data),
+                    "id": row_id,
+                },
+            )
+            print(f"Imagen {row_id}: {len(image_hex) // 2} bytes -> {len(image_data)} bytes JPEG")
+
+        pending = connection.execute(text("SELECT count(*) FROM menu_images WHERE image_data IS NULL")).scalar()
+        if pending:
+            print(f"Quedan {pending} imágenes sin convertir; se conserva la columna image_hex.")
+            return
+        connection.execute(text("ALTER TABLE menu_images DROP COLUMN image_hex"))
+        print(f"Migración completada: {len(rows)} imágenes convertidas.")
+
+
+if __name__ == "__main__":
+    migrate_menu_images()
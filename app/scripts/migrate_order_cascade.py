@@ -0,0 +1,52 @@
+"""Agrega ON DELETE CASCADE a la llave foránea orderitem.order_id en una base de datos existente.
+
+`SQLModel.metadata.create_all` no modifica tablas ya creadas, así que la llave que declara el
+modelo (ondelete="CASCADE") hay que cambiarla aquí. La nueva restricción se crea NOT VALID (sin
+revisar las filas mientras se bloquea la tabla) y se valida después en otra transacción, que no
+bloquea escrituras. Se puede ejecutar varias veces. Uso:
+
+    python scripts/migrate_order_cascade.py
+"""
+
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Agregar el directorio raíz de la aplicación al PYTHONPATH
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(app_dir)
+
+# Cargar variables del entorno desde .env.development
+dotenv_path = os.path.join(app_dir, ".env.development")
+load_dotenv(dotenv_path=dotenv_path)
+
+from sqlalchemy import text  # noqa: E402
+from sqlmodel import create_engine  # noqa: E402
+
+from core.config import settings  # noqa: E402
+
+# Cada sentencia corre en su propia transacción (AUTOCOMMIT)
+STATEMENTS = [
+    # Cambiar la llave en una sola sentencia: no hay momento sin restricción
+    "ALTER TABLE orderitem DROP CONSTRAINT IF EXISTS orderitem_order_id_fkey, "
+    "ADD CONSTRAINT orderitem_order_id_fkey FOREIGN KEY (order_id) "
+    'REFERENCES "order" (id) ON DELETE CASCADE NOT VALID',
+    "ALTER TABLE orderitem VALIDATE CONSTRAINT orderitem_order_id_fkey",
+]
+
+
+def migrate_order_cascade():
+    """
+    Reemplaza la llave foránea de los items de pedido por una con ON DELETE CASCADE.
+    """
+    engine = create_engine(settings.POSTGRES_URL, isolation_level="AUTOCOMMIT")
+    with engine.connect() as connection:
+        for statement in STATEMENTS:
+            connection.execute(text(statement))
+            print(statement)
+    print("Llave foránea de items de pedido actualizada correctamente.")
+
+
+if __name__ == "__main__":
+    migrate_order_cascade()
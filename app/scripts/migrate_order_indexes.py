@@ -0,0 +1,52 @@
+"""Crea en una base de datos existente los índices de pedidos que declaran los modelos.
+
+`SQLModel.metadata.create_all` solo crea tablas nuevas, así que los índices agregados después a
+los modelos hay que crearlos aquí. Se usan CREATE INDEX CONCURRENTLY (sin bloquear escrituras)
+e IF NOT EXISTS / IF EXISTS, de modo que se puede ejecutar varias veces. Uso:
+
+    python scripts/migrate_order_indexes.py
+"""
+
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Agregar el directorio raíz de la aplicación al PYTHONPATH
+app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(app_dir)
+
+# Cargar variables del entorno desde .env.development
+dotenv_path = os.path.join(app_dir, ".env.development")
+load_dotenv(dotenv_path=dotenv_path)
+
+from sqlalchemy import text  # noqa: E402
+from sqlmodel import create_engine  # noqa: E402
+
+from core.config import settings  # noqa: E402
+
+INDEXES = [
+    # Rangos de fechas y paginación por cursor del tablero de pedidos (/orders/by-date,
+    # /orders/today, /orders/stats); reemplaza al índice solo sobre created_at
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_order_created_at_id ON "order" (created_at, id)',
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_order_created_at",
+    # Último pedido de cada cliente; reemplaza al índice solo sobre customer_id
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_order_customer_id_created_at ON "order" (customer_id, created_at DESC)',
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_order_customer_id",
+]
+
+
+def migrate_order_indexes():
+    """
+    Crea los índices de pedidos que falten y elimina los reemplazados.
+    """
+    engine = create_engine(settings.POSTGRES_URL, isolation_level="AUTOCOMMIT")
+    with engine.connect() as connection:
+        for statement in INDEXES:
+            connection.execute(text(statement))
+            print(statement)
+    print("Índices de pedidos creados correctamente.")
+
+
+if __name__ == "__main__":
+    migrate_order_indexes()
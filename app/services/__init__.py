@@ -1,7 +1,13 @@
 """This file contains the services for the application."""
 
+from services.baileys_client import baileys_client
+from services.connection_pool import pool_manager
 from services.database import database_service
 from services.order_service import order_service
 from services.inventory_service import inventory_service
+from services.menu_snapshot import menu_snapshot_cache
+from services.order_archiver import order_archiver
+from services.order_events import order_event_broadcaster
+from services.thread_cache import thread_cache
 
-__all__ = ["database_service", "order_service", "inventory_service"]
+__all__ = ["baileys_client", "database_service", "order_service", "inventory_service", "menu_snapshot_cache", "order_archiver", "order_event_broadcaster", "pool_manager", "thread_cache"]
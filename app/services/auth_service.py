@@ -2,7 +2,7 @@
 
 from typing import Optional
 from datetime import datetime, timedelta
-from sqlmodel import Session, select
+from sqlmodel import select
 from jose import jwt, JWTError
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
@@ -41,11 +41,11 @@ class AuthService:
         Raises:
             HTTPException: Si ya existe un administrador con ese username
         """
-        with Session(self.db.engine) as session:
+        async with self.db.async_session() as session:
             # Verificar si ya existe el username
-            username_exists = session.exec(
+            username_exists = (await session.exec(
                 select(Admin).where(Admin.username == admin_data.username)
-            ).first()
+            )).first()
             
             if username_exists:
                 raise HTTPException(
@@ -61,16 +61,16 @@ class AuthService:
             )
             
             session.add(new_admin)
-            session.commit()
-            session.refresh(new_admin)
+            await session.commit()
+            await session.refresh(new_admin)
             return new_admin
     
     async def authenticate_admin(self, login_data: LoginRequest) -> Optional[dict]:
         """Autentica a un administrador y retorna un dict plano con los datos necesarios."""
-        with Session(self.db.engine) as session:
-            admin = session.exec(
+        async with self.db.async_session() as session:
+            admin = (await session.exec(
                 select(Admin).where(Admin.username == login_data.username)
-            ).first()
+            )).first()
             
             if not admin or not admin.verify_password(login_data.password.get_secret_value()):
                 return None
@@ -78,7 +78,7 @@ class AuthService:
             # Actualizar última fecha de inicio de sesión
             admin.last_login = datetime.utcnow()
             session.add(admin)
-            session.commit()
+            await session.commit()
             
             # Retornar un dict plano con los datos necesarios
             return {
@@ -133,8 +133,8 @@ class AuthService:
         except JWTError:
             raise credentials_exception
         
-        with Session(self.db.engine) as session:
-            admin = session.get(Admin, admin_id)
+        async with self.db.async_session() as session:
+            admin = await session.get(Admin, admin_id)
             
             if admin is None:
                 raise credentials_exception
@@ -0,0 +1,154 @@
+"""Cliente HTTP compartido para el puente de WhatsApp (Baileys)."""
+
+import asyncio
+import random
+from typing import (
+    Any,
+    Dict,
+    Optional,
+)
+
+import httpx
+
+from core.config import settings
+from core.logging import logger
+
+# Errores de la fase de conexión: la solicitud no llegó al puente, así que reintentar no duplica
+# mensajes. Un corte a mitad de respuesta (RemoteProtocolError) o un 504 del proxy pueden llegar
+# cuando el puente ya envió el mensaje, por eso no se reintentan
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+# Respuestas del proxy cuando no pudo entregar la solicitud al puente
+RETRYABLE_STATUS_CODES = {502, 503}
+
+
+class BaileysClient:
+    """Cliente del puente de WhatsApp con conexiones persistentes, concurrencia acotada y reintentos.
+
+    Se crea una sola vez (en el lifespan de la aplicación) y todas las llamadas al puente lo
+    comparten, de modo que las conexiones TCP se reutilizan entre envíos.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str],
+        max_connections: int,
+        max_concurrency: int,
+        timeout: float,
+        max_retries: int,
+        retry_backoff: float,
+    ):
+        """Inicializa el cliente sin abrir conexiones.
+
+        Args:
+            base_url: URL del servidor de Baileys
+            max_connections: Conexiones máximas en el pool (todas se mantienen vivas)
+            max_concurrency: Solicitudes simultáneas máximas al puente
+            timeout: Timeout por defecto de cada solicitud, en segundos
+            max_retries: Reintentos ante errores de conexión o respuestas 502/503
+            retry_backoff: Espera base del backoff exponencial, en segundos
+        """
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self) -> None:
+        """Crea el cliente HTTP con su pool de conexiones."""
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url or "",
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+        )
+        logger.info("baileys_client_started", base_url=self.base_url, max_connections=self.max_connections)
+
+    async def close(self) -> None:
+        """Cierra el cliente y sus conexiones."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("baileys_client_closed")
+
+    def _backoff(self, attempt: int) -> float:
+        """Espera antes del reintento `attempt` (backoff exponencial con jitter completo)."""
+        return random.uniform(0, self.retry_backoff * 2**attempt)
+
+    async def post(self, path: str, payload: Dict[str, Any], timeout: Optional[float] = None) -> httpx.Response:
+        """Envía un POST al puente, reintentando solo cuando la solicitud no pudo entregarse.
+
+        Args:
+            path: Ruta del endpoint del puente (p. ej. /api/send-message)
+            payload: Cuerpo JSON de la solicitud
+            timeout: Timeout de esta llamada, en segundos (por defecto el del cliente)
+
+        Returns:
+            httpx.Response: La respuesta del puente
+
+        Raises:
+            httpx.HTTPError: Si la solicitud falla tras agotar los reintentos
+        """
+        # Las llamadas hechas fuera del lifespan (scripts, pruebas) abren el cliente al vuelo
+        if self._client is None:
+            await self.start()
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore:
+                    response = await self._client.post(path, json=payload, timeout=timeout or self.timeout)
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt == self.max_retries:
+                    return response
+                logger.warning("baileys_request_retry", path=path, attempt=attempt + 1, status_code=response.status_code)
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning("baileys_request_retry", path=path, attempt=attempt + 1, error=str(e))
+            await asyncio.sleep(self._backoff(attempt))
+
+    async def send_message(self, number: str, message: str) -> httpx.Response:
+        """Envía un mensaje de texto.
+
+        Args:
+            number: Número de teléfono del destinatario
+            message: Texto a enviar
+
+        Returns:
+            httpx.Response: La respuesta del puente
+        """
+        return await self.post("/api/send-message", {"number": number, "message": message})
+
+    async def send_image(self, payload: Dict[str, Any]) -> httpx.Response:
+        """Envía una imagen (por referencia: phone, imageUrl, contentHash, caption).
+
+        Args:
+            payload: Datos de la imagen en el formato que espera /api/send-images
+
+        Returns:
+            httpx.Response: La respuesta del puente
+        """
+        return await self.post("/api/send-images", payload)
+
+    async def send_location(self, number: str) -> httpx.Response:
+        """Envía la ubicación del restaurante.
+
+        Args:
+            number: Número de teléfono del destinatario
+
+        Returns:
+            httpx.Response: La respuesta del puente
+        """
+        return await self.post("/api/send-location", {"number": number})
+
+
+# Crear una instancia singleton del cliente
+baileys_client = BaileysClient(
+    base_url=settings.BAILEYS_SERVER_URL,
+    max_connections=settings.BAILEYS_MAX_CONNECTIONS,
+    max_concurrency=settings.BAILEYS_MAX_CONCURRENCY,
+    timeout=settings.BAILEYS_TIMEOUT_SECONDS,
+    max_retries=settings.BAILEYS_MAX_RETRIES,
+    retry_backoff=settings.BAILEYS_RETRY_BACKOFF_SECONDS,
+)
@@ -0,0 +1,166 @@
+"""Pool único de conexiones a Postgres compartido por el ORM y el checkpointer de LangGraph."""
+
+from typing import (
+    Any,
+    Dict,
+)
+
+from psycopg import AsyncConnection
+from psycopg_pool import AsyncConnectionPool
+from sqlalchemy.engine import make_url
+
+from core.config import settings
+from core.logging import logger
+
+
+def compute_worker_budget(max_connections: int, workers: int, reserved: int) -> int:
+    """Calcula cuántas conexiones puede abrir cada worker sin superar el límite global.
+
+    Args:
+        max_connections: Límite global de conexiones para la aplicación
+        workers: Número de workers (procesos) de la aplicación
+        reserved: Conexiones reservadas para scripts y administración
+
+    Returns:
+        int: Conexiones máximas por worker (al menos 2)
+    """
+    return max(2, (max_connections - reserved) // max(workers, 1))
+
+
+def get_conninfo(url: str) -> str:
+    """Convierte la URL de SQLAlchemy (postgresql+driver://) en una URL de libpq."""
+    if not url:
+        return url
+    return make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class PooledConnection(AsyncConnection):
+    """Conexión de psycopg que, prestada al ORM, vuelve al pool al cerrarse en lugar de cerrarse.
+
+    SQLAlchemy (con NullPool) cierra la conexión al terminar cada sesión; aquí ese cierre la
+    devuelve al pool compartido. Las conexiones que el pool cierra por sí mismo (expiradas, al
+    cerrar el pool) no están prestadas y se cierran de verdad.
+    """
+
+    _orm_checked_out = False
+
+    async def close(self) -> None:
+        """Devuelve la conexión al pool si la tiene prestada el ORM; si no, la cierra."""
+        if self._orm_checked_out and not self.closed:
+            self._orm_checked_out = False
+            await self._pool.putconn(self)
+            return
+        await super().close()
+
+    def add_notice_handler(self, callback) -> None:
+        """Registra el callback una sola vez (SQLAlchemy lo registra en cada préstamo)."""
+        registered = self.__dict__.setdefault("_registered_notice_handlers", set())
+        if callback in registered:
+            return
+        registered.add(callback)
+        super().add_notice_handler(callback)
+
+
+async def _reset_connection(conn: PooledConnection) -> None:
+    """Deja la conexión en autocommit al volver al pool, como la espera el checkpointer."""
+    if not conn.autocommit:
+        await conn.set_autocommit(True)
+
+
+class PoolManager:
+    """Administra el pool de conexiones del worker dentro de un presupuesto fijo.
+
+    El checkpointer usa el pool directamente (conexiones en autocommit) y el motor asíncrono de
+    SQLAlchemy obtiene sus conexiones con `acquire_orm_connection` (transaccionales). Así cada
+    worker abre como máximo `budget` conexiones, derivado de POSTGRES_MAX_CONNECTIONS.
+    """
+
+    def __init__(self, conninfo: str, budget: int, min_size: int, timeout: float):
+        """Crea el pool sin abrirlo.
+
+        Args:
+            conninfo: URL de conexión de libpq
+            budget: Conexiones máximas del worker
+            min_size: Conexiones que se mantienen abiertas
+            timeout: Segundos máximos de espera por una conexión libre
+        """
+        self.budget = budget
+        self.pool = AsyncConnectionPool(
+            conninfo,
+            open=False,
+            connection_class=PooledConnection,
+            min_size=min(min_size, budget),
+            max_size=budget,
+            timeout=timeout,
+            check=AsyncConnectionPool.check_connection,
+            reset=_reset_connection,
+            kwargs={
+                "autocommit": True,
+                "connect_timeout": 5,
+                "prepare_threshold": None,
+            },
+        )
+        self._opened = False
+
+    async def open(self) -> None:
+        """Abre el pool (se llama en el lifespan de la aplicación)."""
+        if self._opened:
+            return
+        await self.pool.open()
+        self._opened = True
+        logger.info("connection_pool_opened", budget=self.budget, min_size=self.pool.min_size)
+
+    async def close(self) -> None:
+        """Cierra el pool y todas sus conexiones."""
+        if self._opened:
+            await self.pool.close()
+            self._opened = False
+            logger.info("connection_pool_closed")
+
+    async def get_pool(self) -> AsyncConnectionPool:
+        """Devuelve el pool abierto (lo abre si se usa fuera del lifespan, p. ej. en scripts)."""
+        if not self._opened:
+            await self.open()
+        return self.pool
+
+    async def acquire_orm_connection(self) -> PooledConnection:
+        """Presta una conexión transaccional al motor de SQLAlchemy (usado como async_creator).
+
+        Returns:
+            PooledConnection: Conexión sin autocommit; vuelve al pool cuando SQLAlchemy la cierra
+        """
+        pool = await self.get_pool()
+        conn = await pool.getconn()
+        try:
+            await conn.set_autocommit(False)
+        except Exception:
+            await pool.putconn(conn)
+            raise
+        conn._orm_checked_out = True
+        return conn
+
+    def stats(self) -> Dict[str, Any]:
+        """Devuelve el uso del pool y los tiempos de espera por una conexión."""
+        stats = self.pool.get_stats()
+        requests = stats.get("requests_num", 0)
+        size = stats.get("pool_size", 0)
+        return {
+            "budget": self.budget,
+            "size": size,
+            "in_use": size - stats.get("pool_available", 0),
+            "waiting": stats.get("requests_waiting", 0),
+            "requests": requests,
+            "avg_wait_ms": round(stats.get("requests_wait_ms", 0) / requests, 2) if requests else 0.0,
+            "timeouts": stats.get("requests_errors", 0),
+        }
+
+
+# Crear una instancia singleton del pool
+pool_manager = PoolManager(
+    conninfo=get_conninfo(settings.POSTGRES_URL),
+    budget=compute_worker_budget(
+        settings.POSTGRES_MAX_CONNECTIONS, settings.WEB_CONCURRENCY, settings.POSTGRES_RESERVED_CONNECTIONS
+    ),
+    min_size=settings.POSTGRES_POOL_MIN_SIZE,
+    timeout=settings.POSTGRES_POOL_TIMEOUT,
+)
@@ -1,22 +1,32 @@
 """This file contains the database service for the application."""
 
+from datetime import (
+    UTC,
+    datetime,
+)
 from typing import (
     List,
     Optional,
     Dict,
     Any,
+    Tuple,
 )
 
 import uuid
 from fastapi import HTTPException
+from sqlalchemy import (
+    text,
+    true,
+)
+from sqlalchemy.engine import make_url
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.pool import QueuePool
-from sqlmodel import (
-    Session,
-    SQLModel,
-    create_engine,
-    select,
+from sqlalchemy.ext.asyncio import (
+    async_sessionmaker,
+    create_async_engine,
 )
+from sqlalchemy.pool import NullPool
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from core.config import (
     Environment,
@@ -25,41 +35,86 @@ from core.config import (
 from core.logging import logger
 from models.user import User
 from models.thread import Thread
-from models.order import Order
+from models.order import Order, OrderArchive, OrderItem, OrderItemArchive
+from services.connection_pool import pool_manager
+from services.thread_cache import thread_cache
+
+# Resolves the user and their current thread in one round trip: inserts the user if the phone is
+# new, takes their latest thread, and inserts a thread only when they have none. Data-modifying
+# CTEs always run exactly once, and the plain SELECTs don't see rows inserted by the same statement,
+# hence the UNION ALL between the inserted user and the pre-existing one.
+RESOLVE_USER_THREAD_SQL = text(
+    """
+    WITH new_user AS (
+        INSERT INTO "user" (name, phone, created_at)
+        VALUES (:name, :phone, :created_at)
+        ON CONFLICT (phone) DO NOTHING
+        RETURNING id
+    ),
+    found_user AS (
+        SELECT id FROM new_user
+        UNION ALL
+        SELECT id FROM "user" WHERE phone = :phone
+    ),
+    latest_thread AS (
+        SELECT thread.id
+        FROM thread JOIN found_user ON thread.user_id = found_user.id
+        ORDER BY thread.created_at DESC
+        LIMIT 1
+    ),
+    new_thread AS (
+        INSERT INTO thread (id, user_id, created_at)
+        SELECT :thread_id, found_user.id, :created_at
+        FROM found_user
+        WHERE NOT EXISTS (SELECT 1 FROM latest_thread)
+        RETURNING id
+    )
+    SELECT
+        found_user.id AS user_id,
+        COALESCE((SELECT id FROM latest_thread), (SELECT id FROM new_thread)) AS thread_id,
+        EXISTS (SELECT 1 FROM new_thread) AS thread_created
+    FROM found_user
+    """
+)
+
+
+def get_async_database_url(url: str) -> str:
+    """Get the async driver variant (psycopg 3) of a Postgres connection URL.
+
+    Args:
+        url: The configured URL (postgresql://, postgresql+psycopg2://, ...)
+
+    Returns:
+        str: The same URL using the postgresql+psycopg driver
+    """
+    return make_url(url).set(drivername="postgresql+psycopg").render_as_string(hide_password=False)
 
 
 class DatabaseService:
     """Service class for database operations.
 
     This class handles all database operations for Users, Sessions, and Messages.
-    It uses SQLModel for ORM operations and maintains a connection pool.
+    It uses SQLModel for ORM operations through an async engine that takes its connections
+    from the worker's shared pool (`pool_manager`), the same one the checkpointer uses.
     """
 
     def __init__(self):
-        """Initialize database service with connection pool."""
+        """Initialize database service on top of the shared connection pool."""
         try:
-            # Configure environment-specific database connection pool settings
-            pool_size = settings.POSTGRES_POOL_SIZE
-            max_overflow = settings.POSTGRES_MAX_OVERFLOW
-
-            # Create engine with appropriate pool configuration
-            self.engine = create_engine(
-                settings.POSTGRES_URL,
-                pool_pre_ping=True,
-                poolclass=QueuePool,
-                pool_size=pool_size,
-                max_overflow=max_overflow,
-                pool_timeout=30,  # Connection timeout (seconds)
-                pool_recycle=1800,  # Recycle connections after 30 minutes
+            # SQLAlchemy does not pool on its own (NullPool): every session borrows a connection
+            # from pool_manager and gives it back when it closes
+            self.async_engine = create_async_engine(
+                get_async_database_url(settings.POSTGRES_URL),
+                poolclass=NullPool,
+                async_creator=pool_manager.acquire_orm_connection,
                 echo=False,  # Enable SQL query logging
             )
-
+            self.async_session = async_sessionmaker(self.async_engine, class_=AsyncSession, expire_on_commit=False)
 
             logger.info(
                 "database_initialized",
                 environment=settings.ENVIRONMENT.value,
-                pool_size=pool_size,
-                max_overflow=max_overflow,
+                pool_budget=pool_manager.budget,
             )
         except SQLAlchemyError as e:
             logger.error("database_initialization_error", error=str(e), environment=settings.ENVIRONMENT.value)
@@ -77,9 +132,9 @@ class DatabaseService:
         Returns:
             Optional[User]: The user if found, None otherwise
         """
-        with Session(self.engine) as session:
+        async with self.async_session() as session:
             statement = select(User).where(User.phone == phone)
-            user = session.exec(statement).first()
+            user = (await session.exec(statement)).first()
             return user
 
     async def create_user(self, name: str, phone: str) -> User:
@@ -92,11 +147,11 @@ class DatabaseService:
         Returns:
             User: The created user
         """
-        with Session(self.engine) as session:
+        async with self.async_session() as session:
             user = User(name=name, phone=phone)
             session.add(user)
-            session.commit()
-            session.refresh(user)
+            await session.commit()
+            await session.refresh(user)
             logger.info("user_created", phone=phone)
             return user
 
@@ -109,14 +164,14 @@ class DatabaseService:
         Returns:
             Optional[Thread]: The latest thread if exists, None otherwise
         """
-        with Session(self.engine) as session:
+        async with self.async_session() as session:
             statement = (
                 select(Thread)
                 .where(Thread.user_id == user_id)
                 .order_by(Thread.created_at.desc())
                 .limit(1)
             )
-            thread = session.exec(statement).first()
+            thread = (await session.exec(statement)).first()
             return thread
 
     async def create_thread(self, thread_id: str, user_id: int) -> Thread:
@@ -129,11 +184,11 @@ class DatabaseService:
         Returns:
             Thread: The created thread
         """
-        with Session(self.engine) as session:
+        async with self.async_session() as session:
             thread = Thread(id=thread_id, user_id=user_id)
             session.add(thread)
-            session.commit()
-            session.refresh(thread)
+            await session.commit()
+            await session.refresh(thread)
             logger.info("thread_created", thread_id=thread_id, user_id=user_id)
             return thread
 
@@ -187,6 +242,55 @@ class DatabaseService:
             logger.error("thread_operation_failed", user_id=user_id, error=str(e), exc_info=True)
             raise HTTPException(status_code=500, detail=f"Error al procesar thread: {str(e)}")
 
+    async def resolve_user_thread(self, phone: str) -> Tuple[int, str]:
+        """Obtiene (o crea) el usuario y su thread vigente en una sola consulta.
+
+        Primero se consulta la caché teléfono → thread; si no hay entrada, una única sentencia
+        INSERT ... ON CONFLICT ... RETURNING resuelve usuario y thread juntos.
+
+        Args:
+            phone: Número de teléfono del usuario
+
+        Returns:
+            Tuple[int, str]: (user_id, thread_id)
+
+        Raises:
+            HTTPException: Si hay un error al resolver el usuario o el thread
+        """
+        cached = thread_cache.get(phone)
+        if cached is not None:
+            return cached
+
+        try:
+            params = {
+                "name": "Usuario",
+                "phone": phone,
+                "thread_id": str(uuid.uuid4()),
+                "created_at": datetime.now(UTC),
+            }
+            # Si otro request crea el mismo usuario a la vez, ON CONFLICT DO NOTHING no devuelve
+            # fila y la instantánea aún no lo ve: el segundo intento ya lo encuentra
+            row = None
+            for _ in range(2):
+                async with self.async_engine.begin() as conn:
+                    row = (await conn.execute(RESOLVE_USER_THREAD_SQL, params)).first()
+                if row is not None:
+                    break
+            if row is None:
+                raise RuntimeError(f"No se pudo resolver el usuario {phone}")
+
+            logger.info(
+                "user_thread_resolved",
+                user_id=row.user_id,
+                thread_id=row.thread_id,
+                thread_created=row.thread_created,
+            )
+            thread_cache.set(phone, row.user_id, row.thread_id)
+            return row.user_id, row.thread_id
+        except Exception as e:
+            logger.error("user_thread_resolution_failed", phone=phone, error=str(e), exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Error al procesar usuario: {str(e)}")
+
     async def health_check(self) -> bool:
         """Check database connection health.
 
@@ -194,9 +298,9 @@ class DatabaseService:
             bool: True if database is healthy, False otherwise
         """
         try:
-            with Session(self.engine) as session:
+            async with self.async_session() as session:
                 # Execute a simple query to check connection
-                session.exec(select(1)).first()
+                (await session.exec(select(1))).first()
                 return True
         except Exception as e:
             logger.error("database_health_check_failed", error=str(e))
@@ -204,13 +308,13 @@ class DatabaseService:
 
     async def update_user_name(self, user_id: int, name: str) -> User:
         """Actualiza el nombre de un usuario."""
-        with Session(self.engine) as session:
-            user = session.get(User, user_id)
+        async with self.async_session() as session:
+            user = await session.get(User, user_id)
             if user:
                 user.name = name
                 session.add(user)
-                session.commit()
-                session.refresh(user)
+                await session.commit()
+                await session.refresh(user)
                 logger.info("user_name_updated", user_id=user_id, new_name=name)
             return user
 
@@ -232,10 +336,10 @@ class DatabaseService:
         }
         
         try:
-            with Session(self.engine) as session:
+            async with self.async_session() as session:
                 # Buscar el usuario por teléfono
                 user_statement = select(User).where(User.phone == phone)
-                user = session.exec(user_statement).first()
+                user = (await session.exec(user_statement)).first()
                 
                 if not user:
                     logger.warn(f"Usuario no encontrado con teléfono: {phone}")
@@ -259,7 +363,7 @@ class DatabaseService:
                     )
                     
                     logger.info(f"Buscando órdenes con customer_id={phone}")
-                    latest_order = session.exec(order_statement).first()
+                    latest_order = (await session.exec(order_statement)).first()
                     
                     # Si se encontró una orden
                     if latest_order:
@@ -296,5 +400,118 @@ class DatabaseService:
         return result
 
 
+    @staticmethod
+    def _customer_context_statement(phone: str, order_model: type, item_model: type):
+        """Construye la consulta del usuario, su último pedido en `order_model` y sus items.
+
+        Args:
+            phone: Número telefónico del usuario
+            order_model: Tabla de pedidos a leer (Order u OrderArchive)
+            item_model: Tabla de items de esa tabla de pedidos (OrderItem u OrderItemArchive)
+
+        Returns:
+            Select: Una fila por item (o una sola fila sin pedido ni items) del usuario
+        """
+        latest_order = (
+            select(order_model)
+            .where(order_model.customer_id == phone)
+            .order_by(order_model.created_at.desc())
+            .limit(1)
+            .subquery("latest_order")
+        )
+        return (
+            select(
+                User.id,
+                User.name,
+                latest_order.c.id,
+                latest_order.c.status,
+                latest_order.c.total_amount,
+                latest_order.c.address,
+                latest_order.c.created_at,
+                item_model.product_name,
+                item_model.quantity,
+                item_model.unit_price,
+                item_model.subtotal,
+                item_model.details,
+            )
+            .select_from(User)
+            .outerjoin(latest_order, true())
+            .outerjoin(item_model, item_model.order_id == latest_order.c.id)
+            .where(User.phone == phone)
+        )
+
+    async def get_customer_context(self, phone: str) -> Dict[str, Any]:
+        """Obtiene en una sola consulta el usuario, su último pedido y los items de ese pedido.
+
+        Es el contexto por turno que comparten todos los nodos del grafo; reemplaza las
+        llamadas repetidas a `get_user_details_with_latest_order` y `OrderService.get_last_order`.
+        Si el usuario no tiene pedidos en la tabla de pedidos, el último se busca en el archivo.
+
+        Args:
+            phone: Número telefónico del usuario
+
+        Returns:
+            Dict[str, Any]: Diccionario con `name`, `user_id`, `address`, `has_order` y,
+                            si existe, `order` con los datos del último pedido y sus productos
+        """
+        result = {
+            "name": None,
+            "address": None,
+            "user_id": None,
+            "has_order": False,
+            "order": None,
+        }
+
+        try:
+            async with self.async_session() as session:
+                rows = (await session.exec(self._customer_context_statement(phone, Order, OrderItem))).all()
+                # Sin pedidos en la tabla de pedidos: el último puede estar en el archivo
+                if rows and rows[0][2] is None:
+                    statement = self._customer_context_statement(phone, OrderArchive, OrderItemArchive)
+                    rows = (await session.exec(statement)).all()
+
+            if not rows:
+                logger.warning("customer_context_user_not_found", phone=phone)
+                return result
+
+            (user_id, name, order_id, status, total_amount, address, created_at) = rows[0][:7]
+            result["user_id"] = user_id
+            result["name"] = name
+
+            if order_id is not None:
+                result["has_order"] = True
+                result["address"] = address.strip() if address and address.strip() else None
+                result["order"] = {
+                    "order_id": str(order_id),
+                    "status": status,
+                    "customer_id": phone,
+                    "address": address,
+                    "total_amount": total_amount,
+                    "created_at": created_at.isoformat() if created_at else None,
+                    "products": [
+                        {
+                            "name": row[7],
+                            "quantity": row[8],
+                            "unit_price": row[9],
+                            "subtotal": row[10],
+                            "details": row[11],
+                        }
+                        for row in rows
+                        if row[7] is not None
+                    ],
+                }
+
+            logger.info(
+                "customer_context_loaded",
+                phone=phone,
+                has_order=result["has_order"],
+                product_count=len(result["order"]["products"]) if result["order"] else 0,
+            )
+        except Exception as e:
+            logger.error("customer_context_load_failed", phone=phone, error=str(e))
+
+        return result
+
+
 # Create a singleton instance
 database_service = DatabaseService()
@@ -3,11 +3,12 @@
 from typing import List, Optional, Dict, Any
 from uuid import UUID
 from datetime import datetime
-from sqlmodel import Session, select
+from sqlmodel import select
 from fastapi import HTTPException
 
 from models.product import Product
 from services.database import database_service
+from services.menu_snapshot import menu_snapshot_cache
 
 class InventoryService:
     """Servicio para la gestión del inventario.
@@ -35,11 +36,12 @@ class InventoryService:
             HTTPException: Si hay un error al crear el producto
         """
         try:
-            with Session(self.db.engine) as session:
+            async with self.db.async_session() as session:
                 product = Product(**product_data)
                 session.add(product)
-                session.commit()
-                session.refresh(product)
+                await session.commit()
+                await session.refresh(product)
+                menu_snapshot_cache.invalidate()
                 return product
                 
         except Exception as e:
@@ -54,8 +56,8 @@ class InventoryService:
         Returns:
             Optional[Product]: El producto si existe, None en caso contrario
         """
-        with Session(self.db.engine) as session:
-            return session.get(Product, product_id)
+        async with self.db.async_session() as session:
+            return await session.get(Product, product_id)
     
     async def get_available_products(self) -> List[Product]:
         """Obtiene todos los productos disponibles.
@@ -63,9 +65,9 @@ class InventoryService:
         Returns:
             List[Product]: Lista de productos disponibles
         """
-        with Session(self.db.engine) as session:
+        async with self.db.async_session() as session:
             statement = select(Product).where(Product.is_available == True)
-            return session.exec(statement).all()
+            return (await session.exec(statement)).all()
     
     async def get_products_by_category(self, category: str) -> List[Product]:
         """Obtiene todos los productos de una categoría específica.
@@ -76,12 +78,12 @@ class InventoryService:
         Returns:
             List[Product]: Lista de productos de la categoría
         """
-        with Session(self.db.engine) as session:
+        async with self.db.async_session() as session:
             statement = select(Product).where(
                 Product.category == category,
                 Product.is_available == True
             )
-            return session.exec(statement).all()
+            return (await session.exec(statement)).all()
     
     async def update_product(self, product_id: UUID, product_data: Dict[str, Any]) -> Product:
         """Actualiza los datos de un producto.
@@ -96,8 +98,8 @@ class InventoryService:
         Raises:
             HTTPException: Si el producto no existe o hay un error al actualizarlo
         """
-        with Session(self.db.engine) as session:
-            product = session.get(Product, product_id)
+        async with self.db.async_session() as session:
+            product = await session.get(Product, product_id)
             if not product:
                 raise HTTPException(status_code=404, detail="Producto no encontrado")
             
@@ -106,8 +108,9 @@ class InventoryService:
             
             product.updated_at = datetime.utcnow()
             session.add(product)
-            session.commit()
-            session.refresh(product)
+            await session.commit()
+            await session.refresh(product)
+            menu_snapshot_cache.invalidate()
             return product
     
     async def update_stock(self, product_id: UUID, quantity: int) -> Product:
@@ -123,16 +126,17 @@ class InventoryService:
         Raises:
             HTTPException: Si el producto no existe o hay un error al actualizarlo
         """
-        with Session(self.db.engine) as session:
-            product = session.get(Product, product_id)
+        async with self.db.async_session() as session:
+            product = await session.get(Product, product_id)
             if not product:
                 raise HTTPException(status_code=404, detail="Producto no encontrado")
             
             product.stock = quantity
             product.updated_at = datetime.utcnow()
             session.add(product)
-            session.commit()
-            session.refresh(product)
+            await session.commit()
+            await session.refresh(product)
+            menu_snapshot_cache.invalidate()
             return product
     
     async def delete_product(self, product_id: UUID) -> bool:
@@ -148,13 +152,14 @@ class InventoryService:
             HTTPException: Si hay un error al eliminar el producto
         """
         try:
-            with Session(self.db.engine) as session:
-                product = session.get(Product, product_id)
+            async with self.db.async_session() as session:
+                product = await session.get(Product, product_id)
                 if not product:
                     return False
                 
-                session.delete(product)
-                session.commit()
+                await session.delete(product)
+                await session.commit()
+                menu_snapshot_cache.invalidate()
                 return True
                 
         except Exception as e:
@@ -167,9 +172,9 @@ class InventoryService:
         Returns:
             list[dict]: Lista de productos con los campos requeridos.
         """
-        with Session(self.db.engine) as session:
+        async with self.db.async_session() as session:
             statement = select(Product)
-            products = session.exec(statement).all()
+            products = (await session.exec(statement)).all()
             return [
                 {
                     "name": p.name,
@@ -1,9 +1,12 @@
 from typing import Optional, List, Dict
-from sqlmodel import Session, select, delete
+from sqlmodel import select, delete
 
+from core.config import settings
 from models.menu_image import MenuImage, MenuType
 from models.product import Product
 from services.database import database_service
+from services.menu_snapshot import menu_snapshot_cache
+from utils import content_hash, encode_whatsapp_jpeg
 
 
 class MenuService:
@@ -21,6 +24,7 @@ class MenuService:
         """
         Inserta una nueva imagen de menú en la base de datos.
         Primero elimina los registros existentes del tipo especificado.
+        La imagen se convierte una sola vez a un JPEG listo para WhatsApp y se guarda en binario.
 
         Args:
             image_hex (str): Imagen del menú en formato hexadecimal
@@ -30,37 +34,53 @@ class MenuService:
             bool: True si la operación fue exitosa, False en caso contrario
         """
         try:
-            with Session(self.db.engine) as session:
+            image_data = encode_whatsapp_jpeg(
+                bytes.fromhex(image_hex),
+                max_side=settings.MENU_IMAGE_MAX_SIDE,
+                quality=settings.MENU_IMAGE_JPEG_QUALITY,
+            )
+            async with self.db.async_session() as session:
                 # Eliminar registros existentes del tipo especificado
                 stmt = delete(MenuImage).where(MenuImage.tipo_menu == tipo_menu)
-                session.execute(stmt)
+                await session.execute(stmt)
 
                 # Crear nuevo registro
                 new_menu = MenuImage(
                     tipo_menu=tipo_menu,
-                    image_hex=image_hex
+                    image_data=image_data,
+                    content_hash=content_hash(image_data),
+                    content_type="image/jpeg",
+                    size_bytes=len(image_data),
                 )
                 session.add(new_menu)
-                session.commit()
+                await session.commit()
                 return True
         except Exception as e:
             print(f"Error al insertar menú: {str(e)}")
             return False
 
-    async def get_menu(self, tipo_menu: MenuType = None) -> List[MenuImage]:
+    async def get_menu(self, tipo_menu: MenuType = None) -> List[Dict]:
         """
-        Obtiene todas las imágenes del menú, ordenadas por fecha de creación.
+        Obtiene las referencias de las imágenes del menú, ordenadas por fecha de creación.
         Si se especifica un tipo de menú, filtra por ese tipo.
+        No carga el contenido binario: la imagen se sirve por su content_hash.
 
         Args:
             tipo_menu (MenuType, optional): Tipo de menú a filtrar. Si es None, obtiene todos los tipos.
 
         Returns:
-            List[MenuImage]: Lista de imágenes del menú ordenadas por fecha de creación (más reciente primero)
+            List[Dict]: Referencias (id, tipo_menu, content_hash, size_bytes, created_at)
+                ordenadas por fecha de creación (más reciente primero)
         """
         try:
-            with Session(self.db.engine) as session:
-                query = select(MenuImage)
+            async with self.db.async_session() as session:
+                query = select(
+                    MenuImage.id,
+                    MenuImage.tipo_menu,
+                    MenuImage.content_hash,
+                    MenuImage.size_bytes,
+                    MenuImage.created_at,
+                )
                 
                 # Solo aplicar el filtro si se especifica un tipo de menú
                 if tipo_menu is not None:
@@ -69,12 +89,25 @@ class MenuService:
                 # Ordenar por fecha de creación (más reciente primero)
                 query = query.order_by(MenuImage.created_at.desc())
                 
-                result = session.exec(query)
-                return list(result.all())
+                return [dict(row._mapping) for row in (await session.exec(query)).all()]
         except Exception as e:
             print(f"Error al obtener menú: {str(e)}")
             return []
 
+    async def get_menu_image(self, image_hash: str) -> Optional[MenuImage]:
+        """
+        Obtiene una imagen del menú (con su contenido binario) por su content_hash.
+
+        Args:
+            image_hash (str): Hash SHA-256 del contenido de la imagen
+
+        Returns:
+            Optional[MenuImage]: La imagen, o None si no existe
+        """
+        async with self.db.async_session() as session:
+            query = select(MenuImage).where(MenuImage.content_hash == image_hash).limit(1)
+            return (await session.exec(query)).first()
+
     async def process_menu_data(self, menu_data: Dict, tipo_menu: MenuType) -> bool:
         """
         Procesa los datos del menú y los guarda en la tabla de productos.
@@ -88,11 +121,11 @@ class MenuService:
             bool: True si la operación fue exitosa, False en caso contrario
         """
         try:
-            with Session(self.db.engine) as session:
+            async with self.db.async_session() as session:
                 # Eliminar productos existentes del tipo de menú especificado
                 category_to_delete = f"Menú {tipo_menu.value}"
                 stmt = delete(Product).where(Product.category == category_to_delete)
-                session.execute(stmt)
+                await session.execute(stmt)
 
                 # Obtener la lista de menús
                 menu_items = menu_data.get('menu', [])
@@ -127,7 +160,8 @@ class MenuService:
                         print(f"Error al procesar el item {item}: {str(e)}")
                         continue
 
-                session.commit()
+                await session.commit()
+                menu_snapshot_cache.invalidate()
                 return True
         except Exception as e:
             print(f"Error al procesar datos del menú: {str(e)}")
@@ -0,0 +1,117 @@
+"""Snapshot en memoria del menú, agrupado por categoría y versionado."""
+
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import (
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from core.config import settings
+from core.logging import logger
+
+
+@dataclass(frozen=True)
+class MenuSnapshot:
+    """Menú agrupado por categoría, tal como lo consume la herramienta get_menu.
+
+    Attributes:
+        version: Versión del menú; cambia cada vez que cambia su contenido
+        by_category: Productos agrupados por categoría (de solo lectura)
+        text: Representación del menú ya serializada, tal como llega al LLM
+        content_hash: Hash del contenido, para detectar cambios hechos por otros procesos
+        loaded_at: Momento (time.monotonic) en que se cargó
+    """
+
+    version: int
+    by_category: Mapping[str, Tuple[dict, ...]]
+    text: str
+    content_hash: str
+    loaded_at: float
+
+
+class MenuSnapshotCache:
+    """Caché del menú con invalidación por escritura y expiración como respaldo.
+
+    Las escrituras de este proceso (InventoryService, MenuService.process_menu_data) llaman a
+    `invalidate`, que sube la versión. Los cambios hechos por otros procesos o scripts se
+    recogen al expirar el TTL; si el contenido cambió, la versión también sube.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        """Inicializa la caché vacía.
+
+        Args:
+            ttl_seconds: Segundos tras los que se vuelve a leer el menú de la base de datos
+        """
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self._snapshot: Optional[MenuSnapshot] = None
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        """Marca el snapshot como obsoleto tras una escritura en productos."""
+        self.version += 1
+        logger.info("menu_snapshot_invalidated", version=self.version)
+
+    def _is_fresh(self, snapshot: Optional[MenuSnapshot]) -> bool:
+        """Indica si el snapshot corresponde a la versión actual y no ha expirado."""
+        return (
+            snapshot is not None
+            and snapshot.version == self.version
+            and time.monotonic() - snapshot.loaded_at < self.ttl_seconds
+        )
+
+    async def _load(self) -> MenuSnapshot:
+        """Lee los productos del menú y construye el snapshot agrupado por categoría."""
+        # Importación diferida: InventoryService importa este módulo para invalidar la caché
+        from services.inventory_service import inventory_service
+
+        # Versión leída antes de la consulta: si se invalida mientras tanto, el snapshot nace obsoleto
+        version = self.version
+        by_category: dict[str, list[dict]] = {}
+        for product in await inventory_service.get_menu_products():
+            by_category.setdefault(product["category"], []).append(product)
+
+        text = str(by_category)
+        content_hash = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        # Cambio detectado al expirar el TTL (p. ej. escrito por otro proceso): nueva versión
+        previous = self._snapshot
+        if previous is not None and previous.version == version == self.version and previous.content_hash != content_hash:
+            self.version = version = version + 1
+        return MenuSnapshot(
+            version=version,
+            by_category=MappingProxyType({category: tuple(items) for category, items in by_category.items()}),
+            text=text,
+            content_hash=content_hash,
+            loaded_at=time.monotonic(),
+        )
+
+    async def get(self) -> MenuSnapshot:
+        """Devuelve el snapshot vigente, recargándolo solo si está obsoleto o expirado.
+
+        Returns:
+            MenuSnapshot: El menú agrupado por categoría
+        """
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+
+        async with self._lock:
+            # Otra corrutina pudo recargarlo mientras se esperaba el lock
+            if not self._is_fresh(self._snapshot):
+                self._snapshot = await self._load()
+                logger.info(
+                    "menu_snapshot_loaded",
+                    version=self._snapshot.version,
+                    categories=len(self._snapshot.by_category),
+                )
+            return self._snapshot
+
+
+# Crear una instancia singleton de la caché
+menu_snapshot_cache = MenuSnapshotCache(ttl_seconds=settings.MENU_SNAPSHOT_TTL_SECONDS)
@@ -0,0 +1,92 @@
+"""Archivado periódico de pedidos cerrados antiguos (tablas order_archive y orderitem_archive)."""
+
+import asyncio
+from datetime import (
+    datetime,
+    timedelta,
+)
+from typing import (
+    Any,
+    Dict,
+    Optional,
+)
+
+from core.config import settings
+from core.logging import logger
+from services.order_service import order_service
+from utils.utils import current_colombian_time
+
+
+class OrderArchiver:
+    """Mueve cada cierto tiempo los pedidos cerrados antiguos al archivo.
+
+    Así la tabla de pedidos (y sus índices) solo guarda los pedidos abiertos y los recientes,
+    que son los que leen el bot y el tablero. Cada worker corre su propio archivador; los lotes
+    usan SKIP LOCKED, de modo que varios a la vez no se estorban.
+    """
+
+    def __init__(self, interval_seconds: float, after_days: int, batch_size: int):
+        """Inicializa el archivador sin arrancarlo.
+
+        Args:
+            interval_seconds: Segundos entre ejecuciones (0 lo desactiva)
+            after_days: Antigüedad en días a partir de la cual se archiva un pedido cerrado
+            batch_size: Pedidos por lote
+        """
+        self.interval_seconds = interval_seconds
+        self.after_days = after_days
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self._last_run: Optional[str] = None
+        self._archived = 0
+
+    async def start(self) -> None:
+        """Arranca la tarea periódica (se llama en el lifespan de la aplicación)."""
+        if self._task is None and self.interval_seconds > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Detiene la tarea periódica."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def archive_once(self) -> int:
+        """Archiva los pedidos cerrados creados hace más de after_days días.
+
+        Returns:
+            int: Número de pedidos archivados
+        """
+        before = datetime.fromisoformat(current_colombian_time()) - timedelta(days=self.after_days)
+        archived = await order_service.archive_orders(before, self.batch_size)
+        self._last_run = current_colombian_time()
+        self._archived += archived
+        logger.info("orders_archived", archived=archived, before=before.isoformat())
+        return archived
+
+    async def _run(self) -> None:
+        """Ejecuta archive_once cada interval_seconds; los errores se registran y se reintenta."""
+        while True:
+            try:
+                await self.archive_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("order_archive_failed", error=str(e))
+            await asyncio.sleep(self.interval_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """Devuelve si la tarea está activa, la última ejecución y los pedidos archivados."""
+        return {"running": self._task is not None, "last_run": self._last_run, "archived": self._archived}
+
+
+# Crear una instancia singleton del archivador
+order_archiver = OrderArchiver(
+    interval_seconds=settings.ORDER_ARCHIVE_INTERVAL_SECONDS,
+    after_days=settings.ORDER_ARCHIVE_AFTER_DAYS,
+    batch_size=settings.ORDER_ARCHIVE_BATCH_SIZE,
+)
@@ -0,0 +1,168 @@
+"""Difusión de cambios de pedidos al tablero (deltas) mediante LISTEN/NOTIFY de Postgres."""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Set,
+)
+
+from core.config import settings
+from core.logging import logger
+from services.connection_pool import pool_manager
+
+# Canal de Postgres por el que viajan los eventos entre workers
+CHANNEL = "order_events"
+
+# Límite de NOTIFY (8000 bytes) con margen; los eventos más grandes se envían sin productos
+MAX_PAYLOAD_BYTES = 7900
+
+
+def format_products(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Convierte filas de items de pedido al formato de productos del tablero (/orders/by-date).
+
+    Args:
+        items: Filas de OrderItem (product_name, quantity, unit_price, subtotal, details)
+
+    Returns:
+        List[Dict[str, Any]]: Productos con name, quantity, price, subtotal y details
+    """
+    return [
+        {
+            "name": item["product_name"],
+            "quantity": item["quantity"],
+            "price": item["unit_price"],
+            "subtotal": item["subtotal"],
+            "details": item["details"],
+        }
+        for item in items
+    ]
+
+
+class OrderEventBroadcaster:
+    """Reparte los cambios de pedidos a los tableros conectados.
+
+    `publish` envía el evento con NOTIFY, de modo que llega a los suscriptores de todos los
+    workers; cada worker mantiene una conexión del pool en LISTEN y reparte lo recibido a las
+    colas de sus suscriptores. Si el listener no está activo (scripts), el evento se reparte
+    solo dentro del proceso. Un suscriptor que no alcanza a leer recibe un evento "resync"
+    para volver a descargar el listado.
+    """
+
+    def __init__(self, queue_size: int):
+        """Inicializa el broadcaster sin escuchar.
+
+        Args:
+            queue_size: Eventos pendientes máximos por suscriptor
+        """
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._listener: Optional[asyncio.Task] = None
+        self._listening = False
+
+    async def start(self) -> None:
+        """Arranca la tarea que escucha el canal (se llama en el lifespan de la aplicación)."""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Detiene la escucha y devuelve su conexión al pool."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self) -> None:
+        """Mantiene una conexión en LISTEN y reparte cada notificación; reintenta si se cae."""
+        while True:
+            pool = await pool_manager.get_pool()
+            conn = None
+            try:
+                # La conexión cuenta dentro del presupuesto del pool mientras escucha
+                conn = await pool.getconn()
+                await conn.execute(f"LISTEN {CHANNEL}")
+                self._listening = True
+                logger.info("order_events_listening", channel=CHANNEL)
+                async for notify in conn.notifies():
+                    self._fan_out(json.loads(notify.payload))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("order_events_listener_failed", error=str(e))
+                # Los eventos perdidos mientras no se escuchaba se recuperan con un resync
+                self._fan_out({"type": "resync"})
+                await asyncio.sleep(settings.ORDER_EVENTS_RETRY_SECONDS)
+            finally:
+                self._listening = False
+                if conn is not None:
+                    # Se cierra en vez de reutilizarla para no dejar un LISTEN activo; el pool la repone
+                    await conn.close()
+                    await pool.putconn(conn)
+
+    def _fan_out(self, event: Dict[str, Any]) -> None:
+        """Entrega el evento a cada suscriptor de este proceso."""
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Suscriptor atrasado: se descartan sus eventos y debe volver a cargar el listado
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync"})
+
+    async def publish(self, event_type: str, order_id: str, **fields: Any) -> None:
+        """Publica un cambio de pedido. Los errores se registran sin afectar la escritura.
+
+        Args:
+            event_type: Tipo de evento (order_created, order_items_added, order_item_updated,
+                order_status_changed)
+            order_id: ID del pedido
+            **fields: Campos del delta (state, total_amount, updated_at, products, ...)
+        """
+        event = {"type": event_type, "order": {"id": order_id, **fields}}
+        payload = json.dumps(event, default=str)
+        if len(payload.encode("utf-8")) > MAX_PAYLOAD_BYTES:
+            # El tablero pedirá el pedido completo al ver truncated
+            event["order"].pop("products", None)
+            event["truncated"] = True
+            payload = json.dumps(event, default=str)
+
+        if not self._listening:
+            self._fan_out(json.loads(payload))
+            return
+        try:
+            pool = await pool_manager.get_pool()
+            async with pool.connection() as conn:
+                await conn.execute("SELECT pg_notify(%s, %s)", (CHANNEL, payload))
+        except Exception as e:
+            logger.warning("order_event_publish_failed", type=event_type, order_id=order_id, error=str(e))
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[asyncio.Queue]:
+        """Registra un suscriptor mientras dure el contexto.
+
+        Yields:
+            asyncio.Queue: Cola de la que se leen los eventos
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+    def stats(self) -> Dict[str, Any]:
+        """Devuelve el estado del listener y el número de suscriptores."""
+        return {"listening": self._listening, "subscribers": len(self._subscribers)}
+
+
+# Crear una instancia singleton del broadcaster
+order_event_broadcaster = OrderEventBroadcaster(queue_size=settings.ORDER_EVENTS_QUEUE_SIZE)
@@ -1,21 +1,74 @@
 """Servicio para la gestión de pedidos del restaurante."""
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
 from datetime import datetime
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException
+from sqlalchemy import (
+    ARRAY,
+    Uuid,
+    any_,
+    bindparam,
+    delete,
+    func,
+    insert,
+    text,
+    tuple_,
+    update,
+)
 from sqlalchemy.orm import selectinload
 import uuid
 import logging
 
-from models.order import Order, OrderItem
+from models.order import Order, OrderArchive, OrderBase, OrderItem, OrderItemArchive
+from models.user import User
 from services.database import database_service
+from services.order_events import format_products, order_event_broadcaster
+from services.thread_cache import thread_cache
 from utils.utils import current_colombian_time
 
 # Configurar el logger
 logger = logging.getLogger(__name__)
 
+# Estados de los pedidos cerrados: ya no se editan y se pueden archivar
+CLOSED_STATUSES = ["completado", "completed", "cancelled"]
+
+# Mueve un lote de pedidos cerrados (y sus items) al archivo en una sola sentencia. Las CTE que
+# modifican datos se ejecutan siempre, aunque la consulta final no las use; SKIP LOCKED deja
+# fuera los pedidos que otra transacción está modificando (y permite varios archivadores a la vez)
+ARCHIVE_ORDERS_SQL = text(
+    """
+    WITH moved AS (
+        DELETE FROM "order"
+        WHERE id IN (
+            SELECT id FROM "order"
+            WHERE status = ANY(:statuses) AND created_at < :before
+            ORDER BY created_at
+            LIMIT :batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id, customer_id, status, total_amount, address, created_at, updated_at
+    ),
+    moved_items AS (
+        DELETE FROM orderitem
+        WHERE order_id IN (SELECT id FROM moved)
+        RETURNING id, order_id, product_id, product_name, quantity, unit_price, subtotal, details
+    ),
+    archived AS (
+        INSERT INTO order_archive (id, customer_id, status, total_amount, address, created_at, updated_at)
+        SELECT id, customer_id, status, total_amount, address, created_at, updated_at FROM moved
+        RETURNING id
+    ),
+    archived_items AS (
+        INSERT INTO orderitem_archive (id, order_id, product_id, product_name, quantity, unit_price, subtotal, details)
+        SELECT id, order_id, product_id, product_name, quantity, unit_price, subtotal, details FROM moved_items
+    )
+    SELECT count(*) FROM archived
+    """
+)
+
 class OrderService:
     """Servicio para la gestión de pedidos.
     
@@ -52,47 +105,90 @@ class OrderService:
             validated_address = address.strip() if address and address.strip() else "No disponible"
             logger.info(f"Creando pedido para customer_id={customer_id}, dirección={validated_address}")
             
-            with Session(self.db.engine) as session:
-                # Crear el pedido
-                order = Order(customer_id=customer_id, address=validated_address)
-                session.add(order)
-                session.flush()  # Para obtener el ID del pedido
-                
-                total_amount = 0
-                
-                # Crear los items del pedido
-                for product in products:
-                    order_item = OrderItem(
-                        order_id=order.id,
-                        product_id=product.get("product_id", ""),  # Puede que no tengamos product_id
-                        product_name=product["product_name"],
-                        quantity=product["quantity"],
-                        unit_price=product["unit_price"],
-                        subtotal=product["subtotal"],
-                        details=product.get("details", "")  # Obtener details si existe, sino cadena vacía
-                    )
-                    session.add(order_item)
-                    total_amount += product["subtotal"]
-                
-                # Actualizar el monto total del pedido
-                order.total_amount = total_amount
-                session.add(order)
+            # El ID del pedido se genera aquí (uuid4) y el total se calcula antes de insertar: el
+            # pedido y sus items se escriben con dos INSERT, sin flush ni UPDATE posteriores
+            order = Order(
+                customer_id=customer_id,
+                address=validated_address,
+                total_amount=sum(product["subtotal"] for product in products),
+            )
+            items = self._build_items(products, order.id)
+            
+            async with self.db.async_session() as session:
+                await session.exec(insert(Order).values(**order.model_dump()))
+                await self._insert_items(session, items)
                 
-                # Verificar que la dirección se haya guardado correctamente
-                logger.info(f"Dirección guardada en la orden antes de commit: {order.address}")
+                # Nombre del cliente para el tablero, en la misma transacción
+                customer_name = (await session.exec(select(User.name).where(User.phone == customer_id))).first()
                 
-                session.commit()
-                session.refresh(order)
+                await session.commit()
                 
                 # Verificar después del commit
                 logger.info(f"Orden creada con ID: {order.id}, Customer: {order.customer_id}, Dirección: {order.address}")
-                
-                return order
+            
+            # Avisar a los tableros conectados (fuera de la sesión, ya liberada su conexión)
+            await order_event_broadcaster.publish(
+                "order_created",
+                str(order.id),
+                address=order.address,
+                customer_name=customer_name or order.customer_id,
+                products=format_products(items),
+                total_amount=order.total_amount,
+                created_at=order.created_at.isoformat(),
+                updated_at=order.updated_at.isoformat(),
+                state=order.status,
+            )
+            return order
                 
         except Exception as e:
             logger.error(f"Error al crear el pedido: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Error al crear el pedido: {str(e)}")
     
+    @staticmethod
+    def _build_items(products: List[Dict[str, Any]], order_id: UUID) -> List[Dict[str, Any]]:
+        """Construye las filas de los items de pedido (columnas de OrderItem).
+        
+        Se usan diccionarios en lugar de instancias de OrderItem: validar un modelo por producto
+        costaba más que el propio INSERT en pedidos grandes.
+        
+        Args:
+            products: Lista de diccionarios con la información de cada producto
+            order_id: ID del pedido al que pertenecen
+            
+        Returns:
+            List[Dict[str, Any]]: Filas con su ID ya generado
+        """
+        return [
+            {
+                "id": uuid.uuid4(),
+                "order_id": order_id,
+                "product_id": product.get("product_id", ""),  # Puede que no tengamos product_id
+                "product_name": product["product_name"],
+                "quantity": product["quantity"],
+                "unit_price": product["unit_price"],
+                "subtotal": product["subtotal"],
+                "details": product.get("details", "")  # Obtener details si existe, sino cadena vacía
+            }
+            for product in products
+        ]
+    
+    @staticmethod
+    async def _insert_items(session, items: List[Dict[str, Any]]) -> None:
+        """Inserta todos los items con un único INSERT de varias filas.
+        
+        El RETURNING hace que SQLAlchemy agrupe las filas en un solo INSERT ... VALUES de varias
+        filas (insertmanyvalues) con la sentencia compilada en caché; sin él, psycopg enviaría un
+        INSERT por fila.
+        
+        Args:
+            session: Sesión con la transacción en curso
+            items: Filas de _build_items
+        """
+        if items:
+            connection = await session.connection()
+            table = OrderItem.__table__
+            await connection.execute(insert(table).returning(table.c.id), items)
+    
     async def get_order(self, order_id: UUID) -> Optional[Order]:
         """Obtiene un pedido por su ID.
         
@@ -102,21 +198,25 @@ class OrderService:
         Returns:
             Optional[Order]: El pedido si existe, None en caso contrario
         """
-        with Session(self.db.engine) as session:
-            return session.get(Order, order_id)
+        async with self.db.async_session() as session:
+            return await session.get(Order, order_id)
     
-    async def get_customer_orders(self, customer_id: str) -> List[Order]:
-        """Obtiene todos los pedidos de un cliente.
+    async def get_customer_orders(self, customer_id: str) -> List[OrderBase]:
+        """Obtiene todos los pedidos de un cliente, incluidos los archivados.
         
         Args:
             customer_id: ID del cliente
             
         Returns:
-            List[Order]: Lista de pedidos del cliente
+            List[OrderBase]: Lista de pedidos del cliente (Order u OrderArchive), del más reciente
+                al más antiguo
         """
-        with Session(self.db.engine) as session:
-            statement = select(Order).where(Order.customer_id == customer_id)
-            return session.exec(statement).all()
+        orders = []
+        async with self.db.async_session() as session:
+            for model in (Order, OrderArchive):
+                statement = select(model).where(model.customer_id == customer_id)
+                orders.extend((await session.exec(statement)).all())
+        return sorted(orders, key=lambda order: order.created_at, reverse=True)
     
     async def update_order_status(self, order_id: UUID, status: str) -> Order:
         """Actualiza el estado de un pedido y crea un thread si se marca como completado.
@@ -132,12 +232,12 @@ class OrderService:
             HTTPException: Si el pedido no existe o hay un error al actualizarlo
         """
         try:
-            with Session(self.db.engine) as session:
+            async with self.db.async_session() as session:
                 logger.info(
                     f"Iniciando actualización de estado para orden {str(order_id)} a {status}"
                 )
 
-                order = session.get(Order, order_id)
+                order = await session.get(Order, order_id)
                 if not order:
                     logger.error(f"Orden no encontrada: {str(order_id)}")
                     raise HTTPException(status_code=404, detail="Pedido no encontrado")
@@ -153,41 +253,55 @@ class OrderService:
                 order.status = status
                 order.updated_at = datetime.fromisoformat(current_colombian_time())
                 session.add(order)
-                session.commit()
-                session.refresh(order)
-                
-                # Si el estado cambió a 'completed' o 'completado', crear un nuevo thread
-                if (normalized_status in ['completed', 'completado'] and 
-                    normalized_previous not in ['completed', 'completado']):
-                    try:
-                        # Obtener el teléfono del usuario de la orden
-                        customer_phone = order.customer_id
-                        
-                        if not customer_phone:
-                            logger.error(f"No se encontró teléfono para la orden {str(order_id)}")
-                            return order
-                        
-                        # Obtener el usuario existente
-                        user = await database_service.get_user_by_phone(customer_phone)
-                        if not user:
-                            logger.error(f"No se encontró usuario para el teléfono {customer_phone}")
-                            return order
-                        
-                        # Crear nuevo thread con ID único
-                        thread_id = str(uuid.uuid4())
-                        thread = await database_service.create_thread(thread_id, user.id)
-                        
-                        logger.info(
-                            f"Thread creado: {thread.id} para usuario {user.id} y orden {str(order.id)}"
-                        )
-                    except Exception as e:
-                        logger.error(
-                            f"Error al crear thread para orden {str(order.id)}: {str(e)}"
-                        )
-                        # No lanzamos la excepción para no afectar la actualización del estado
-                
-                return order
-                
+                await session.commit()
+                await session.refresh(order)
+            
+            # Fuera de la sesión y solo tras un commit exitoso: si el commit falla, ni los tableros
+            # ni la caché de threads ven el cambio. Con previous_state el tablero ajusta sus
+            # contadores sin recalcularlos
+            await order_event_broadcaster.publish(
+                "order_status_changed",
+                str(order.id),
+                state=order.status,
+                previous_state=previous_status,
+                total_amount=order.total_amount,
+                updated_at=order.updated_at.isoformat(),
+            )
+            
+            # Si el estado cambió a 'completed' o 'completado', crear un nuevo thread
+            if (normalized_status in ['completed', 'completado'] and 
+                normalized_previous not in ['completed', 'completado']):
+                try:
+                    # Obtener el teléfono del usuario de la orden
+                    customer_phone = order.customer_id
+                    
+                    if not customer_phone:
+                        logger.error(f"No se encontró teléfono para la orden {str(order_id)}")
+                        return order
+                    
+                    # Obtener el usuario existente
+                    user = await database_service.get_user_by_phone(customer_phone)
+                    if not user:
+                        logger.error(f"No se encontró usuario para el teléfono {customer_phone}")
+                        return order
+                    
+                    # Crear nuevo thread con ID único
+                    thread_id = str(uuid.uuid4())
+                    thread = await database_service.create_thread(thread_id, user.id)
+                    # El próximo mensaje del cliente debe resolver el thread nuevo
+                    thread_cache.invalidate(customer_phone)
+                    
+                    logger.info(
+                        f"Thread creado: {thread.id} para usuario {user.id} y orden {str(order.id)}"
+                    )
+                except Exception as e:
+                    logger.error(
+                        f"Error al crear thread para orden {str(order.id)}: {str(e)}"
+                    )
+                    # No lanzamos la excepción para no afectar la actualización del estado
+            
+            return order
+            
         except Exception as e:
             logger.error(f"Error al actualizar estado de orden {str(order_id)}: {str(e)}")
             raise HTTPException(
@@ -196,7 +310,7 @@ class OrderService:
             )
     
     async def delete_order(self, order_id: UUID) -> bool:
-        """Elimina un pedido y sus items.
+        """Elimina un pedido y sus items, esté activo o archivado.
         
         Args:
             order_id: ID del pedido a eliminar
@@ -208,28 +322,99 @@ class OrderService:
             HTTPException: Si hay un error al eliminar el pedido
         """
         try:
-            with Session(self.db.engine) as session:
-                order = session.get(Order, order_id)
-                if not order:
-                    return False
-                
-                # Eliminar los items del pedido
-                statement = select(OrderItem).where(OrderItem.order_id == order_id)
-                items = session.exec(statement).all()
-                for item in items:
-                    session.delete(item)
-                
-                # Eliminar el pedido
-                session.delete(order)
-                session.commit()
-                return True
+            async with self.db.async_session() as session:
+                # Un DELETE por tabla (Postgres elimina los items por la llave ON DELETE CASCADE);
+                # el archivo solo se toca si el pedido no estaba en la tabla de pedidos
+                for model in (Order, OrderArchive):
+                    statement = delete(model).where(model.id == order_id).returning(model.id)
+                    if (await session.exec(statement)).first() is not None:
+                        await session.commit()
+                        return True
+                return False
                 
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error al eliminar el pedido: {str(e)}")
 
+    async def delete_orders(
+        self,
+        order_ids: Optional[List[UUID]] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> int:
+        """Elimina varios pedidos (y sus items), activos o archivados, con un DELETE por tabla.
+        
+        Args:
+            order_ids: IDs de los pedidos a eliminar
+            start_date: Fecha inicial del rango (incluida); None para no acotar el inicio
+            end_date: Fecha final del rango (excluida)
+            
+        Returns:
+            int: Número de pedidos eliminados
+            
+        Raises:
+            HTTPException: Si no se indican IDs ni fecha final, o hay un error al eliminar
+        """
+        if order_ids is None and end_date is None:
+            raise HTTPException(status_code=400, detail="Indique los IDs de los pedidos o la fecha final")
+        
+        try:
+            deleted = 0
+            async with self.db.async_session() as session:
+                # Los pedidos archivados también se eliminan (un DELETE por tabla)
+                for model in (Order, OrderArchive):
+                    if order_ids is not None:
+                        # Los IDs viajan como un solo parámetro (= ANY(array)), sin límite de parámetros
+                        conditions = [model.id == any_(bindparam("order_ids", order_ids, type_=ARRAY(Uuid)))]
+                    else:
+                        conditions = [model.created_at < end_date]
+                        if start_date is not None:
+                            conditions.append(model.created_at >= start_date)
+                    result = await session.exec(delete(model).where(*conditions))
+                    deleted += result.rowcount
+                await session.commit()
+                logger.info(f"Pedidos eliminados en bloque: {deleted}")
+                return deleted
+                
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error al eliminar los pedidos: {str(e)}")
+
+    @staticmethod
+    def _last_order_statement(order_model: type, item_model: type, customer_id: str):
+        """Construye la consulta de la última orden de un cliente y sus items en una tabla de pedidos.
+        
+        La subconsulta toma la orden más reciente (índice por customer_id y created_at) y el
+        LEFT JOIN trae sus items.
+        """
+        latest_order = (
+            select(order_model)
+            .where(order_model.customer_id == customer_id)
+            .order_by(order_model.created_at.desc())
+            .limit(1)
+            .subquery("latest_order")
+        )
+        return (
+            select(
+                latest_order.c.id,
+                latest_order.c.status,
+                latest_order.c.total_amount,
+                latest_order.c.address,
+                latest_order.c.created_at,
+                item_model.product_name,
+                item_model.quantity,
+                item_model.unit_price,
+                item_model.subtotal,
+                item_model.details,
+            )
+            .select_from(latest_order)
+            .outerjoin(item_model, item_model.order_id == latest_order.c.id)
+        )
+
     async def get_last_order(self, customer_id: str) -> Optional[Dict[str, Any]]:
         """Obtiene la última orden de un cliente con sus productos.
         
+        Se busca primero en la tabla de pedidos; si el cliente no tiene ninguno ahí (todos sus
+        pedidos ya se archivaron), en el archivo.
+        
         Args:
             customer_id: ID del cliente (teléfono)
             
@@ -237,47 +422,41 @@ class OrderService:
             Optional[Dict[str, Any]]: Diccionario con la información de la última orden
                                     o None si no existe ninguna orden o si el estado es "completed"
         """
-        with Session(self.db.engine) as session:
-            # Obtener la última orden del cliente
-            statement = select(Order).where(
-                Order.customer_id == customer_id
-            ).order_by(Order.created_at.desc()).limit(1)
-            
-            order = session.exec(statement).first()
-            
-            if not order:
-                return None
-                
-            # Si el estado es "completed", retornar None como si no hubiera orden
-            if order.status == "completado":
-                return None
-            
-            # Forzar una recarga de los datos desde la base de datos
-            session.expire_all()  # Expirar todos los objetos en la sesión
-            session.refresh(order)  # Recargar la orden
-            
-            # Cargar explícitamente los items de la orden
-            items_statement = select(OrderItem).where(OrderItem.order_id == order.id)
-            order.items = session.exec(items_statement).all()
-            
-            # Crear el diccionario de respuesta
-            return {
-                "order_id": str(order.id),
-                "status": order.status,
-                "total_amount": order.total_amount,
-                "address": order.address,
-                "created_at": order.created_at.isoformat(),
-                "products": [
-                    {
-                        "name": item.product_name,
-                        "quantity": item.quantity,
-                        "unit_price": item.unit_price,
-                        "subtotal": item.subtotal,
-                        "details": item.details
-                    }
-                    for item in order.items
-                ]
-            }
+        async with self.db.async_session() as session:
+            # Última orden y sus items en una sola consulta por tabla
+            rows = (await session.exec(self._last_order_statement(Order, OrderItem, customer_id))).all()
+            if not rows:
+                statement = self._last_order_statement(OrderArchive, OrderItemArchive, customer_id)
+                rows = (await session.exec(statement)).all()
+        
+        if not rows:
+            return None
+        
+        order_id, status, total_amount, address, created_at = rows[0][:5]
+        
+        # Si el estado es "completed", retornar None como si no hubiera orden
+        if status == "completado":
+            return None
+        
+        # Crear el diccionario de respuesta (sin items, el LEFT JOIN deja una fila con nulos)
+        return {
+            "order_id": str(order_id),
+            "status": status,
+            "total_amount": total_amount,
+            "address": address,
+            "created_at": created_at.isoformat(),
+            "products": [
+                {
+                    "name": row[5],
+                    "quantity": row[6],
+                    "unit_price": row[7],
+                    "subtotal": row[8],
+                    "details": row[9]
+                }
+                for row in rows
+                if row[5] is not None
+            ]
+        }
 
     async def add_products_to_order(self, order_id: UUID, products: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Añade productos a una orden existente.
@@ -299,80 +478,144 @@ class OrderService:
             HTTPException: Si la orden no existe o hay un error al añadir los productos
         """
         try:
-            with Session(self.db.engine) as session:
-                # Verificar que la orden existe
-                order = session.get(Order, order_id)
-                if not order:
-                    raise HTTPException(status_code=404, detail="Orden no encontrada")
-                
-                # Verificar que la orden no esté en estado 'completed' o 'cancelled'
-                if order.status in ['completed', 'cancelled']:
+            items = self._build_items(products, order_id)
+            added_amount = sum(item["subtotal"] for item in items)
+            
+            async with self.db.async_session() as session:
+                # El total se actualiza en la base de datos (total_amount + subtotales) en la misma
+                # transacción que inserta los items; el WHERE descarta órdenes cerradas
+                statement = (
+                    update(Order)
+                    .where(Order.id == order_id, Order.status.not_in(CLOSED_STATUSES))
+                    .values(
+                        total_amount=Order.total_amount + added_amount,
+                        updated_at=datetime.fromisoformat(current_colombian_time()),
+                    )
+                    .returning(Order)
+                )
+                order = (await session.exec(statement)).scalar_one_or_none()
+                if order is None:
+                    # Distinguir orden inexistente de orden cerrada
+                    existing = await session.get(Order, order_id)
+                    if not existing:
+                        raise HTTPException(status_code=404, detail="Orden no encontrada")
                     raise HTTPException(
                         status_code=400, 
-                        detail=f"No se pueden añadir productos a una orden en estado '{order.status}'"
+                        detail=f"No se pueden añadir productos a una orden en estado '{existing.status}'"
                     )
                 
-                total_amount = order.total_amount
-                
-                # Añadir los nuevos items a la orden
-                for product in products:
-                    order_item = OrderItem(
-                        order_id=order.id,
-                        product_id="",  # No tenemos el ID del producto, solo el nombre
-                        product_name=product["product_name"],
-                        quantity=product["quantity"],
-                        unit_price=product["unit_price"],
-                        subtotal=product["subtotal"],
-                        details=product.get("details", "")  # Obtener details si existe, sino cadena vacía
-                    )
-                    session.add(order_item)
-                    total_amount += product["subtotal"]
-                
-                # Actualizar el monto total de la orden
-                order.total_amount = total_amount
-                order.updated_at = datetime.fromisoformat(current_colombian_time())
-                session.add(order)
-                
-                session.commit()
-                session.refresh(order)
-                return order
+                await self._insert_items(session, items)
+                await session.commit()
+            
+            # Solo se envían los productos nuevos; el tablero los agrega a los que ya tiene
+            await order_event_broadcaster.publish(
+                "order_items_added",
+                str(order.id),
+                products=format_products(items),
+                total_amount=order.total_amount,
+                updated_at=order.updated_at.isoformat(),
+            )
+            return order
                 
         except HTTPException:
             raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error al añadir productos a la orden: {str(e)}")
 
-    async def get_orders_today(self) -> List[Order]:
-        """Obtiene todos los pedidos de la tabla Order, incluyendo sus items."""
-        with Session(self.db.engine) as session:
-            statement = select(Order).options(selectinload(Order.items)).order_by(Order.created_at.desc())
-            return session.exec(statement).all()
+    @staticmethod
+    async def _order_tables(session: AsyncSession, start_date: datetime) -> Tuple[type, ...]:
+        """Devuelve las tablas de pedidos que puede tocar un rango que empieza en start_date.
+        
+        El archivo solo se consulta si tiene pedidos creados desde start_date. Se compara con el
+        pedido archivado más reciente (el final del índice ix_order_archive_created_at_id), no con
+        ORDER_ARCHIVE_AFTER_DAYS: así se ven también los pedidos archivados con otra antigüedad
+        (scripts/archive_orders.py --days o un valor anterior de la configuración).
+        """
+        newest_archived = (await session.exec(select(func.max(OrderArchive.created_at)))).one()
+        if newest_archived is not None and start_date <= newest_archived:
+            return (Order, OrderArchive)
+        return (Order,)
+
+    async def archive_orders(self, before: datetime, batch_size: int) -> int:
+        """Mueve al archivo los pedidos cerrados creados antes de una fecha, por lotes.
+        
+        Cada lote es una transacción corta (ARCHIVE_ORDERS_SQL); los pedidos abiertos se quedan
+        en la tabla de pedidos aunque sean antiguos.
+        
+        Args:
+            before: Se archivan los pedidos creados antes de esta fecha
+            batch_size: Pedidos por lote
+            
+        Returns:
+            int: Número de pedidos archivados
+        """
+        params = {"statuses": CLOSED_STATUSES, "before": before, "batch_size": batch_size}
+        archived = 0
+        while True:
+            async with self.db.async_engine.begin() as conn:
+                moved = (await conn.execute(ARCHIVE_ORDERS_SQL, params)).scalar_one()
+            archived += moved
+            if moved < batch_size:
+                return archived
 
-    async def get_orders_by_date_range(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
-        """Obtiene todos los pedidos en un rango de fechas específico.
+    async def get_orders_by_date_range(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[datetime, UUID]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Obtiene los pedidos en un rango de fechas, del más reciente al más antiguo.
+        
+        La paginación es por cursor (keyset) sobre (created_at, id), que recorre el índice
+        ix_order_created_at_id: cada página cuesta lo mismo sin importar su profundidad. Si el
+        archivo tiene pedidos del rango también se lee (hasta `limit` pedidos de cada tabla) y
+        ambas listas se mezclan.
         
         Args:
-            start_date: Fecha inicial
-            end_date: Fecha final
+            start_date: Fecha inicial (incluida)
+            end_date: Fecha final (excluida)
+            limit: Número máximo de pedidos a devolver (None para todos)
+            after: (created_at, id) del último pedido de la página anterior
             
         Returns:
             List[Dict[str, Any]]: Lista de diccionarios con información detallada de cada pedido
+                y el nombre del cliente
         """
         orders_data = []
         
-        with Session(self.db.engine) as session:
-            statement = select(Order).options(selectinload(Order.items)).where(
-                Order.created_at >= start_date,
-                Order.created_at <= end_date
-            ).order_by(Order.created_at.desc())
+        async with self.db.async_session() as session:
+            rows = []
+            tables = await self._order_tables(session, start_date)
+            for model in tables:
+                # El nombre del cliente se trae en la misma consulta (LEFT JOIN con user)
+                statement = (
+                    select(model, User.name)
+                    .outerjoin(User, User.phone == model.customer_id)
+                    .options(selectinload(model.items))
+                    .where(
+                        model.created_at >= start_date,
+                        model.created_at < end_date
+                    )
+                    .order_by(model.created_at.desc(), model.id.desc())
+                )
+                if after is not None:
+                    statement = statement.where(tuple_(model.created_at, model.id) < tuple_(*after))
+                if limit is not None:
+                    statement = statement.limit(limit)
+                rows.extend((await session.exec(statement)).all())
             
-            orders = session.exec(statement).all()
+            # Con el archivo hay dos listas ordenadas: se mezclan y se corta al límite
+            if len(tables) > 1:
+                rows.sort(key=lambda row: (row[0].created_at, row[0].id), reverse=True)
+                rows = rows[:limit]
             
-            for order in orders:
+            for order, customer_name in rows:
                 # Crear el diccionario de respuesta para cada orden
                 order_data = {
                     "order_id": str(order.id),
                     "customer_id": order.customer_id,
+                    "customer_name": customer_name or order.customer_id,
                     "status": order.status,
                     "total_amount": order.total_amount,
                     "address": order.address,
@@ -393,6 +636,44 @@ class OrderService:
             
             return orders_data
 
+    async def get_order_stats(self, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+        """Calcula las estadísticas de los pedidos de un rango de fechas en la base de datos.
+
+        Una consulta GROUP BY status con COUNT y SUM(total_amount) por tabla (pedidos y, si el archivo
+        tiene pedidos del rango, pedidos archivados); total_amount se mantiene igual
+        a la suma de los subtotales de los items en cada escritura del pedido.
+
+        Args:
+            start_date: Fecha inicial (incluida)
+            end_date: Fecha final (excluida)
+
+        Returns:
+            Dict[str, Any]: total_orders, pending_orders, complete_orders y total_sales
+                (ventas de los pedidos completados)
+        """
+        counts: Dict[str, int] = {}
+        sales: Dict[str, float] = {}
+        async with self.db.async_session() as session:
+            for model in await self._order_tables(session, start_date):
+                statement = (
+                    select(model.status, func.count(), func.coalesce(func.sum(model.total_amount), 0))
+                    .where(
+                        model.created_at >= start_date,
+                        model.created_at < end_date
+                    )
+                    .group_by(model.status)
+                )
+                for status, count, total in (await session.exec(statement)).all():
+                    counts[status] = counts.get(status, 0) + count
+                    sales[status] = sales.get(status, 0) + total
+
+        return {
+            "total_orders": sum(counts.values()),
+            "pending_orders": counts.get("pendiente", 0),
+            "complete_orders": counts.get("completado", 0),
+            "total_sales": float(sales.get("completado", 0)),
+        }
+
     async def update_order_product(self, order_id: UUID, product_name: str, new_data: Dict[str, Any]) -> Dict[str, Any]:
         """Modifica los datos de un producto específico en una orden.
         
@@ -405,23 +686,26 @@ class OrderService:
                      - details: Nuevas observaciones (opcional)
                   
         Returns:
-            Dict[str, Any]: Diccionario con la información actualizada de la orden
+            Dict[str, Any]: Diccionario con la información actualizada de la orden y el producto
+                            modificado (product)
             
         Raises:
             HTTPException: Si la orden no existe, el producto no se encuentra o hay un error al actualizarlo
         """
         try:
-            with Session(self.db.engine) as session:
-                # Verificar que la orden existe
-                order = session.get(Order, order_id)
-                if not order:
+            async with self.db.async_session() as session:
+                # Bloquear la orden (SELECT ... FOR UPDATE): las ediciones concurrentes del bot y del
+                # tablero sobre la misma orden se aplican una tras otra
+                statement = select(Order.status).where(Order.id == order_id).with_for_update()
+                status = (await session.exec(statement)).first()
+                if status is None:
                     raise HTTPException(status_code=404, detail="Orden no encontrada")
                 
-                # Verificar que la orden no esté en estado 'completed' o 'cancelled'
-                if order.status in ['completed', 'cancelled']:
+                # Verificar que la orden no esté cerrada (completado, completed o cancelled)
+                if status in CLOSED_STATUSES:
                     raise HTTPException(
                         status_code=400,
-                        detail=f"No se pueden modificar productos en una orden en estado '{order.status}'"
+                        detail=f"No se pueden modificar productos en una orden en estado '{status}'"
                     )
                 
                 # Buscar el producto en la orden
@@ -429,12 +713,14 @@ class OrderService:
                     OrderItem.order_id == order_id,
                     OrderItem.product_name == product_name
                 )
-                order_item = session.exec(statement).first()
+                order_item = (await session.exec(statement)).first()
                 
                 if not order_item:
                     raise HTTPException(status_code=404, detail=f"Producto '{product_name}' no encontrado en la orden")
                 
                 # Validar y actualizar los datos del producto
+                previous_name = order_item.product_name
+                previous_subtotal = order_item.subtotal
                 if "product_name" in new_data:
                     if not new_data["product_name"]:
                         raise HTTPException(status_code=400, detail="El nombre del producto no puede estar vacío")
@@ -449,37 +735,47 @@ class OrderService:
                 if "details" in new_data:
                     order_item.details = str(new_data["details"])
                 
-                # Recalcular el total de la orden
-                total_amount = 0
-                for item in order.items:
-                    total_amount += item.subtotal
-                
-                order.total_amount = total_amount
-                order.updated_at = datetime.fromisoformat(current_colombian_time())
-                
-                session.add(order)
                 session.add(order_item)
-                session.commit()
-                session.refresh(order)
                 
-                # Crear el diccionario de respuesta
-                return {
+                # Ajustar el total con la diferencia del subtotal, sin volver a sumar los items
+                statement = (
+                    update(Order)
+                    .where(Order.id == order_id)
+                    .values(
+                        total_amount=Order.total_amount + (order_item.subtotal - previous_subtotal),
+                        updated_at=datetime.fromisoformat(current_colombian_time()),
+                    )
+                    .returning(Order)
+                )
+                order = (await session.exec(statement)).scalar_one()
+                await session.commit()
+                
+                # Crear el diccionario de respuesta (solo con el producto modificado)
+                result = {
                     "order_id": str(order.id),
                     "status": order.status,
                     "total_amount": order.total_amount,
                     "address": order.address,
                     "created_at": order.created_at.isoformat(),
-                    "products": [
-                        {
-                            "name": item.product_name,
-                            "quantity": item.quantity,
-                            "unit_price": item.unit_price,
-                            "subtotal": item.subtotal,
-                            "details": item.details
-                        }
-                        for item in order.items
-                    ]
+                    "product": {
+                        "name": order_item.product_name,
+                        "quantity": order_item.quantity,
+                        "unit_price": order_item.unit_price,
+                        "subtotal": order_item.subtotal,
+                        "details": order_item.details
+                    }
                 }
+            
+            # El tablero reemplaza el producto que tenía con el nombre anterior
+            await order_event_broadcaster.publish(
+                "order_item_updated",
+                str(order.id),
+                previous_name=previous_name,
+                products=format_products([order_item.model_dump()]),
+                total_amount=order.total_amount,
+                updated_at=order.updated_at.isoformat(),
+            )
+            return result
                 
         except HTTPException:
             raise
@@ -0,0 +1,96 @@
+"""Caché en memoria de la conversación vigente de cada número de teléfono."""
+
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Dict,
+    Optional,
+    Tuple,
+)
+
+from core.config import settings
+
+
+class ThreadCache:
+    """Caché teléfono → (user_id, thread_id) con expiración (TTL) y desalojo LRU.
+
+    Evita resolver usuario y thread en la base de datos en cada mensaje. Cuando este proceso
+    rota el thread de un cliente (pedido completado, /create-thread) llama a `invalidate`; las
+    rotaciones hechas por otros workers se recogen al expirar el TTL.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        """Inicializa la caché vacía.
+
+        Args:
+            max_entries: Número máximo de teléfonos guardados
+            ttl_seconds: Segundos que una entrada sigue siendo válida
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, int, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, phone: str) -> Optional[Tuple[int, str]]:
+        """Busca la conversación vigente de un teléfono.
+
+        Args:
+            phone: Número de celular del usuario
+
+        Returns:
+            Optional[Tuple[int, str]]: (user_id, thread_id), o None si no hay una entrada vigente
+        """
+        entry = self._entries.get(phone)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[phone]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(phone)
+        self.hits += 1
+        return entry[1], entry[2]
+
+    def set(self, phone: str, user_id: int, thread_id: str) -> None:
+        """Guarda la conversación vigente de un teléfono.
+
+        Args:
+            phone: Número de celular del usuario
+            user_id: ID del usuario
+            thread_id: ID del thread vigente
+        """
+        self._entries[phone] = (time.monotonic() + self.ttl_seconds, user_id, thread_id)
+        self._entries.move_to_end(phone)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, phone: str) -> None:
+        """Descarta la entrada de un teléfono tras rotar su thread.
+
+        Args:
+            phone: Número de celular del usuario
+        """
+        self._entries.pop(phone, None)
+
+    def clear(self) -> None:
+        """Elimina todas las entradas."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Devuelve el tamaño y los contadores de la caché."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Crear una instancia singleton de la caché
+thread_cache = ThreadCache(
+    max_entries=settings.THREAD_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.THREAD_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,61 @@
+"""Pruebas de los reintentos del cliente del puente de WhatsApp."""
+
+import httpx
+import pytest
+
+from services.baileys_client import BaileysClient
+
+
+def make_client(handler) -> BaileysClient:
+    """Cliente sin espera entre reintentos cuyas solicitudes responde `handler`."""
+    client = BaileysClient(
+        base_url="http://bridge", max_connections=1, max_concurrency=1, timeout=1, max_retries=2, retry_backoff=0
+    )
+    client._client = httpx.AsyncClient(base_url="http://bridge", transport=httpx.MockTransport(handler))
+    return client
+
+
+@pytest.mark.parametrize("error", [httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout])
+async def test_connect_errors_are_retried(error):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise error("sin conexión", request=request)
+        return httpx.Response(200)
+
+    response = await make_client(handler).send_message("573000000000", "hola")
+
+    assert response.status_code == 200 and len(calls) == 2
+
+
+async def test_bad_gateway_is_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(502 if len(calls) == 1 else 200)
+
+    assert (await make_client(handler).send_message("573000000000", "hola")).status_code == 200
+    assert len(calls) == 2
+
+
+async def test_errors_after_delivery_are_not_retried():
+    """Un corte de la respuesta o un 504 pueden llegar con el mensaje ya enviado: no se repite."""
+    calls = []
+
+    def dropped(request):
+        calls.append(request)
+        raise httpx.RemoteProtocolError("conexión cerrada", request=request)
+
+    with pytest.raises(httpx.RemoteProtocolError):
+        await make_client(dropped).send_message("573000000000", "hola")
+    assert len(calls) == 1
+
+    def gateway_timeout(request):
+        calls.append(request)
+        return httpx.Response(504)
+
+    assert (await make_client(gateway_timeout).send_message("573000000000", "hola")).status_code == 504
+    assert len(calls) == 2
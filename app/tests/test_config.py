@@ -0,0 +1,27 @@
+"""Pruebas de la validación de API_BASE_URL al arrancar."""
+
+import pytest
+
+from core.config import Settings
+
+
+def make_settings(bridge_url, api_base_url) -> Settings:
+    """Configuración con las URLs del puente y de la API indicadas."""
+    config = Settings()
+    config.BAILEYS_SERVER_URL = bridge_url
+    config.API_BASE_URL = api_base_url
+    return config
+
+
+@pytest.mark.parametrize("api_base_url", [None, "", "http://0.0.0.0:8080", "http://[::]:8080", "api:8080"])
+def test_unreachable_api_base_url_fails_when_bridge_is_configured(api_base_url):
+    with pytest.raises(ValueError):
+        make_settings("http://wha_api:3001", api_base_url).validate_api_base_url()
+
+
+def test_reachable_api_base_url_is_accepted():
+    make_settings("http://wha_api:3001", "http://api:8080").validate_api_base_url()
+
+
+def test_api_base_url_is_optional_without_bridge():
+    make_settings(None, None).validate_api_base_url()
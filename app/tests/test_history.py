@@ -0,0 +1,68 @@
+"""Pruebas del recorte y la compactación del historial de la conversación."""
+
+from langchain_core.messages import (
+    AIMessage,
+    HumanMessage,
+    ToolMessage,
+)
+
+from core.config import settings
+from schemas.graph import merge_token_counts
+from utils.graph import (
+    prepare_messages,
+    select_messages_to_compact,
+)
+
+
+def make_turn(index: int, with_tool: bool = False) -> list:
+    """Turno `index`: mensaje del usuario, llamada a herramienta opcional y respuesta."""
+    messages = [HumanMessage(content=f"pregunta {index}", id=f"h{index}")]
+    if with_tool:
+        messages += [
+            AIMessage(content="", id=f"c{index}", tool_calls=[{"name": "get_menu", "args": {}, "id": f"t{index}"}]),
+            ToolMessage(content="menú", tool_call_id=f"t{index}", id=f"r{index}"),
+        ]
+    return messages + [AIMessage(content=f"respuesta {index}", id=f"a{index}")]
+
+
+def test_merge_token_counts_adds_and_removes():
+    """Los conteos nuevos se agregan y un None elimina el de un mensaje compactado."""
+    assert merge_token_counts({"a": 3, "b": 5}, {"b": None, "c": 7}) == {"a": 3, "c": 7}
+    assert merge_token_counts(None, {"a": 1}) == {"a": 1}
+
+
+def test_prepare_messages_caches_counts_and_starts_on_human(monkeypatch):
+    """El recorte guarda los conteos por id y nunca empieza en una respuesta o herramienta."""
+    messages = make_turn(1, with_tool=True) + make_turn(2)
+    token_counts = {"r1": 10_000}
+    monkeypatch.setattr(settings, "MAX_TOKENS", 5_000)
+
+    prepared = prepare_messages(messages, "prompt", token_counts)
+
+    assert [message.id for message in prepared[1:]] == ["h2", "a2"]
+    assert prepared[0].role == "system" and prepared[0].content == "prompt"
+    assert {"h2", "a2"} <= token_counts.keys() and token_counts["r1"] == 10_000
+
+
+def test_no_compaction_under_threshold():
+    messages = make_turn(1) + make_turn(2)
+
+    assert select_messages_to_compact(messages, threshold=10, keep=2) == []
+
+
+def test_compaction_drops_whole_turns():
+    """Se eliminan turnos completos: la llamada a herramienta se va con su resultado."""
+    messages = make_turn(1, with_tool=True) + make_turn(2, with_tool=True) + make_turn(3)
+
+    removed = select_messages_to_compact(messages, threshold=6, keep=3)
+
+    assert [message.id for message in removed] == ["h1", "c1", "r1", "a1", "h2", "c2", "r2", "a2"]
+
+
+def test_compaction_keeps_a_long_current_turn():
+    """Si el turno actual es más largo que la ventana se conserva entero."""
+    messages = make_turn(1) + make_turn(2, with_tool=True)
+
+    removed = select_messages_to_compact(messages, threshold=3, keep=2)
+
+    assert [message.id for message in removed] == ["h1", "a1"]
@@ -0,0 +1,47 @@
+"""Pruebas del clasificador local de intenciones."""
+
+import pytest
+
+from core.langgraph.intent_classifier import classify_intent
+
+
+@pytest.mark.parametrize(
+    ("text", "node"),
+    [
+        ("Me muestras el menú?", "send_menu"),
+        ("¿Qué tienen hoy de almuerzo?", "send_menu"),
+        ("Quiero hacer un pedido", "order_data_agent"),
+        ("Agrégale una gaseosa", "update_order_agent"),
+        ("¿Dónde está mi pedido?", "conversation_agent"),
+        ("¿A qué hora abren?", "conversation_agent"),
+        ("Quiero poner una queja, llegó frío", "pqrs_agent"),
+    ],
+)
+def test_obvious_messages_skip_the_llm(text, node):
+    """Los mensajes obvios se clasifican sin el LLM (acentos y mayúsculas no importan)."""
+    prediction = classify_intent(text, threshold=0.75, min_score=1.0, max_words=12)
+
+    assert prediction.node == node
+    assert prediction.confidence >= 0.75
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "el domingo pasado",
+        "hola, quiero pedir pero primero dime qué hay en el menú de hoy por favor amigo",
+    ],
+)
+def test_unknown_or_long_messages_go_to_the_llm(text):
+    """Sin palabras clave o con demasiadas palabras se delega al LLM (node None)."""
+    assert classify_intent(text, threshold=0.75, min_score=1.0, max_words=12).node is None
+
+
+def test_ambiguous_message_goes_to_the_llm():
+    """Si dos intenciones puntúan parecido la confianza no llega al umbral."""
+    prediction = classify_intent("quiero pedir y ver el menu", threshold=0.75, min_score=1.0, max_words=12)
+
+    assert prediction.node is None
+    assert prediction.scores["send_menu"] > 0 and prediction.scores["order_data_agent"] > 0
+    assert prediction.confidence < 0.75
@@ -0,0 +1,68 @@
+"""Pruebas de la caché del menú (MenuSnapshotCache)."""
+
+import asyncio
+
+import pytest
+
+from services.inventory_service import inventory_service
+from services.menu_snapshot import MenuSnapshotCache
+
+
+@pytest.fixture
+def menu(monkeypatch):
+    """Productos que devuelve inventory_service y número de lecturas a la base de datos."""
+    state = {
+        "products": [
+            {"name": "Bandeja", "category": "Almuerzos"},
+            {"name": "Limonada", "category": "Bebidas"},
+        ],
+        "reads": 0,
+    }
+
+    async def get_menu_products():
+        state["reads"] += 1
+        await asyncio.sleep(0)
+        return list(state["products"])
+
+    monkeypatch.setattr(inventory_service, "get_menu_products", get_menu_products)
+    return state
+
+
+async def test_snapshot_is_grouped_and_reused(menu):
+    """El menú se agrupa por categoría y se lee una sola vez, incluso con lecturas concurrentes."""
+    cache = MenuSnapshotCache(ttl_seconds=60)
+
+    snapshots = await asyncio.gather(*(cache.get() for _ in range(5)))
+
+    assert menu["reads"] == 1
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
+    assert [product["name"] for product in snapshots[0].by_category["Almuerzos"]] == ["Bandeja"]
+    with pytest.raises(TypeError):
+        snapshots[0].by_category["Postres"] = ()
+
+
+async def test_invalidate_reloads_with_a_new_version(menu):
+    cache = MenuSnapshotCache(ttl_seconds=60)
+    first = await cache.get()
+
+    menu["products"].append({"name": "Flan", "category": "Postres"})
+    cache.invalidate()
+    second = await cache.get()
+
+    assert menu["reads"] == 2
+    assert second.version == first.version + 1
+    assert "Postres" in second.by_category
+
+
+async def test_expired_snapshot_bumps_version_only_on_changes(menu):
+    """Al expirar el TTL se relee el menú; la versión solo sube si el contenido cambió."""
+    cache = MenuSnapshotCache(ttl_seconds=0)
+    first = await cache.get()
+
+    unchanged = await cache.get()
+    menu["products"][0] = {"name": "Bandeja paisa", "category": "Almuerzos"}
+    changed = await cache.get()
+
+    assert menu["reads"] == 3
+    assert unchanged.version == first.version
+    assert changed.version == first.version + 1
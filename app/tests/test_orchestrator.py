@@ -0,0 +1,80 @@
+"""Pruebas del nodo orquestador (sin LLM: el clasificador local decide la intención)."""
+
+import pytest
+from langchain_core.messages import (
+    AIMessage,
+    HumanMessage,
+    SystemMessage,
+)
+
+from core.config import settings
+from core.langgraph import graph as graph_module
+from core.langgraph.graph import LangGraphAgent
+from core.langgraph.intent_classifier import IntentPrediction
+from schemas import GraphState
+
+
+@pytest.fixture
+def agent():
+    """Agente sin grafo compilado; sus LLM no se llaman en estas pruebas."""
+    return LangGraphAgent()
+
+
+def classify_as(node: str):
+    """Devuelve un clasificador local que siempre predice `node` con confianza total."""
+    return lambda text: IntentPrediction(node, 1.0, {node: 1.0})
+
+
+def make_state(node_history: list[str], order_status: str) -> GraphState:
+    """Estado de un cliente con un pedido en `order_status` que escribe para añadir un producto."""
+    return GraphState(
+        session_id="test-session",
+        phone="573000000000",
+        node_history=node_history,
+        customer_context={
+            "name": "Ana",
+            "order": {
+                "order_id": "5b1f4bd6-4a4c-4b8e-9d43-7c1f0f3f0e10",
+                "status": order_status,
+                "total_amount": 12000.0,
+                "address": "Calle 1",
+                "created_at": "2026-01-01T12:00:00",
+                "products": [{"name": "Bandeja", "quantity": 1, "unit_price": 12000.0, "subtotal": 12000.0}],
+            },
+        },
+        messages=[
+            HumanMessage(content="quiero una bandeja"),
+            AIMessage(content="Listo, tu pedido quedó registrado"),
+            HumanMessage(content="agrégale una gaseosa"),
+        ],
+    )
+
+
+async def test_order_not_editable_after_update_order_agent(agent, monkeypatch):
+    """Tras update_order_agent con el pedido ya en preparación, el turno pasa a conversation_agent.
+
+    Regresión: el aviso de pedido no editable se añadía como dict y la segunda detección de
+    intención fallaba con AttributeError al leer `message.type`.
+    """
+    monkeypatch.setattr(graph_module, "classify_intent", classify_as("update_order_agent"))
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+    state = make_state(["update_order_agent"], "en preparación")
+
+    state = await agent._orchestrator(state)
+
+    assert state.node_history[-1] == "conversation_agent"
+    notices = [message for message in state.messages if isinstance(message, SystemMessage)]
+    assert notices and "en preparación" in notices[0].content
+    assert all(not isinstance(message, dict) for message in state.messages)
+
+
+async def test_send_menu_adds_system_message(agent, monkeypatch):
+    """La petición del menú se comunica a conversation_agent con un SystemMessage."""
+    monkeypatch.setattr(graph_module, "classify_intent", classify_as("send_menu"))
+    state = make_state([], "completado")
+
+    state = await agent._orchestrator(state)
+
+    assert state.node_history[-1] == "conversation_agent"
+    assert isinstance(state.messages[-1], SystemMessage)
+    assert "menú" in state.messages[-1].content
@@ -0,0 +1,46 @@
+"""Pruebas del reparto de eventos de pedidos a los tableros (sin LISTEN: dentro del proceso)."""
+
+from services.order_events import (
+    MAX_PAYLOAD_BYTES,
+    OrderEventBroadcaster,
+)
+
+
+def drain(queue) -> list:
+    """Saca todos los eventos pendientes de la cola."""
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return events
+
+
+async def test_events_reach_every_subscriber():
+    broadcaster = OrderEventBroadcaster(queue_size=10)
+    async with broadcaster.subscribe() as first, broadcaster.subscribe() as second:
+        await broadcaster.publish("order_status_changed", "o1", state="en reparto")
+
+        expected = [{"type": "order_status_changed", "order": {"id": "o1", "state": "en reparto"}}]
+        assert drain(first) == drain(second) == expected
+    assert broadcaster.stats()["subscribers"] == 0
+
+
+async def test_slow_subscriber_gets_a_resync():
+    """Un suscriptor con la cola llena pierde sus eventos y recibe un único resync."""
+    broadcaster = OrderEventBroadcaster(queue_size=2)
+    async with broadcaster.subscribe() as slow:
+        for index in range(3):
+            broadcaster._fan_out({"type": "order_created", "order": {"id": f"o{index}"}})
+
+        assert drain(slow) == [{"type": "resync"}]
+
+
+async def test_large_events_are_sent_without_products():
+    """Los eventos que no caben en un NOTIFY se marcan truncated y van sin productos."""
+    broadcaster = OrderEventBroadcaster(queue_size=10)
+    products = [{"name": "x" * 100, "quantity": 1}] * (MAX_PAYLOAD_BYTES // 100)
+    async with broadcaster.subscribe() as queue:
+        await broadcaster.publish("order_created", "o1", products=products, total_amount=1000)
+
+        (event,) = drain(queue)
+    assert event["truncated"] is True
+    assert event["order"] == {"id": "o1", "total_amount": 1000}
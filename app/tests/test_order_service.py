@@ -0,0 +1,181 @@
+"""Pruebas de OrderService contra Postgres (se omiten si la base de datos no responde)."""
+
+from datetime import (
+    datetime,
+    timedelta,
+)
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from services.order_events import order_event_broadcaster
+from services.order_service import order_service
+from utils.utils import current_colombian_time
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+CUSTOMER = "test-order-service"
+PRODUCTS = [{"product_name": "Bandeja", "quantity": 1, "unit_price": 12000, "subtotal": 12000}]
+
+
+async def execute(db, statement: str, **params) -> None:
+    """Ejecuta una sentencia SQL en su propia transacción."""
+    async with db.async_engine.begin() as conn:
+        await conn.execute(text(statement), params)
+
+
+async def fetch_all(db, statement: str, **params) -> list[tuple]:
+    """Devuelve las filas de una consulta SQL."""
+    async with db.async_engine.connect() as conn:
+        return [tuple(row) for row in await conn.execute(text(statement), params)]
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def order(db):
+    """Pedido pendiente del cliente de prueba; se elimina al terminar."""
+    order = await order_service.create_order(CUSTOMER, "Calle 1", PRODUCTS)
+    yield order
+    await execute(db, 'DELETE FROM "order" WHERE customer_id = :customer', customer=CUSTOMER)
+
+
+@pytest.mark.parametrize("status", ["completado", "completed", "cancelled"])
+async def test_closed_order_rejects_edits(db, order, status):
+    """Un pedido cerrado (incluido "completado", el estado que usa el tablero) no se edita."""
+    await execute(db, 'UPDATE "order" SET status = :status WHERE id = :id', status=status, id=order.id)
+    new_product = {"product_name": "Gaseosa", "quantity": 1, "unit_price": 3000, "subtotal": 3000}
+
+    with pytest.raises(HTTPException) as added:
+        await order_service.add_products_to_order(order.id, [new_product])
+    with pytest.raises(HTTPException) as updated:
+        await order_service.update_order_product(order.id, "Bandeja", {"quantity": 2})
+
+    assert added.value.status_code == updated.value.status_code == 400
+    assert (await order_service.get_order(order.id)).total_amount == 12000
+    assert await fetch_all(db, "SELECT product_name, quantity FROM orderitem WHERE order_id = :id", id=order.id) == [
+        ("Bandeja", 1)
+    ]
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def archived_order(db):
+    """Pedido completado hace 40 días que ya está en el archivo (p. ej. archive_orders.py --days 30)."""
+    order_id = uuid4()
+    created_at = datetime.fromisoformat(current_colombian_time()) - timedelta(days=40)
+    await execute(
+        db,
+        """
+        INSERT INTO order_archive (id, customer_id, status, total_amount, address, created_at, updated_at)
+        VALUES (:id, :customer, 'completado', 12000, 'Calle 1', :created_at, :created_at)
+        """,
+        id=order_id,
+        customer=CUSTOMER,
+        created_at=created_at,
+    )
+    await execute(
+        db,
+        """
+        INSERT INTO orderitem_archive (id, order_id, product_id, product_name, quantity, unit_price, subtotal, details)
+        VALUES (:item_id, :id, 'p1', 'Bandeja', 1, 12000, 12000, '')
+        """,
+        item_id=uuid4(),
+        id=order_id,
+    )
+    yield order_id, created_at
+    await execute(db, "DELETE FROM order_archive WHERE customer_id = :customer", customer=CUSTOMER)
+
+
+async def test_listing_reads_orders_archived_before_the_configured_horizon(db, archived_order):
+    """Los listados leen el archivo según lo archivado, no según ORDER_ARCHIVE_AFTER_DAYS."""
+    order_id, created_at = archived_order
+    start, end = created_at - timedelta(days=1), created_at + timedelta(days=1)
+
+    orders = await order_service.get_orders_by_date_range(start, end)
+    stats = await order_service.get_order_stats(start, end)
+
+    archived = [order for order in orders if order["order_id"] == str(order_id)]
+    assert len(archived) == 1 and archived[0]["products"][0]["name"] == "Bandeja"
+    assert stats["complete_orders"] >= 1
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def customer(db):
+    """Usuario del cliente de prueba; se elimina al terminar."""
+    user = await db.create_user("Cliente de prueba", CUSTOMER)
+    yield user
+    await execute(db, "DELETE FROM thread WHERE user_id = :id", id=user.id)
+    await execute(db, 'DELETE FROM "user" WHERE id = :id', id=user.id)
+
+
+async def test_last_order_falls_back_to_the_archive(db, customer, archived_order):
+    """Si todos los pedidos del cliente están archivados, el último se lee del archivo."""
+    order_id, _ = archived_order
+    await execute(db, "UPDATE order_archive SET status = 'cancelled' WHERE id = :id", id=order_id)
+
+    last_order = await order_service.get_last_order(CUSTOMER)
+    context = await db.get_customer_context(CUSTOMER)
+
+    assert last_order["order_id"] == str(order_id) and last_order["status"] == "cancelled"
+    assert [product["name"] for product in last_order["products"]] == ["Bandeja"]
+    assert context["has_order"] and context["order"]["order_id"] == str(order_id)
+    assert context["address"] == "Calle 1"
+    assert [product["name"] for product in context["order"]["products"]] == ["Bandeja"]
+
+
+async def test_last_order_prefers_the_order_table(db, customer, archived_order, order):
+    """Con pedidos en la tabla de pedidos, el archivo no se consulta."""
+    last_order = await order_service.get_last_order(CUSTOMER)
+    context = await db.get_customer_context(CUSTOMER)
+
+    assert last_order["order_id"] == context["order"]["order_id"] == str(order.id)
+
+
+async def test_delete_order_removes_archived_orders(db, archived_order):
+    """DELETE /orders/{order_id} también elimina pedidos archivados y sus items."""
+    order_id, _ = archived_order
+
+    assert await order_service.delete_order(order_id)
+    assert not await order_service.delete_order(order_id)
+    assert await fetch_all(db, "SELECT id FROM orderitem_archive WHERE order_id = :id", id=order_id) == []
+
+
+async def test_delete_order_removes_active_orders(db, order):
+    assert await order_service.delete_order(order.id)
+    assert await order_service.get_order(order.id) is None
+
+
+@pytest.fixture
+def published(monkeypatch):
+    """Eventos publicados a los tableros durante la prueba."""
+    events = []
+
+    async def publish(event_type, order_id, **fields):
+        events.append((event_type, order_id, fields))
+
+    monkeypatch.setattr(order_event_broadcaster, "publish", publish)
+    return events
+
+
+async def test_status_change_is_published_after_commit(db, order, published):
+    await order_service.update_order_status(order.id, "en reparto")
+
+    assert [(event, order_id, fields["state"]) for event, order_id, fields in published] == [
+        ("order_status_changed", str(order.id), "en reparto")
+    ]
+
+
+async def test_failed_commit_publishes_nothing(db, order, published, monkeypatch):
+    async def failing_commit(self):
+        raise RuntimeError("commit fallido")
+
+    monkeypatch.setattr(AsyncSession, "commit", failing_commit)
+
+    with pytest.raises(HTTPException):
+        await order_service.update_order_status(order.id, "en reparto")
+
+    assert published == []
+    monkeypatch.undo()
+    assert (await order_service.get_order(order.id)).status == "pending"
@@ -0,0 +1,138 @@
+"""Pruebas de la paginación por cursor del listado de pedidos (api/orders.py)."""
+
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from fastapi import (
+    FastAPI,
+    HTTPException,
+)
+from httpx import (
+    ASGITransport,
+    AsyncClient,
+)
+
+from api import orders as orders_api
+from models.admin import Admin
+from services.order_service import order_service
+
+
+def make_order(minute: int) -> dict:
+    """Pedido del listado creado el 1 de marzo de 2026 a las 12:`minute`."""
+    return {"order_id": str(uuid4()), "created_at": datetime(2026, 3, 1, 12, minute).isoformat()}
+
+
+def test_cursor_round_trip():
+    """El cursor de un pedido se decodifica en su (created_at, id)."""
+    order = make_order(30)
+
+    created_at, order_id = orders_api._decode_cursor(orders_api._encode_cursor(order))
+
+    assert created_at == datetime(2026, 3, 1, 12, 30)
+    assert str(order_id) == order["order_id"]
+
+
+def test_missing_cursor_is_first_page():
+    assert orders_api._decode_cursor(None) is None
+    assert orders_api._decode_cursor("") is None
+
+
+@pytest.mark.parametrize("cursor", ["no-es-base64!", "c2luLXNlcGFyYWRvcg==", "MjAyNi0wMy0wMXxuby11dWlk"])
+def test_invalid_cursor_is_rejected(cursor):
+    """Un cursor mal formado responde 400 en lugar de 500."""
+    with pytest.raises(HTTPException) as error:
+        orders_api._decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+@pytest.fixture
+def service_calls(monkeypatch):
+    """Sustituye las consultas de order_service y registra las llamadas."""
+    calls = {"orders": [], "stats": 0}
+    orders = [make_order(minute) for minute in range(59, 54, -1)]
+
+    async def get_orders_by_date_range(start, end, limit=None, after=None):
+        calls["orders"].append(after)
+        return orders[:limit]
+
+    async def get_order_stats(start, end):
+        calls["stats"] += 1
+        return {"total_orders": len(orders)}
+
+    monkeypatch.setattr(order_service, "get_orders_by_date_range", get_orders_by_date_range)
+    monkeypatch.setattr(order_service, "get_order_stats", get_order_stats)
+    return calls
+
+
+async def test_first_page_includes_stats(service_calls):
+    start, end = datetime(2026, 3, 1), datetime(2026, 3, 2)
+
+    page, next_cursor, stats = await orders_api._get_orders_page(start, end, 2, None)
+
+    assert len(page) == 2
+    assert str(orders_api._decode_cursor(next_cursor)[1]) == page[-1]["order_id"]
+    assert stats == {"total_orders": 5}
+    assert service_calls["stats"] == 1
+
+
+async def test_next_pages_skip_stats(service_calls):
+    """Las páginas con cursor no recalculan las estadísticas de todo el rango."""
+    start, end = datetime(2026, 3, 1), datetime(2026, 3, 2)
+    cursor = orders_api._encode_cursor(make_order(58))
+
+    page, next_cursor, stats = await orders_api._get_orders_page(start, end, 10, cursor)
+
+    assert len(page) == 5 and next_cursor is None
+    assert stats is None
+    assert service_calls["stats"] == 0
+    assert service_calls["orders"] == [orders_api._decode_cursor(cursor)]
+
+
+async def test_without_limit_or_cursor_returns_the_whole_range(service_calls):
+    """Sin limit ni cursor no se pagina: el tablero recibe todos los pedidos del día."""
+    start, end = datetime(2026, 3, 1), datetime(2026, 3, 2)
+
+    page, next_cursor, stats = await orders_api._get_orders_page(start, end, None, None)
+
+    assert len(page) == 5 and next_cursor is None
+    assert stats == {"total_orders": 5}
+
+
+def test_page_size_defaults_only_when_paginating(monkeypatch):
+    monkeypatch.setattr(orders_api.settings, "ORDERS_PAGE_SIZE", 50)
+    monkeypatch.setattr(orders_api.settings, "ORDERS_MAX_PAGE_SIZE", 200)
+
+    assert orders_api._page_size(None, None) is None
+    assert orders_api._page_size(None, "cursor") == 50
+    assert orders_api._page_size(500, None) == 200
+
+
+@pytest.fixture
+def orders_app():
+    """Aplicación con solo el router de pedidos."""
+    app = FastAPI()
+    app.include_router(orders_api.router, prefix="/orders")
+    return app
+
+
+async def test_bulk_delete_requires_an_admin(orders_app, monkeypatch):
+    """El borrado en bloque es permanente: sin token de administrador responde 401 y no borra."""
+    deleted = []
+
+    async def delete_orders(**kwargs):
+        deleted.append(kwargs)
+        return 3
+
+    monkeypatch.setattr(order_service, "delete_orders", delete_orders)
+    body = {"end_date": "2026-03-01"}
+    async with AsyncClient(transport=ASGITransport(app=orders_app), base_url="http://test") as client:
+        anonymous = await client.post("/orders/bulk-delete", json=body)
+        orders_app.dependency_overrides[orders_api.auth_service.get_current_admin] = lambda: Admin(
+            id=1, username="admin", password_hash="x"
+        )
+        authorized = await client.post("/orders/bulk-delete", json=body)
+
+    assert anonymous.status_code == 401
+    assert authorized.status_code == 200 and authorized.json()["deleted"] == 3
+    assert len(deleted) == 1
@@ -0,0 +1,34 @@
+"""Pruebas de la caché de respuestas (ResponseCache)."""
+
+import pytest
+
+from core.langgraph.response_cache import ResponseCache
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(max_entries=2, ttl_seconds=60)
+
+
+def test_client_name_is_templated_as_a_whole_word(cache):
+    """Solo se cambia el nombre como palabra completa: "Ana" no toca "Ananá" ni "Anabel"."""
+    cache.set("hola", "conversation_agent", "v1", "¡Hola Ana! Hoy hay jugo de Ananá.", "Ana")
+
+    assert cache.get("Hola", "conversation_agent", "v1", "Luis") == "¡Hola Luis! Hoy hay jugo de Ananá."
+
+
+def test_response_naming_the_client_twice_is_not_cached(cache):
+    cache.set("hola", "conversation_agent", "v1", "Hola Rosa, ¿quieres la salsa Rosa?", "Rosa")
+
+    assert cache.get("hola", "conversation_agent", "v1", "Luis") is None
+
+
+def test_entries_are_keyed_by_version_and_evicted_lru(cache):
+    cache.set("hola", "conversation_agent", "v1", "Hola")
+    cache.set("horario", "conversation_agent", "v1", "De 11 a 22")
+    cache.get("hola", "conversation_agent", "v1")
+    cache.set("domicilios", "conversation_agent", "v1", "Sí, hacemos domicilios")
+
+    assert cache.get("hola", "conversation_agent", "v2") is None
+    assert cache.get("horario", "conversation_agent", "v1") is None
+    assert cache.get("hola", "conversation_agent", "v1") == "Hola"
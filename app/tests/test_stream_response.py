@@ -0,0 +1,78 @@
+"""Pruebas del streaming de respuestas del grafo (`get_stream_response`)."""
+
+import pytest
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from core.config import settings
+from core.langgraph import graph as graph_module
+from core.langgraph.graph import LangGraphAgent
+from core.langgraph.intent_classifier import IntentPrediction
+from core.langgraph.response_cache import response_cache
+from schemas import Message
+
+
+class MemoryCheckpointer(MemorySaver):
+    """Checkpointer en memoria con la interfaz de AsyncPostgresSaver que usa create_graph."""
+
+    def __init__(self, connection_pool):
+        super().__init__()
+
+    async def setup(self) -> None:
+        pass
+
+
+@pytest.fixture
+async def agent(monkeypatch):
+    """Agente con el grafo compilado sobre un checkpointer en memoria y la caché de respuestas activa."""
+    monkeypatch.setattr(graph_module, "AsyncPostgresSaver", MemoryCheckpointer)
+    monkeypatch.setattr(
+        graph_module, "classify_intent", lambda text: IntentPrediction("conversation_agent", 1.0, {})
+    )
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+    agent = LangGraphAgent()
+
+    async def connection_pool():
+        return object()
+
+    async def conversation_agent(state):
+        """Respuesta fija en lugar del LLM (no se envía en streaming: no son AIMessageChunk)."""
+        return {"messages": [AIMessage(content="respuesta del agente")]}
+
+    agent._get_connection_pool = connection_pool
+    agent.conversation_agent = conversation_agent
+    await agent.create_graph()
+    response_cache.clear()
+    yield agent
+    response_cache.clear()
+
+
+async def stream(agent: LangGraphAgent, text: str) -> list[str]:
+    """Envía `text` a la sesión de prueba y devuelve los fragmentos recibidos."""
+    return [token async for token in agent.get_stream_response([Message(role="user", content=text)], "test-stream")]
+
+
+async def test_cache_hit_streams_only_current_turn(agent):
+    """Una respuesta de caché se envía una vez y no se reenvía en los turnos siguientes.
+
+    Regresión: el orquestador devolvía el estado completo y el streaming reenviaba todas las
+    respuestas de caché del historial en cada turno.
+    """
+    version = agent._response_cache_version()
+    response_cache.set("hola", "conversation_agent", version, "¡Hola! ¿Qué deseas pedir?")
+
+    assert await stream(agent, "hola") == ["¡Hola! ¿Qué deseas pedir?"]
+    assert await stream(agent, "horario") == []
+
+
+async def test_cache_only_answers_the_first_turn(agent):
+    """Tras la primera respuesta la caché no se consulta: "sí" depende de lo que se habló antes."""
+    version = agent._response_cache_version()
+    response_cache.set("hola", "conversation_agent", version, "¡Hola! ¿Qué deseas pedir?")
+    response_cache.set("si", "conversation_agent", version, "¡Listo, tu pedido quedó confirmado!")
+
+    await stream(agent, "hola")
+    assert await stream(agent, "sí") == []
+
+    state = await agent._graph.aget_state({"configurable": {"thread_id": "test-stream"}})
+    assert state.values["messages"][-1].content == "respuesta del agente"
@@ -0,0 +1,48 @@
+"""Pruebas de la ejecución de herramientas del grafo (`_run_tool`)."""
+
+import asyncio
+
+import pytest
+from langchain_core.tools import tool
+
+from core.config import settings
+from core.langgraph.graph import LangGraphAgent
+
+
+@tool
+async def slow_tool(delay: float) -> str:
+    """Herramienta de prueba que tarda `delay` segundos."""
+    await asyncio.sleep(delay)
+    return "ok"
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    """Agente con `slow_tool` registrada y un timeout de herramientas muy corto."""
+    agent = LangGraphAgent()
+    agent.tools_by_name["slow_tool"] = slow_tool
+    monkeypatch.setattr(settings, "TOOL_CALL_TIMEOUT", 0.05)
+    return agent
+
+
+def tool_call(name: str) -> dict:
+    """Llamada a `name` que tarda más que el timeout configurado."""
+    return {"name": name, "args": {"delay": 0.2}, "id": "call-1"}
+
+
+async def test_read_tool_times_out(agent):
+    """Una herramienta de lectura que supera su timeout devuelve un ToolMessage de error."""
+    message = await agent._run_tool(tool_call("slow_tool"), asyncio.Lock())
+
+    assert "no respondió" in message.content
+    assert "'error': True" in message.content
+
+
+async def test_order_write_tool_is_not_cut_off(agent, monkeypatch):
+    """Las escrituras de pedidos no se cancelan por timeout: se espera su resultado."""
+    monkeypatch.setattr(agent, "order_write_tools", agent.order_write_tools | {"slow_tool"})
+
+    message = await agent._run_tool(tool_call("slow_tool"), asyncio.Lock())
+
+    assert message.content == "ok"
+    assert message.tool_call_id == "call-1"
@@ -2,11 +2,42 @@
 
 from .graph import (
     dump_messages,
+    format_last_order_info,
+    get_last_order_from_context,
     prepare_messages,
+    select_messages_to_compact,
+)
+
+from .images import (
+    content_hash,
+    encode_whatsapp_jpeg,
+)
+
+from .text import (
+    fold_accents,
+    normalize_text,
+)
+
+from .tokens import (
+    count_message_tokens,
+    count_text_tokens,
 )
 
 from .utils import (
     current_colombian_time,
 )
 
-__all__ = ["dump_messages", "prepare_messages", "current_colombian_time"]
+__all__ = [
+    "dump_messages",
+    "format_last_order_info",
+    "get_last_order_from_context",
+    "prepare_messages",
+    "select_messages_to_compact",
+    "content_hash",
+    "encode_whatsapp_jpeg",
+    "fold_accents",
+    "normalize_text",
+    "count_message_tokens",
+    "count_text_tokens",
+    "current_colombian_time",
+]
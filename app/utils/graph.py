@@ -1,10 +1,16 @@
 """This file contains the graph utilities for the application."""
 
-from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_core.messages import trim_messages as _trim_messages
+from typing import (
+    Any,
+    Dict,
+    Optional,
+)
+
+from langchain_core.messages import BaseMessage
 
 from core.config import settings
 from schemas import Message
+from utils.tokens import count_message_tokens
 
 
 def dump_messages(messages: list[Message]) -> list[dict]:
@@ -19,24 +25,125 @@ def dump_messages(messages: list[Message]) -> list[dict]:
     return [message.model_dump() for message in messages]
 
 
-def prepare_messages(messages: list[Message], llm: BaseChatModel, system_prompt: str) -> list[Message]:
+def _is_human(message: BaseMessage | Dict[str, Any]) -> bool:
+    """Check whether a message was written by the user."""
+    if isinstance(message, dict):
+        return message.get("role") in ("user", "human")
+    return message.type == "human"
+
+
+def prepare_messages(
+    messages: list[BaseMessage],
+    system_prompt: str,
+    token_counts: Optional[Dict[str, int]] = None,
+) -> list[BaseMessage | Message]:
     """Prepare the messages for the LLM.
 
+    Keeps the most recent messages that fit in MAX_TOKENS, walking back from the tail, and
+    starts the window on a human message so no tool result is left without its call.
+    Token counts are looked up in `token_counts` by message id; missing ones are computed
+    once with the local tokenizer and added to it, so callers can persist them in the state.
+
     Args:
-        messages (list[Message]): The messages to prepare.
-        llm (BaseChatModel): The LLM to use.
+        messages (list[BaseMessage]): The messages to prepare.
         system_prompt (str): The system prompt to use.
+        token_counts (Optional[Dict[str, int]]): Cached token counts by message id, updated in place.
+
+    Returns:
+        list[BaseMessage | Message]: The system prompt followed by the trimmed messages.
+    """
+    if token_counts is None:
+        token_counts = {}
+
+    budget = settings.MAX_TOKENS
+    start = len(messages)
+    for index in range(len(messages) - 1, -1, -1):
+        message = messages[index]
+        message_id = message.get("id") if isinstance(message, dict) else message.id
+        tokens = token_counts.get(message_id) if message_id else None
+        if tokens is None:
+            tokens = count_message_tokens(message)
+            if message_id:
+                token_counts[message_id] = tokens
+        if tokens > budget:
+            break
+        budget -= tokens
+        start = index
+
+    # Empezar la ventana en un mensaje humano
+    while start < len(messages) and not _is_human(messages[start]):
+        start += 1
+    return [Message(role="system", content=system_prompt)] + list(messages[start:])
+
+
+def select_messages_to_compact(messages: list[BaseMessage], threshold: int, keep: int) -> list[BaseMessage]:
+    """Select the old messages to drop once the history grows past a threshold.
+
+    The kept window holds roughly the last `keep` messages and always starts on a human
+    message, so tool calls and their results are dropped together.
+
+    Args:
+        messages (list[BaseMessage]): The conversation history.
+        threshold (int): Number of messages above which the history is compacted.
+        keep (int): Approximate number of recent messages to keep.
 
     Returns:
-        list[Message]: The prepared messages.
+        list[BaseMessage]: The messages to remove (empty if no compaction is needed).
     """
-    trimmed_messages = _trim_messages(
-        dump_messages(messages),
-        strategy="last",
-        token_counter=llm,
-        max_tokens=settings.MAX_TOKENS,
-        start_on="human",
-        include_system=False,
-        allow_partial=False,
-    )
-    return [Message(role="system", content=system_prompt)] + trimmed_messages
+    if len(messages) <= threshold:
+        return []
+
+    cut = max(len(messages) - keep, 0)
+    human_indexes = [index for index, message in enumerate(messages) if _is_human(message)]
+    # Primer mensaje humano desde el corte; si el turno actual es más largo que la ventana, el último humano antes
+    boundary = next((index for index in human_indexes if index >= cut), None)
+    if boundary is None:
+        boundary = next((index for index in reversed(human_indexes) if index < cut), 0)
+    return list(messages[:boundary])
+
+
+def get_last_order_from_context(customer_context: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Get the customer's last order from the per-turn customer context.
+
+    Mirrors `OrderService.get_last_order`: a completed order counts as no order.
+
+    Args:
+        customer_context (Optional[Dict[str, Any]]): The context loaded by `DatabaseService.get_customer_context`.
+
+    Returns:
+        Optional[Dict[str, Any]]: The last order with its products, or None.
+    """
+    if not customer_context or not customer_context.get("order"):
+        return None
+    order = customer_context["order"]
+    if order["status"] == "completado":
+        return None
+    return order
+
+
+def format_last_order_info(last_order: Optional[Dict[str, Any]]) -> str:
+    """Format the last order as the text block injected into the agent prompts.
+
+    Args:
+        last_order (Optional[Dict[str, Any]]): The last order, as returned by `get_last_order_from_context`.
+
+    Returns:
+        str: The formatted order information.
+    """
+    if not last_order:
+        return "No hay información de órdenes previas."
+
+    product_info = [
+        f"{product['name']} - Cantidad: {product['quantity']} - Precio: ${product['unit_price']} - Subtotal: ${product['subtotal']}"
+        for product in last_order["products"]
+    ]
+    return f"""
+                    Estado de la última orden: {last_order['status']}
+                    Fecha: {last_order['created_at']}
+                    Dirección: {last_order.get('address', 'No disponible')}
+                    
+                    Productos:
+                    {chr(10).join(f"- {item}" for item in product_info)}
+                    
+                    Total: ${last_order['total_amount']}
+                    """
@@ -0,0 +1,41 @@
+"""Image helpers for the menu images sent over WhatsApp."""
+
+import hashlib
+import io
+
+
+def content_hash(data: bytes) -> str:
+    """Get the SHA-256 hex digest used to address a stored image.
+
+    Args:
+        data: The image bytes
+
+    Returns:
+        str: The 64-character hex digest
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def encode_whatsapp_jpeg(image_bytes: bytes, max_side: int, quality: int) -> bytes:
+    """Transcode an uploaded image into a JPEG that WhatsApp accepts without re-encoding.
+
+    The image is converted to RGB, downscaled so its longest side is at most `max_side`
+    pixels, and saved as an optimized progressive JPEG.
+
+    Args:
+        image_bytes: The uploaded image in any format Pillow can read
+        max_side: Maximum width or height in pixels
+        quality: JPEG quality (1-95)
+
+    Returns:
+        bytes: The encoded JPEG
+    """
+    # Imported here so that only the upload path depends on Pillow
+    from PIL import Image
+
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        image = image.convert("RGB")
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return output.getvalue()
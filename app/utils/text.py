@@ -0,0 +1,34 @@
+"""This file contains the text normalization utilities for the application."""
+
+import re
+import unicodedata
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def fold_accents(value: str) -> str:
+    """Remove diacritics from a string (á -> a, ñ -> n, ü -> u).
+
+    Args:
+        value: The string to fold
+
+    Returns:
+        str: The string without accents
+    """
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def normalize_text(value: str) -> str:
+    """Normalize user text for matching: lowercase, no accents, no punctuation, single spaces.
+
+    Args:
+        value: The text to normalize
+
+    Returns:
+        str: The normalized text
+    """
+    value = fold_accents(value.lower())
+    value = _NON_WORD_RE.sub(" ", value)
+    return _WHITESPACE_RE.sub(" ", value).strip()
@@ -0,0 +1,78 @@
+"""This file contains the token counting utilities for the application."""
+
+import json
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+)
+
+import tiktoken
+from langchain_core.messages import BaseMessage
+
+from core.config import settings
+
+# Tokens added by the chat format around every message (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@lru_cache(maxsize=1)
+def _get_encoder() -> Callable[[str], int]:
+    """Get the token counting function for the configured model.
+
+    Uses the local tiktoken encoding for LLM_MODEL. If the encoding files are not available
+    (e.g. no network access to download them), falls back to an estimate of 4 characters per token.
+
+    Returns:
+        Callable[[str], int]: A function returning the number of tokens of a text
+    """
+    try:
+        try:
+            encoding = tiktoken.encoding_for_model(settings.LLM_MODEL)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except Exception as e:
+        # Imported here: core.logging imports the utils package
+        from core.logging import logger
+
+        logger.warning("tiktoken_encoding_unavailable", model=settings.LLM_MODEL, error=str(e))
+        return lambda text: len(text) // 4 + 1
+
+
+def count_text_tokens(text: str) -> int:
+    """Count the tokens of a text with the local tokenizer.
+
+    Args:
+        text: The text to count
+
+    Returns:
+        int: The number of tokens
+    """
+    return _get_encoder()(text) if text else 0
+
+
+def count_message_tokens(message: BaseMessage | Dict[str, Any]) -> int:
+    """Count the tokens a message takes in the prompt, including tool call arguments.
+
+    Args:
+        message: A LangChain message or a dict with role/content
+
+    Returns:
+        int: The number of tokens of the message
+    """
+    if isinstance(message, dict):
+        content = message.get("content", "")
+        tool_calls = message.get("tool_calls") or []
+    else:
+        content = message.content
+        tool_calls = getattr(message, "tool_calls", None) or []
+
+    if not isinstance(content, str):
+        content = json.dumps(content, ensure_ascii=False, default=str)
+    tokens = MESSAGE_OVERHEAD_TOKENS + count_text_tokens(content)
+    for tool_call in tool_calls:
+        tokens += count_text_tokens(tool_call.get("name", ""))
+        tokens += count_text_tokens(json.dumps(tool_call.get("args", {}), ensure_ascii=False, default=str))
+    return tokens
@@ -1,12 +1,19 @@
 from datetime import datetime
 from pytz import timezone
 
-def current_colombian_time() -> str:
+def current_colombian_time(round_minutes: int = 0) -> str:
     """
     Retorna la hora actual en formato de Colombia (zona horaria América/Bogotá).
     
+    Args:
+        round_minutes: Si es mayor que 0, redondea hacia abajo a múltiplos de esos minutos
+            (sin segundos), para que el valor no cambie en cada llamada
+    
     Returns:
         str: Fecha y hora actual en formato 'YYYY-MM-DD HH:MM:SS'
     """
-    current_time = datetime.now(timezone('America/Bogota')).strftime('%Y-%m-%d %H:%M:%S')
+    now = datetime.now(timezone('America/Bogota'))
+    if round_minutes > 0:
+        now = now.replace(minute=now.minute - now.minute % round_minutes, second=0, microsecond=0)
+    current_time = now.strftime('%Y-%m-%d %H:%M:%S')
     return current_time
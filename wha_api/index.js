@@ -186,29 +186,59 @@ app.post('/api/send-message', async (req, res) => {
     }
 });
 
+// Caché de imágenes del menú por content hash (el contenido de un hash nunca cambia)
+const imageCache = new Map();
+const IMAGE_CACHE_MAX_ENTRIES = 32;
+
+/**
+ * Obtiene una imagen por su content hash, descargándola de la API solo la primera vez
+ * @param {string} imageUrl - URL de la imagen en la API
+ * @param {string} contentHash - Hash SHA-256 del contenido
+ * @returns {Promise<Buffer>} Contenido de la imagen
+ */
+async function getCachedImage(imageUrl, contentHash) {
+    if (contentHash && imageCache.has(contentHash)) {
+        return imageCache.get(contentHash);
+    }
+
+    const response = await axios.get(imageUrl, { responseType: 'arraybuffer' });
+    const imageBuffer = Buffer.from(response.data);
+    if (contentHash) {
+        imageCache.set(contentHash, imageBuffer);
+        // Desalojar la imagen más antigua si se supera el tamaño máximo
+        if (imageCache.size > IMAGE_CACHE_MAX_ENTRIES) {
+            imageCache.delete(imageCache.keys().next().value);
+        }
+    }
+    return imageBuffer;
+}
+
 /**
- * Envía una imagen recibida en formato hexadecimal al número proporcionado
+ * Envía una imagen al número proporcionado. La imagen se recibe por referencia
+ * (imageUrl + contentHash, se guarda en caché) o, por compatibilidad, en formato hexadecimal
  * @param {Object} req - Objeto de solicitud HTTP
  * @param {Object} res - Objeto de respuesta HTTP
  */
 app.post('/api/send-images', async (req, res) => {
     try {
-        const { phone, imageHex } = req.body;
+        const { phone, imageUrl, contentHash, imageHex, caption } = req.body;
         
-        if (!phone || !imageHex) {
+        if (!phone || !(imageUrl || imageHex)) {
             return res.status(400).json({ 
                 status: false, 
-                message: 'El número de teléfono y la imagen en formato hexadecimal son obligatorios' 
+                message: 'El número de teléfono y la imagen (imageUrl o imageHex) son obligatorios' 
             });
         }
 
-        // Convertir el hex a buffer
-        const imageBuffer = Buffer.from(imageHex, 'hex');
+        // Obtener la imagen desde la caché o convertir el hex a buffer
+        const imageBuffer = imageUrl
+            ? await getCachedImage(imageUrl, contentHash)
+            : Buffer.from(imageHex, 'hex');
         
         // Enviar la imagen
         const result = await globalSocket.sendMessage(phone + '@c.us', {
             image: imageBuffer,
-            caption: ''
+            caption: caption || ''
         });
         
         res.status(200).json({